@@ -1,8 +1,34 @@
 # server_clinic/death/admin.py
 from django.contrib import admin
-from .models import Death
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import Death, MortalityStat
+from .stats import DIMENSIONS, summary
+from mkb.autocomplete import Icd10AutocompleteMixin
+from server_clinic.exports import ExportMixin
+from server_clinic.importers import ImportMixin
+from server_clinic.large_tables import LargeTableAdminMixin
+from patient.autocomplete import PatientAutocompleteMixin
+from patient.filters import (
+    AgeAtEventBandListFilter,
+    band_label,
+    band_value,
+    get_age_bands,
+)
 from django import forms
 from django.http import HttpRequest
+from server_clinic.caching import (
+    CachedAllValuesFieldListFilter,
+    choice_labels,
+    label_column,
+)
+
+
+class AgeAtDeathListFilter(AgeAtEventBandListFilter):
+    title = "Возраст на момент смерти"
+
 
 class DeathAdminForm(forms.ModelForm):
     class Meta:
@@ -44,35 +70,119 @@ class DeathAdminForm(forms.ModelForm):
         return super().clean()
 
 
+# Параметры отчёта по статистике смертности: разрезы группировки и фильтры
+class MortalityReportForm(forms.Form):
+    group_by = forms.MultipleChoiceField(
+        label="Группировать по",
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        choices=[
+            (name, MortalityStat._meta.get_field(name).verbose_name)
+            for name in DIMENSIONS
+        ],
+    )
+    month_from = forms.DateField(
+        label="С месяца", required=False, input_formats=["%Y-%m", "%m.%Y"]
+    )
+    month_to = forms.DateField(
+        label="По месяц", required=False, input_formats=["%Y-%m", "%m.%Y"]
+    )
+    filial = forms.ChoiceField(label="Филиал", required=False)
+    icd_chapter = forms.ChoiceField(label="Класс МКБ-10", required=False)
+    death_place = forms.ChoiceField(label="Место смерти", required=False)
+    gender = forms.ChoiceField(label="Пол", required=False)
+    age_band = forms.ChoiceField(label="Возрастная группа", required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, choices in dimension_labels().items():
+            if name in self.fields:
+                self.fields[name].choices = [("", "Все")] + list(choices.items())
+
+    def get_filters(self):
+        data = self.cleaned_data
+        filters = {
+            name: data[name]
+            for name in DIMENSIONS
+            if name in self.fields and data.get(name)
+        }
+        if data.get("month_from"):
+            filters["month__gte"] = data["month_from"]
+        if data.get("month_to"):
+            filters["month__lte"] = data["month_to"]
+        return filters
+
+
+# Подписи значений разрезов для отчёта
+def dimension_labels():
+    return {
+        **{
+            name: choice_labels(MortalityStat, name)
+            for name in ("filial", "icd_chapter", "death_place", "gender")
+        },
+        "age_band": {
+            band_value(min_age, max_age): band_label(min_age, max_age)
+            for min_age, max_age in get_age_bands()
+        },
+    }
+
+
 @admin.register(Death)
-class DeathAdmin(admin.ModelAdmin):
+class DeathAdmin(
+    ImportMixin,
+    ExportMixin,
+    LargeTableAdminMixin,
+    PatientAutocompleteMixin,
+    Icd10AutocompleteMixin,
+    admin.ModelAdmin,
+):
     # form = DeathAdminForm
-    fields = ['patient', 'death_date', 'death_cause', 'death_place']
+    fields = ["patient", "death_date", "death_cause", "death_place"]
+
     def get_form(self, request: HttpRequest, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
-        if 'patient' in request.GET:
+        if "patient" in request.GET:
             try:
-                form.base_fields['patient'].initial = int(request.GET['patient'])
+                form.base_fields["patient"].initial = int(request.GET["patient"])
             except (ValueError, TypeError):
                 pass
         return form
-    
+
     autocomplete_fields = ["patient"]
     list_display = (
-        "get_full_name",
+        "full_name",
+        "get_age",
         "death_date",
-        "death_place",
+        label_column(Death, "death_place"),
         "death_cause",
         "get_insurance_number",
     )
+    # Колонки пациента в списке без запроса на каждую строку
+    list_select_related = ("patient",)
+    # Пол, филиал и возраст — копии в самой таблице death (PatientSnapshotModel)
     list_filter = (
         "death_place",
-        "patient__filial",
-        "patient__gender",
+        ("icd_chapter", CachedAllValuesFieldListFilter),
+        "filial",
+        "gender",
+        AgeAtDeathListFilter,
+    )
+    change_list_template = "admin/death/death_change_list.html"
+    import_register = "deaths"
+    export_fields = (
+        "full_name",
+        "patient__insurance_number",
+        "birth_date",
+        "gender",
+        "filial",
+        "death_date",
+        "death_place",
+        "death_cause",
+        "comment",
     )
     search_fields = (
-        "insurance_number",
-        "patient__full_name",
+        "patient__insurance_number",
+        "full_name",
     )
     readonly_fields = (
         "get_full_name",
@@ -90,7 +200,7 @@ class DeathAdmin(admin.ModelAdmin):
     get_full_name.short_description = "ФИО пациента"
 
     def get_gender(self, obj):
-        return obj.patient.get_gender_display() if obj.patient else "-"
+        return choice_labels(Death, "gender").get(obj.gender, "-")
 
     get_gender.short_description = "Пол"
 
@@ -99,13 +209,15 @@ class DeathAdmin(admin.ModelAdmin):
 
     get_birth_date.short_description = "Дата рождения"
 
+    # Возраст на момент смерти хранится в колонке age
     def get_age(self, obj):
-        return obj.patient.age if obj.patient else "-"
+        return "-" if obj.age is None else obj.age
 
     get_age.short_description = "Возраст"
+    get_age.admin_order_field = "age"
 
     def get_filial(self, obj):
-        return obj.patient.get_filial_display() if obj.patient else "-"
+        return choice_labels(Death, "filial").get(obj.filial, "-")
 
     get_filial.short_description = "Филиал"
 
@@ -113,3 +225,76 @@ class DeathAdmin(admin.ModelAdmin):
         return obj.patient.insurance_number
 
     get_insurance_number.short_description = "Полис ОМС"
+
+    def get_urls(self):
+        custom_urls = [
+            path(
+                "stats/",
+                self.admin_site.admin_view(self.stats_view),
+                name="death_death_stats",
+            ),
+            path(
+                "stats/api/",
+                self.admin_site.admin_view(self.stats_api_view),
+                name="death_death_stats_api",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    # Срез из сводной таблицы MortalityStat вместо агрегации по death ⋈ patient
+    def get_stats(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        form = MortalityReportForm(request.GET)
+        if not form.is_valid():
+            return form, [], []
+        group_by = [
+            name for name in DIMENSIONS if name in form.cleaned_data["group_by"]
+        ]
+        return form, group_by, summary(group_by, **form.get_filters())
+
+    def stats_view(self, request):
+        form, group_by, rows = self.get_stats(request)
+        labels = dimension_labels()
+
+        def display(name, value):
+            if name == "month":
+                return value.strftime("%m.%Y")
+            return labels[name].get(value, value)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Статистика смертности",
+            "form": form,
+            "headers": [
+                MortalityStat._meta.get_field(name).verbose_name for name in group_by
+            ],
+            "rows": [
+                ([display(name, row[name]) for name in group_by], row["total"])
+                for row in rows
+                if group_by
+            ],
+            "total": sum(row["total"] for row in rows),
+        }
+        return TemplateResponse(request, "admin/death/mortality_report.html", context)
+
+    def stats_api_view(self, request):
+        form, group_by, rows = self.get_stats(request)
+        if not form.is_valid():
+            return JsonResponse(
+                {"errors": form.errors},
+                status=400,
+                json_dumps_params={"ensure_ascii": False},
+            )
+        for row in rows:
+            if "month" in row:
+                row["month"] = row["month"].strftime("%Y-%m")
+        return JsonResponse(
+            {
+                "group_by": group_by,
+                "total": sum(row["total"] for row in rows),
+                "rows": rows if group_by else [],
+            },
+            json_dumps_params={"ensure_ascii": False},
+        )
@@ -1,7 +1,17 @@
 # server_clinic/death/apps.py
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class DeathConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "death"
+
+    def ready(self):
+        from server_clinic.caching import model_changed
+        from . import signals
+
+        # Кэшированные фильтры и фасеты списка устаревают при любой правке
+        model = self.get_model("Death")
+        post_save.connect(model_changed, sender=model)
+        post_delete.connect(model_changed, sender=model)
@@ -0,0 +1,111 @@
+# server_clinic/death/cascade.py
+from django.apps import apps
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from server_clinic.intervals import invalidate_snapshots
+from .models import Death
+
+CASCADE_CHUNK_SIZE = 5000
+
+# Регистры, с которых снимает смерть: (модель, поле окончания, поле начала,
+# поле причины, причина). Приложения регистров могут быть не подключены
+REGISTERS = (
+    ("diagnos.Diagnosis", "disp_end_date", "disp_start_date", "remove_reason", "умер"),
+    (
+        "disabled_children.DisabledChild",
+        "removal_date",
+        "disability_date",
+        "removal_reason",
+        "died",
+    ),
+)
+
+
+def registers():
+    for label, end, start, reason_field, reason in REGISTERS:
+        if apps.is_installed(label.split(".")[0]):
+            yield apps.get_model(label), end, start, reason_field, reason
+
+
+# Дата смерти пациента строки регистра — коррелированный подзапрос в UPDATE
+def death_date_of(using):
+    return Subquery(
+        Death.objects.using(using)
+        .filter(patient_id=OuterRef("patient_id"))
+        .order_by()
+        .values("death_date")[:1]
+    )
+
+
+# Снятие с учёта умерших пациентов: по одному UPDATE на регистр. Открытые
+# строки закрываются датой смерти; закрытые по смерти получают исправленную
+# дату. Строки, начатые после смерти, не трогаются: дата снятия раньше начала
+# не пройдёт проверку модели — их показывает conflicts()
+@transaction.atomic
+def close_registers(patient_ids, using="default"):
+    closed = {}
+    dead = Death.objects.using(using).filter(patient_id__in=patient_ids)
+    for model, end, start, reason_field, reason in registers():
+        death_date = death_date_of(using)
+        rows = (
+            model.objects.using(using)
+            .filter(patient_id__in=dead.values("patient_id"))
+            .filter(Q(**{f"{end}__isnull": True}) | Q(**{reason_field: reason}))
+            .exclude(**{end: death_date})
+            .exclude(**{f"{start}__gt": death_date})
+        )
+        closed[model._meta.label] = rows.update(
+            **{end: death_date, reason_field: reason}
+        )
+        if closed[model._meta.label]:
+            invalidate_snapshots(model)
+    return closed
+
+
+# Удалённая запись о смерти (ошибочная) возвращает на учёт снятых ею
+@transaction.atomic
+def reopen_registers(death, using="default"):
+    reopened = {}
+    for model, end, _, reason_field, reason in registers():
+        reopened[model._meta.label] = (
+            model.objects.using(using)
+            .filter(patient_id=death.patient_id, **{end: death.death_date})
+            .filter(**{reason_field: reason})
+            .update(**{end: None, reason_field: None})
+        )
+        if reopened[model._meta.label]:
+            invalidate_snapshots(model)
+    return reopened
+
+
+# Строки регистров, взятые на учёт после смерти пациента: на ручной разбор
+def conflicts(using="default"):
+    for model, _, start, _, _ in registers():
+        yield model, model.objects.using(using).filter(
+            **{"patient__death__isnull": False, f"{start}__gt": death_date_of(using)}
+        )
+
+
+# Сверка всей истории пачками по записям о смерти, каждая пачка — отдельным
+# UPDATE; повторный запуск ничего не меняет. progress(обработано, всего) —
+# после каждой пачки
+def backfill(chunk_size=CASCADE_CHUNK_SIZE, using="default", progress=None):
+    totals, done = {}, 0
+    total = Death.objects.using(using).count() if progress else None
+    patient_ids = (
+        Death.objects.using(using)
+        .order_by("patient_id")
+        .values_list("patient_id", flat=True)
+    )
+    last = None
+    while True:
+        chunk = patient_ids if last is None else patient_ids.filter(patient_id__gt=last)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return totals
+        for label, count in close_registers(chunk, using).items():
+            totals[label] = totals.get(label, 0) + count
+        last = chunk[-1]
+        done += len(chunk)
+        if progress:
+            progress(done, total)
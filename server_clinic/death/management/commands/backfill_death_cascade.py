@@ -0,0 +1,40 @@
+# server_clinic/death/management/commands/backfill_death_cascade.py
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from death.cascade import CASCADE_CHUNK_SIZE, backfill, conflicts
+
+
+class Command(BaseCommand):
+    help = (
+        "Снимает с учёта в регистрах всех умерших пациентов по записям о смерти: "
+        "диагнозы — «Умер» с датой смерти, дети-инвалиды — «Умер». Идёт пачками "
+        "по записям о смерти, повторный запуск ничего не меняет"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CASCADE_CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Посчитать и откатить изменения"
+        )
+
+    def handle(self, *args, **options):
+        # Без --dry-run каждая пачка фиксируется отдельно: прерванный запуск
+        # продолжается повторным
+        dry_run = options["dry_run"]
+        with transaction.atomic() if dry_run else nullcontext():
+            totals = backfill(chunk_size=options["chunk_size"])
+            if dry_run:
+                transaction.set_rollback(True)
+        verb = "будет снято" if dry_run else "снято с учёта"
+        for label, count in totals.items():
+            self.stdout.write(self.style.SUCCESS(f"{label}: {verb} {count}"))
+        for model, rows in conflicts():
+            count = rows.count()
+            if count:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{model._meta.label}: взяты на учёт после смерти — {count}, "
+                        "снимите вручную"
+                    )
+                )
@@ -0,0 +1,14 @@
+# server_clinic/death/management/commands/rebuild_mortality_stats.py
+from django.core.management.base import BaseCommand
+from death.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сводную статистику смертности из записей о смерти"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        total = rebuild(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Учтено записей о смерти: {total}"))
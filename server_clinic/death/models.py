@@ -1,14 +1,19 @@
 # server_clinic/death/models.py
-from django.db import models
+from django.db import models, transaction
+from mkb.models import IcdCodedModel, IcdRubric
 from patient.models import Patient
-from server_clinic.constants import DEATH_PLACE_CHOICES
+from server_clinic.constants import DEATH_PLACE_CHOICES, FILIAL, GENDER_CHOICES
+from server_clinic.mixins import PatientSnapshotModel
 from server_clinic.validators import (
     validate_icd10_format,
     validate_death_date,
 )
 
 
-class Death(models.Model):
+class Death(IcdCodedModel, PatientSnapshotModel):
+    icd_code_field = "death_cause"
+    snapshot_age_field = "death_date"  # возраст на момент смерти
+
     patient = models.OneToOneField(
         Patient,
         on_delete=models.CASCADE,
@@ -50,15 +55,60 @@ class Death(models.Model):
         # Проверка даты смерти
         validate_death_date(self)
 
+    # Сводная статистика и снятие с учёта в регистрах (death/cascade.py)
+    # выполняются сигналами в той же транзакции
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.patient.full_name} - {self.death_date}"
+        return f"{self.full_name} - {self.death_date}"
 
     class Meta:
         db_table = "death"
         verbose_name = "Запись о смерти"
         verbose_name_plural = "Записи о смерти"
         ordering = ["-death_date"]
+        # Под список админки: фильтр, затем сортировка с pk (его добавляет
+        # keyset-пагинация) — первая страница читается по индексу без сортировки
+        indexes = [
+            models.Index(fields=["-death_date", "-id"], name="death_date_idx"),
+            models.Index(
+                fields=["death_place", "-death_date", "-id"],
+                name="death_place_date_idx",
+            ),
+            models.Index(
+                fields=["icd_chapter", "-death_date", "-id"],
+                name="death_chapter_date_idx",
+            ),
+            models.Index(
+                fields=["filial", "-death_date", "-id"], name="death_filial_date_idx"
+            ),
+            models.Index(IcdRubric("death_cause"), name="death_cause_rubric_idx"),
+        ]
+
+
+# Предагрегированные счётчики смертей для отчётов (см. death/stats.py)
+class MortalityStat(models.Model):
+    month = models.DateField(verbose_name="Месяц")
+    filial = models.CharField(max_length=20, choices=FILIAL, verbose_name="Филиал")
+    icd_chapter = models.CharField(max_length=5, verbose_name="Класс МКБ-10")
+    death_place = models.CharField(
+        max_length=20, choices=DEATH_PLACE_CHOICES, verbose_name="Место смерти"
+    )
+    gender = models.CharField(max_length=1, choices=GENDER_CHOICES, verbose_name="Пол")
+    age_band = models.CharField(max_length=10, verbose_name="Возрастная группа")
+    count = models.PositiveIntegerField(default=0, verbose_name="Количество")
+
+    class Meta:
+        db_table = "mortality_stat"
+        verbose_name = "Статистика смертности"
+        verbose_name_plural = "Статистика смертности"
+        unique_together = (
+            ("month", "filial", "icd_chapter", "death_place", "gender", "age_band"),
+        )
+        indexes = [
+            models.Index(fields=["filial", "month"]),
+            models.Index(fields=["icd_chapter", "month"]),
+        ]
@@ -0,0 +1,56 @@
+# server_clinic/death/signals.py
+from collections import Counter
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from patient.models import Patient
+from .models import Death
+from . import cascade, stats
+
+# Поля пациента, входящие в ключ статистики смертности
+PATIENT_STAT_FIELDS = ("filial", "gender", "birth_date")
+
+
+@receiver(pre_save, sender=Death)
+def death_saving(sender, instance, using="default", **kwargs):
+    instance._stat_keys = (
+        stats.keys_for(Death.objects.using(using).filter(pk=instance.pk))
+        if instance.pk
+        else Counter()
+    )
+
+
+@receiver(post_save, sender=Death)
+def death_saved(sender, instance, using="default", **kwargs):
+    old = getattr(instance, "_stat_keys", Counter())
+    stats.apply_changes(old, [stats.death_key(instance)], using)
+    cascade.close_registers([instance.patient_id], using)
+
+
+@receiver(post_delete, sender=Death)
+def death_deleted(sender, instance, using="default", **kwargs):
+    stats.apply_delta(stats.death_key(instance), -1, using)
+    cascade.reopen_registers(instance, using)
+
+
+# Смена филиала, пола или даты рождения умершего переносит его между счётчиками
+@receiver(pre_save, sender=Patient)
+def patient_saving(sender, instance, using="default", update_fields=None, **kwargs):
+    instance._stat_keys = None
+    if not instance.pk or (
+        update_fields is not None and not set(update_fields) & set(PATIENT_STAT_FIELDS)
+    ):
+        return
+    instance._stat_keys = stats.keys_for(
+        Death.objects.using(using).filter(patient_id=instance.pk)
+    )
+
+
+@receiver(post_save, sender=Patient)
+def patient_saved(sender, instance, using="default", **kwargs):
+    old = getattr(instance, "_stat_keys", None)
+    if old:
+        stats.apply_changes(
+            old,
+            stats.keys_for(Death.objects.using(using).filter(patient_id=instance.pk)),
+            using,
+        )
@@ -0,0 +1,147 @@
+# server_clinic/death/stats.py
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Sum
+from patient.filters import band_value, get_age_bands
+from patient.models import age_at
+from .models import Death, MortalityStat
+
+# Разрезы отчёта: порядок совпадает с уникальным ключом MortalityStat
+DIMENSIONS = ("month", "filial", "icd_chapter", "death_place", "gender", "age_band")
+REBUILD_CHUNK_SIZE = 5000
+# Поля Death и пациента, от которых зависит ключ счётчика
+SOURCE_FIELDS = (
+    "death_date",
+    "death_place",
+    "icd_chapter",
+    "patient__filial",
+    "patient__gender",
+    "patient__birth_date",
+)
+
+StatKey = namedtuple("StatKey", DIMENSIONS)
+
+
+def age_band(age):
+    for min_age, max_age in get_age_bands():
+        if age >= min_age and (max_age is None or age <= max_age):
+            return band_value(min_age, max_age)
+    return "-"
+
+
+# Класс МКБ-10 берётся из колонки Death.icd_chapter, "-" для неизвестных кодов
+def make_key(death_date, death_place, chapter, filial, gender, birth_date):
+    return StatKey(
+        death_date.replace(day=1),
+        filial,
+        chapter or "-",
+        death_place,
+        gender,
+        age_band(age_at(birth_date, death_date)),
+    )
+
+
+def death_key(death):
+    patient = death.patient
+    return make_key(
+        death.death_date,
+        death.death_place,
+        death.icd_chapter,
+        patient.filial,
+        patient.gender,
+        patient.birth_date,
+    )
+
+
+# Ключи счётчиков для записей о смерти по SQL-выборке (values_list SOURCE_FIELDS)
+def keys_for(queryset):
+    return Counter(make_key(*row) for row in queryset.values_list(*SOURCE_FIELDS))
+
+
+# Прибавление delta к счётчику; строка создаётся при первой смерти в разрезе.
+# UPDATE с F() не теряет приращения при параллельных записях
+def apply_delta(key, delta, using="default"):
+    if not delta:
+        return
+    rows = MortalityStat.objects.using(using).filter(**key._asdict())
+    if rows.update(count=F("count") + delta):
+        if delta < 0:
+            rows.filter(count=0).delete()
+        return
+    if delta < 0:
+        return  # счётчика нет: статистика рассинхронизирована, поможет rebuild
+    try:
+        with transaction.atomic(using=using):
+            MortalityStat.objects.using(using).create(count=delta, **key._asdict())
+    except IntegrityError:
+        rows.update(count=F("count") + delta)
+
+
+def apply_changes(old, new, using="default"):
+    diff = Counter(new)
+    diff.subtract(old)
+    for key, delta in diff.items():
+        apply_delta(key, delta, using)
+
+
+# Для массовых операций без сигналов (bulk_create/bulk_update, слияние
+# пациентов): счётчики смертей этих пациентов до и после блока
+@contextmanager
+def track_patients(patient_ids, using="default"):
+    deaths = Death.objects.using(using).filter(patient_id__in=patient_ids)
+    old = keys_for(deaths)
+    yield
+    apply_changes(old, keys_for(deaths), using)
+
+
+# Полный пересчёт по death ⋈ patient: очистка таблицы, чтение пачками по id
+# и запись итога — одна транзакция. Она первой берёт блокировку записи
+# в mortality_stat (в PostgreSQL — LOCK TABLE, в SQLite — сам DELETE), поэтому
+# apply_delta других процессов ждут её конца и ложатся поверх нового итога,
+# а правки записей о смерти во время пересчёта не теряются.
+# progress(прочитано, всего) — после каждой пачки; исключение из него (отмена
+# фоновой задачи) откатывает пересчёт
+def rebuild(chunk_size=REBUILD_CHUNK_SIZE, progress=None):
+    deaths = Death.objects.order_by("pk").values_list("pk", *SOURCE_FIELDS)
+    with transaction.atomic():
+        connection = connections[MortalityStat.objects.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {MortalityStat._meta.db_table} IN EXCLUSIVE MODE"
+                )
+        MortalityStat.objects.all().delete()
+        total = Death.objects.count() if progress else None
+        counts, last, done = Counter(), None, 0
+        while True:
+            rows = list(
+                (deaths if last is None else deaths.filter(pk__gt=last))[:chunk_size]
+            )
+            if not rows:
+                break
+            last = rows[-1][0]
+            counts.update(make_key(*row[1:]) for row in rows)
+            done += len(rows)
+            if progress:
+                progress(done, total)
+        MortalityStat.objects.bulk_create(
+            [
+                MortalityStat(count=count, **key._asdict())
+                for key, count in counts.items()
+            ],
+            batch_size=chunk_size,
+        )
+    return sum(counts.values())
+
+
+# Срез статистики: filters — значения разрезов (month__gte и т.п. тоже можно),
+# group_by — по каким разрезам группировать
+def summary(group_by=(), **filters):
+    group_by = [name for name in DIMENSIONS if name in group_by]
+    queryset = MortalityStat.objects.filter(**filters)
+    if not group_by:
+        return [{"total": queryset.aggregate(total=Sum("count"))["total"] or 0}]
+    return list(
+        queryset.values(*group_by).annotate(total=Sum("count")).order_by(*group_by)
+    )
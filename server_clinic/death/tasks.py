@@ -0,0 +1,32 @@
+# server_clinic/death/tasks.py
+from django import forms
+from jobs.registry import task
+from .cascade import CASCADE_CHUNK_SIZE, backfill
+from .stats import REBUILD_CHUNK_SIZE, rebuild
+
+
+class ChunkSizeForm(forms.Form):
+    chunk_size = forms.IntegerField(
+        label="Размер пачки", initial=REBUILD_CHUNK_SIZE, min_value=100
+    )
+
+
+@task(
+    "rebuild_mortality_stats",
+    "Пересчёт статистики смертности",
+    form=ChunkSizeForm,
+)
+def rebuild_mortality_stats(job, chunk_size=REBUILD_CHUNK_SIZE):
+    total = rebuild(chunk_size=chunk_size, progress=job.report)
+    job.report(total, total, f"Учтено записей о смерти: {total}", force=True)
+
+
+@task(
+    "backfill_death_cascade",
+    "Снятие умерших с учёта в регистрах",
+    form=ChunkSizeForm,
+)
+def backfill_death_cascade(job, chunk_size=CASCADE_CHUNK_SIZE):
+    totals = backfill(chunk_size=chunk_size, progress=job.report)
+    message = ", ".join(f"{label}: {count}" for label, count in totals.items())
+    job.report(job.progress, message=message, force=True)
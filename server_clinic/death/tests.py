@@ -1,4 +1,54 @@
 # server_clinic/death/tests.py
+from datetime import date
+from unittest import skipUnless
+from django.apps import apps
 from django.test import TestCase
+from patient.models import Patient
+from .models import Death
 
-# Create your tests here.
+
+# Запись о смерти снимает пациента с диспансерного учёта, её удаление
+# (ошибочная запись) возвращает на учёт
+@skipUnless(apps.is_installed("diagnos"), "приложение diagnos не подключено")
+class DeathCascadeTests(TestCase):
+    def setUp(self):
+        Diagnosis = apps.get_model("diagnos", "Diagnosis")
+        self.patient = Patient.objects.create(
+            full_name="Иванов Иван Иванович",
+            birth_date=date(1950, 3, 1),
+            gender="М",
+            filial="1",
+            insurance_number="1000000000000001",
+        )
+        self.open = Diagnosis.objects.create(
+            patient=self.patient,
+            mkb_code="I10",
+            disp_status="состоит",
+            disp_start_date=date(2020, 1, 15),
+        )
+        self.closed = Diagnosis.objects.create(
+            patient=self.patient,
+            mkb_code="E11",
+            disp_status="состоит",
+            disp_start_date=date(2019, 6, 1),
+            disp_end_date=date(2021, 2, 1),
+            remove_reason="выздоровел",
+        )
+
+    def assertRegister(self, row, end_date, reason):
+        row.refresh_from_db()
+        self.assertEqual((row.disp_end_date, row.remove_reason), (end_date, reason))
+
+    def test_death_closes_and_deletion_reopens_registers(self):
+        death = Death.objects.create(
+            patient=self.patient,
+            death_date=date(2023, 5, 10),
+            death_place="дома",
+            death_cause="I21.0",
+        )
+        self.assertRegister(self.open, date(2023, 5, 10), "умер")
+        self.assertRegister(self.closed, date(2021, 2, 1), "выздоровел")
+
+        death.delete()
+        self.assertRegister(self.open, None, None)
+        self.assertRegister(self.closed, date(2021, 2, 1), "выздоровел")
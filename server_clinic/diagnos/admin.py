@@ -1,38 +1,88 @@
 # server_clinic/diagnos/admin.py
 from django.contrib import admin
+from django.core.exceptions import ValidationError
 from .models import Diagnosis
+from server_clinic.bulk_actions import BulkAction, BulkActionMixin
+from server_clinic.caching import CachedAllValuesFieldListFilter, label_column
+from server_clinic.exports import ExportMixin
+from server_clinic.importers import ImportMixin
+from server_clinic.intervals import MovementReportMixin
+from server_clinic.large_tables import LargeTableAdminMixin
+from patient.autocomplete import PatientAutocompleteMixin
+from mkb.autocomplete import Icd10AutocompleteMixin
 from django.utils import timezone
 from django.db.models import DateField
 from django.contrib.admin.widgets import AdminDateWidget
 from django.contrib.admin.filters import DateFieldListFilter
+from server_clinic.validators import validate_disp_end_date, validate_remove_reason
 
 
-class DiagnosisAdmin(admin.ModelAdmin):
+# Снятие с учёта по выздоровлению сегодняшним днём. Проверяются те же правила
+# дат и причины, что в Diagnosis.clean(); код МКБ не меняется и не проверяется
+class MarkRecovered(BulkAction):
+    label = "Отметить как снятых с учёта (выздоровели)"
+    validators = (validate_remove_reason, validate_disp_end_date)
+
+    def values(self):
+        return {"disp_end_date": timezone.localdate(), "remove_reason": "выздоровел"}
+
+    def check(self, obj):
+        if obj.disp_end_date:
+            raise ValidationError("Уже снят с учёта")
+
+
+class DiagnosisAdmin(
+    BulkActionMixin,
+    MovementReportMixin,
+    ImportMixin,
+    ExportMixin,
+    LargeTableAdminMixin,
+    PatientAutocompleteMixin,
+    Icd10AutocompleteMixin,
+    admin.ModelAdmin,
+):
     # Отображение полей в списке
     list_display = (
-        "patient",
+        "full_name",
         "mkb_code",
-        "disp_status",
+        label_column(Diagnosis, "disp_status"),
         "disp_start_date",
         "disp_end_date",
-        "remove_reason",
+        label_column(Diagnosis, "remove_reason"),
     )
 
     # Фильтрация по полям
     list_filter = (
         "disp_status",
+        ("icd_chapter", CachedAllValuesFieldListFilter),
+        "filial",
+        "gender",
         ("disp_start_date", DateFieldListFilter),
         ("disp_end_date", DateFieldListFilter),
         "remove_reason",
     )
 
+    # Поля выгрузки CSV/JSONL
+    import_register = "diagnoses"
+    export_fields = (
+        "full_name",
+        "patient__insurance_number",
+        "mkb_code",
+        "disp_status",
+        "primary_reason",
+        "disp_start_date",
+        "disp_end_date",
+        "remove_reason",
+        "comment",
+    )
+
     # Поиск по полю
-    search_fields = ["patient__insurance_number"]
+    search_fields = ["patient__insurance_number", "full_name"]
 
     autocomplete_fields = ["patient"]
 
-    # Оптимизация запросов к БД
-    list_select_related = ["patient"]
+    # ФИО, пол и филиал — копии в самой таблице: список без соединения с patient
+    list_select_related = False
 
     # Группировка полей в форме
     fieldsets = (
@@ -63,16 +113,8 @@ class DiagnosisAdmin(admin.ModelAdmin):
         ),
     )
 
-    # Настройки для массового изменения
-    actions = ["mark_as_removed"]
-
-    def mark_as_removed(self, request, queryset):
-        queryset.update(disp_end_date=timezone.now(), remove_reason="выздоровел")
-
-    mark_as_removed.short_description = "Отметить как снятых с учёта (выздоровели)"
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related("patient")
+    # Массовые изменения пачками (server_clinic/bulk_actions.py)
+    bulk_actions = {"mark_as_removed": MarkRecovered()}
 
 
 # Регистрация модели в админке
@@ -1,7 +1,17 @@
 # server_clinic/diagnos/apps.py
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class DiagnosConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "diagnos"
+
+    def ready(self):
+        from server_clinic.intervals import register_changed
+
+        # Кэшированные снимки движения регистра, фильтры и фасеты списка
+        # устаревают при любой правке
+        model = self.get_model("Diagnosis")
+        post_save.connect(register_changed, sender=model)
+        post_delete.connect(register_changed, sender=model)
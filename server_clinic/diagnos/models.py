@@ -1,6 +1,9 @@
 # server_clinic/diagnos/models.py
 from django.db import models
+from mkb.models import IcdCodedModel, IcdRubric
 from patient.models import Patient
+from server_clinic.intervals import IntervalQuerySet
+from server_clinic.mixins import PatientSnapshotModel
 from server_clinic.constants import (
     DISP_STATUS_CHOICES,
     PRIMARY_REASON_CHOICES,
@@ -14,7 +17,12 @@ from server_clinic.validators import (
 )
 
 
-class Diagnosis(models.Model):
+class Diagnosis(IcdCodedModel, PatientSnapshotModel):
+    snapshot_age_field = "disp_start_date"  # возраст при взятии на учёт
+    # Период диспансерного наблюдения (server_clinic/intervals.py)
+    interval_start_field = "disp_start_date"
+    interval_end_field = "disp_end_date"
+
     # Поля для диспансерного наблюдения
     patient = models.ForeignKey(
         Patient,
@@ -51,7 +59,7 @@ class Diagnosis(models.Model):
         verbose_name="Дата взятия на ДН",
         help_text="Дата начала диспансерного наблюдения",
     )
-    
+
     disp_end_date = models.DateField(
         blank=True, null=True, verbose_name="Дата снятия с ДН"
     )
@@ -70,8 +78,11 @@ class Diagnosis(models.Model):
         verbose_name="Комментарий",
     )
 
+    objects = IntervalQuerySet.as_manager()
+
     # Валидация модели
     def clean(self):
+        super().clean()
         # Валидация primary_reason
         validate_primary_reason(self)
         # Валидация remove_reason
@@ -80,7 +91,8 @@ class Diagnosis(models.Model):
         validate_disp_end_date(self)
 
     def __str__(self):
-        return f"{self.patient} - {self.mkb_code}"
+        # ФИО из копии в строке: без обращения к пациенту
+        return f"{self.full_name} - {self.mkb_code}"
 
     class Meta:
         verbose_name = "Диагноз"
@@ -89,3 +101,42 @@ class Diagnosis(models.Model):
         unique_together = (
             ("patient", "mkb_code"),
         )  # Уникальность по полису и коду МКБ-10
+        # Под список админки: фильтр, затем сортировка с pk (его добавляет
+        # keyset-пагинация). Частичные — только строки, стоящие на учёте
+        indexes = [
+            models.Index(
+                fields=["-disp_start_date", "-id"], name="diagnosis_start_idx"
+            ),
+            models.Index(
+                fields=["disp_status", "-disp_start_date", "-id"],
+                name="diagnosis_status_start_idx",
+            ),
+            models.Index(
+                fields=["icd_chapter", "-disp_start_date", "-id"],
+                name="diagnosis_chapter_start_idx",
+            ),
+            models.Index(
+                fields=["filial", "-disp_start_date", "-id"],
+                name="diagnosis_filial_start_idx",
+            ),
+            models.Index(
+                fields=["disp_end_date", "-disp_start_date", "-id"],
+                name="diagnosis_end_start_idx",
+            ),
+            models.Index(
+                fields=["remove_reason", "-disp_start_date", "-id"],
+                condition=models.Q(remove_reason__isnull=False),
+                name="diagnosis_removed_start_idx",
+            ),
+            models.Index(
+                fields=["-disp_start_date", "-id"],
+                condition=models.Q(disp_end_date__isnull=True),
+                name="diagnosis_open_start_idx",
+            ),
+            models.Index(
+                fields=["patient"],
+                condition=models.Q(disp_end_date__isnull=True),
+                name="diagnosis_open_patient_idx",
+            ),
+            models.Index(IcdRubric("mkb_code"), name="diagnosis_rubric_idx"),
+        ]
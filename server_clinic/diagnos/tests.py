@@ -1,4 +1,131 @@
 # server_clinic/diagnos/tests.py
-from django.test import TestCase
+from collections import Counter
+from datetime import date, timedelta
+from unittest import skipUnless
+from django.apps import apps
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from patient.models import Patient
 
-# Create your tests here.
+# Периоды учёта (начало, окончание): открытые, снятые, снятые в день начала
+# и ошибка ввода — окончание раньше начала
+PERIODS = (
+    (date(2020, 1, 10), None),
+    (date(2020, 1, 10), date(2020, 3, 1)),
+    (date(2020, 2, 1), date(2020, 2, 1)),
+    (date(2020, 2, 15), None),
+    (date(2020, 3, 1), date(2020, 2, 1)),
+    (date(2020, 3, 31), date(2020, 4, 30)),
+)
+CODES = ("I10", "E11", "J45", "K29", "M54", "N18")
+
+
+# Число состоящих по накопленным суммам (IntervalCounts) совпадает с прямым
+# запросом IntervalQuerySet.on_date на каждую дату
+@skipUnless(apps.is_installed("diagnos"), "приложение diagnos не подключено")
+class IntervalCountsTests(TestCase):
+    def setUp(self):
+        self.model = apps.get_model("diagnos", "Diagnosis")
+        for number, filial in enumerate(("1", "2")):
+            patient = Patient.objects.create(
+                full_name="Иванов Иван Иванович",
+                birth_date=date(1960, 5, 20),
+                gender="М",
+                filial=filial,
+                insurance_number=f"100000000000000{number}",
+            )
+            for code, (start, end) in zip(CODES, PERIODS):
+                self.model.objects.create(
+                    patient=patient,
+                    mkb_code=code,
+                    disp_status="состоит",
+                    disp_start_date=start,
+                    disp_end_date=end,
+                )
+
+    def test_on_date_matches_queryset(self):
+        counts = self.model.objects.interval_counts(["filial"])
+        day = date(2020, 1, 1)
+        while day <= date(2020, 5, 31):
+            expected = Counter(
+                (filial,)
+                for filial in self.model.objects.on_date(day).values_list(
+                    "filial", flat=True
+                )
+            )
+            self.assertEqual(counts.on_date(day), expected, day)
+            self.assertEqual(
+                sum(counts.on_date(day).values()),
+                self.model.objects.on_date(day).count(),
+                day,
+            )
+            day += timedelta(days=1)
+
+
+# Массовое действие MarkRecovered (BulkAction): пачками, с проверкой каждой
+# строки; проверка без изменений ничего не пишет
+@skipUnless(apps.is_installed("diagnos"), "приложение diagnos не подключено")
+@override_settings(BULK_CHUNK_PAUSE=0)
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.model = apps.get_model("diagnos", "Diagnosis")
+        patient = Patient.objects.create(
+            full_name="Петров Пётр Петрович",
+            birth_date=date(1970, 8, 3),
+            gender="М",
+            filial="1",
+            insurance_number="2000000000000001",
+        )
+        today = timezone.localdate()
+        # Открытая; уже снятая; начатая завтра (дата снятия раньше начала)
+        rows = (
+            ("I10", today - timedelta(days=100), None, None),
+            ("E11", today - timedelta(days=100), today - timedelta(days=10), "умер"),
+            ("J45", today + timedelta(days=1), None, None),
+        )
+        self.rows = [
+            self.model.objects.create(
+                patient=patient,
+                mkb_code=code,
+                disp_status="состоит",
+                disp_start_date=start,
+                disp_end_date=end,
+                remove_reason=reason,
+            )
+            for code, start, end, reason in rows
+        ]
+
+    def run_action(self, dry_run):
+        from .admin import MarkRecovered
+
+        action = MarkRecovered()
+        action.chunk_size = 2
+        return action.run(self.model.objects.all(), dry_run=dry_run)
+
+    def state(self):
+        return list(
+            self.model.objects.order_by("pk").values_list(
+                "disp_end_date", "remove_reason"
+            )
+        )
+
+    def test_dry_run_changes_nothing(self):
+        before = self.state()
+        result = self.run_action(dry_run=True)
+        self.assertEqual((result.processed, result.updated), (3, 0))
+        self.assertEqual(len(result.failures), 2)
+        self.assertEqual(self.state(), before)
+
+    def test_row_failures_are_collected(self):
+        opened, closed, future = self.rows
+        result = self.run_action(dry_run=False)
+        self.assertEqual((result.processed, result.updated), (3, 1))
+        self.assertEqual([pk for pk, _, _ in result.failures], [closed.pk, future.pk])
+        self.assertEqual(
+            self.state(),
+            [
+                (timezone.localdate(), "выздоровел"),
+                (closed.disp_end_date, "умер"),
+                (None, None),
+            ],
+        )
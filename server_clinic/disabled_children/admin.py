@@ -1,9 +1,15 @@
 # server_clinic/disabled_children/admin.py
 from django.contrib import admin
-from django.db.models import Q
 from django import forms
 from django.core.exceptions import ValidationError
 from .models import DisabledChild
+from server_clinic.caching import CachedAllValuesFieldListFilter, label_column
+from server_clinic.exports import ExportMixin
+from server_clinic.importers import ImportMixin
+from server_clinic.intervals import MovementReportMixin
+from server_clinic.large_tables import LargeTableAdminMixin
+from mkb.autocomplete import Icd10AutocompleteMixin
+from patient.autocomplete import PatientAutocompleteMixin
 
 
 # Форма для админ-интерфейса
@@ -49,15 +55,7 @@ class DisabledChildAdminForm(forms.ModelForm):
 
     def clean(self):
         cleaned_data = super().clean()
-        # Проверка уникальности пациента
-        if (
-            DisabledChild.objects.filter(patient=cleaned_data.get("patient"))
-            .exclude(pk=self.instance.pk)
-            .exists()
-        ):
-            raise ValidationError(
-                "Для этого пациента уже существует запись о инвалидности"
-            )
+        # Уникальность пациента проверяет validate_unique модели (patient — первичный ключ)
 
         # Проверка соответствия полиса и пациента
         if (
@@ -73,22 +71,48 @@ class DisabledChildAdminForm(forms.ModelForm):
 
 
 @admin.register(DisabledChild)
-class DisabledChildAdmin(admin.ModelAdmin):
+class DisabledChildAdmin(
+    MovementReportMixin,
+    ImportMixin,
+    ExportMixin,
+    LargeTableAdminMixin,
+    PatientAutocompleteMixin,
+    Icd10AutocompleteMixin,
+    admin.ModelAdmin,
+):
     # form = DisabledChildAdminForm
     list_display = (
-        "patient",
-        "status",
+        "full_name",
+        label_column(DisabledChild, "status"),
         "disability_date",
         "palliative",
-        "removal_reason",
+        label_column(DisabledChild, "removal_reason"),
         "removal_date",
     )
     list_filter = (
         "status",
+        ("icd_chapter", CachedAllValuesFieldListFilter),
+        "filial",
         "palliative",
         "removal_reason",
     )
     search_fields = ("patient__insurance_number",)
+    # ФИО и филиал — копии в самой таблице: список без соединения с patient
+    list_select_related = False
+    # Выбор пациента поиском, а не списком всех пациентов
+    autocomplete_fields = ["patient"]
+    import_register = "disabled_children"
+    export_fields = (
+        "full_name",
+        "patient__insurance_number",
+        "birth_date",
+        "mkb_code",
+        "status",
+        "disability_date",
+        "palliative",
+        "removal_reason",
+        "removal_date",
+    )
     ordering = ("-disability_date",)
 
     fieldsets = (
@@ -125,25 +149,6 @@ class DisabledChildAdmin(admin.ModelAdmin):
             )
         return ()
 
-    def save_model(self, request, obj, form, change):
-        # Добавляем проверку на уникальность перед сохранением
-        if (
-            DisabledChild.objects.filter(patient=obj.patient)
-            .exclude(pk=obj.pk)
-            .exists()
-        ):
-            raise ValidationError("Для этого пациента уже существует запись")
-
-        super().save_model(request, obj, form, change)
-
-    def get_search_results(self, request, queryset, search_term):
-        queryset, use_distinct = super().get_search_results(
-            request, queryset, search_term
-        )
-        # Оптимизированный поиск только по полису
-        queryset = queryset.filter(Q(patient__insurance_number__icontains=search_term))
-        return queryset, use_distinct
-
     def has_add_permission(self, request):
         # Добавляем дополнительную проверку при создании
         return True
@@ -0,0 +1,74 @@
+# server_clinic/disabled_children/aging.py
+from collections import Counter
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from patient.models import BirthdayAt, birth_date_bounds, birthday_at
+from server_clinic.intervals import invalidate_snapshots
+from .models import DisabledChild
+
+ADULT_AGE = 18
+ADULT_REASON = "adult"
+
+
+# Последняя дата рождения, при которой к дате day уже исполнилось 18
+def adult_born_by(day):
+    return birth_date_bounds(min_age=ADULT_AGE, on=day)["lte"]
+
+
+# Стоящие на учёте, кому к дате day исполнилось 18: диапазон по снимку даты
+# рождения под частичный индекс открытых записей (disabled_child_open_birth_idx)
+def aging_out(day):
+    return DisabledChild.objects.filter(
+        removal_date__isnull=True, birth_date__lte=adult_born_by(day)
+    )
+
+
+# Инвалидность установлена уже после 18 лет: дата снятия раньше даты установки
+# не пройдёт validate_date_removal — такие записи разбираются вручную
+def conflicting(day):
+    return aging_out(day).filter(
+        disability_date__gt=BirthdayAt("birth_date", ADULT_AGE)
+    )
+
+
+# Снятие с учёта по достижению 18 лет одним UPDATE: дата снятия — день
+# 18-летия, а не дата запуска. Затрагивает только открытые записи, поэтому
+# повторный или прерванный запуск безопасно выполнить ещё раз
+@transaction.atomic
+def close_adults(day=None, dry_run=False):
+    day = day or date.today()
+    rows = aging_out(day).exclude(
+        disability_date__gt=BirthdayAt("birth_date", ADULT_AGE)
+    )
+    if dry_run:
+        return rows.count()
+    closed = rows.update(
+        removal_reason=ADULT_REASON,
+        removal_date=BirthdayAt("birth_date", ADULT_AGE),
+    )
+    if closed:
+        invalidate_snapshots(DisabledChild)
+    return closed
+
+
+# Стоящие на учёте, кому 18 исполнится с start по end включительно
+def upcoming(start, end):
+    return (
+        aging_out(end)
+        .filter(birth_date__gt=adult_born_by(start - timedelta(days=1)))
+        .order_by("birth_date")
+    )
+
+
+# Прогноз: сколько стоящих на учёте достигнут 18 лет в каждом из months
+# месяцев начиная с месяца start — {первое число месяца: число}
+def projection(start=None, months=12):
+    start = (start or date.today()).replace(day=1)
+    firsts = [start + relativedelta(months=number) for number in range(months)]
+    end = start + relativedelta(months=months) - timedelta(days=1)
+    counts = Counter(
+        birthday_at(birth_date, ADULT_AGE).replace(day=1)
+        for birth_date in upcoming(start, end).values_list("birth_date", flat=True)
+    )
+    return {first: counts[first] for first in firsts}
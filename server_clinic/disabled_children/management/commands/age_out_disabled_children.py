@@ -0,0 +1,69 @@
+# server_clinic/disabled_children/management/commands/age_out_disabled_children.py
+from datetime import date
+from django.core.management.base import BaseCommand
+from disabled_children.aging import (
+    ADULT_AGE,
+    close_adults,
+    conflicting,
+    projection,
+    upcoming,
+)
+from patient.models import birthday_at
+from server_clinic.intervals import month_end
+
+
+class Command(BaseCommand):
+    help = (
+        "Снимает с учёта детей-инвалидов, достигших 18 лет к дате (по умолчанию "
+        "сегодня): причина «Выбыл по достижению 18 лет», дата снятия — день "
+        "18-летия. Рассчитана на ежесуточный запуск из cron; повторный запуск "
+        "ничего не меняет. С --project показывает, кто выбудет в ближайшие месяцы"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date", type=date.fromisoformat, help="Дата ГГГГ-ММ-ДД (сегодня)"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Только посчитать, не снимать"
+        )
+        parser.add_argument(
+            "--project",
+            type=int,
+            metavar="MONTHS",
+            help="Прогноз выбывающих на MONTHS месяцев вместо снятия",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="С --project: перечислить пациентов"
+        )
+
+    def handle(self, *args, **options):
+        day = options["date"] or date.today()
+        if options["project"]:
+            return self.project(day, options["project"], options["list"])
+        closed = close_adults(day, dry_run=options["dry_run"])
+        verb = "Будет снято" if options["dry_run"] else "Снято с учёта"
+        self.stdout.write(self.style.SUCCESS(f"{verb}: {closed}"))
+        for child in conflicting(day).only("patient", "full_name", "birth_date"):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Инвалидность установлена после 18 лет, снимите вручную: "
+                    f"{child.full_name} ({child.birth_date:%d.%m.%Y}), "
+                    f"пациент {child.pk}"
+                )
+            )
+
+    def project(self, day, months, listing):
+        counts = projection(day, months)
+        for month, count in counts.items():
+            self.stdout.write(f"{month:%m.%Y}  {count}")
+        self.stdout.write(f"Всего: {sum(counts.values())}")
+        if listing:
+            children = upcoming(min(counts), month_end(max(counts))).only(
+                "patient", "full_name", "birth_date"
+            )
+            for child in children:
+                self.stdout.write(
+                    f"{birthday_at(child.birth_date, ADULT_AGE):%d.%m.%Y}  "
+                    f"{child.full_name}, пациент {child.pk}"
+                )
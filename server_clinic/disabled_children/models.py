@@ -1,7 +1,10 @@
 # server_clinic/disabled_children/models.py
 from django.db import models
+from mkb.models import IcdCodedModel, IcdRubric
 from patient.models import Patient
 from server_clinic.constants import STATUS_CHOICES, REMOVAL_REASONS
+from server_clinic.intervals import IntervalQuerySet
+from server_clinic.mixins import PatientSnapshotModel
 from server_clinic.validators import (
     validate_icd10_format,
     validate_status_date_consistency,
@@ -9,7 +12,12 @@ from server_clinic.validators import (
 )
 
 
-class DisabledChild(models.Model):
+class DisabledChild(IcdCodedModel, PatientSnapshotModel):
+    snapshot_age_field = "disability_date"  # возраст при установке инвалидности
+    # Период учёта (server_clinic/intervals.py)
+    interval_start_field = "disability_date"
+    interval_end_field = "removal_date"
+
     patient = models.OneToOneField(
         Patient,
         on_delete=models.CASCADE,
@@ -67,10 +75,13 @@ class DisabledChild(models.Model):
         blank=True,
     )  # Примечания
 
+    objects = IntervalQuerySet.as_manager()
+
     def __str__(self):
-        return f"{self.patient} - {self.get_status_display()}"
+        return f"{self.full_name} - {self.get_status_display()}"
 
     def clean(self):
+        super().clean()
         # Проверка связи между статусом и датой
         validate_status_date_consistency(self)
         # Дополнительная валидация даты снятия
@@ -79,3 +90,46 @@ class DisabledChild(models.Model):
     class Meta:
         verbose_name = "Ребенок-инвалид"
         verbose_name_plural = "Дети-инвалиды"
+        # Под список админки: фильтр, затем сортировка с pk (его добавляет
+        # keyset-пагинация). Частичные — редкие значения и стоящие на учёте.
+        # В PostgreSQL keyset сортирует NULLS LAST — там свои индексы
+        # (server_clinic/postgres.py)
+        indexes = [
+            models.Index(
+                fields=["-disability_date", "-patient"], name="disabled_child_date_idx"
+            ),
+            models.Index(
+                fields=["status", "-disability_date", "-patient"],
+                name="disabled_child_status_idx",
+            ),
+            models.Index(
+                fields=["icd_chapter", "-disability_date", "-patient"],
+                name="disabled_child_chapter_idx",
+            ),
+            models.Index(
+                fields=["filial", "-disability_date", "-patient"],
+                name="disabled_child_filial_idx",
+            ),
+            models.Index(
+                fields=["-disability_date", "-patient"],
+                condition=models.Q(palliative=True),
+                name="disabled_child_palliative_idx",
+            ),
+            models.Index(
+                fields=["removal_reason", "-disability_date", "-patient"],
+                condition=models.Q(removal_reason__isnull=False),
+                name="disabled_child_removed_idx",
+            ),
+            models.Index(
+                fields=["-disability_date", "-patient"],
+                condition=models.Q(removal_date__isnull=True),
+                name="disabled_child_open_idx",
+            ),
+            models.Index(IcdRubric("mkb_code"), name="disabled_child_rubric_idx"),
+            # Выбывающие по достижению 18 лет (disabled_children/aging.py)
+            models.Index(
+                fields=["birth_date"],
+                condition=models.Q(removal_date__isnull=True),
+                name="disabled_child_open_birth_idx",
+            ),
+        ]
@@ -1,4 +1,79 @@
 # server_clinic/disabled_children/tests.py
+from datetime import date
+from unittest import skipUnless
+from django.apps import apps
 from django.test import TestCase
+from patient.models import Patient
 
-# Create your tests here.
+TODAY = date(2024, 6, 15)
+
+
+# Снятие с учёта по достижению 18 лет (aging.close_adults)
+@skipUnless(
+    apps.is_installed("disabled_children"), "приложение disabled_children не подключено"
+)
+class CloseAdultsTests(TestCase):
+    def setUp(self):
+        self.model = apps.get_model("disabled_children", "DisabledChild")
+        # ФИО: дата рождения, дата установки, (дата снятия, причина)
+        rows = {
+            "Взрослый": (date(2005, 3, 10), date(2015, 1, 1), (None, None)),
+            "Сегодня18": (date(2006, 6, 15), date(2016, 1, 1), (None, None)),
+            "Ребёнок": (date(2010, 1, 1), date(2018, 1, 1), (None, None)),
+            "Поздняя": (date(2004, 1, 1), date(2023, 5, 1), (None, None)),
+            "Выбыл": (date(2003, 1, 1), date(2012, 1, 1), (date(2019, 5, 5), "moved")),
+        }
+        for number, (name, (birth, disability, removal)) in enumerate(rows.items()):
+            patient = Patient.objects.create(
+                full_name=name,
+                birth_date=birth,
+                gender="Ж",
+                filial="1",
+                insurance_number=f"100000000000000{number}",
+            )
+            self.model.objects.create(
+                patient=patient,
+                mkb_code="G80",
+                disability_date=disability,
+                removal_date=removal[0],
+                removal_reason=removal[1],
+            )
+
+    # ФИО → (дата снятия, причина)
+    def removals(self):
+        return {
+            name: (removal_date, reason)
+            for name, removal_date, reason in self.model.objects.values_list(
+                "full_name", "removal_date", "removal_reason"
+            )
+        }
+
+    def test_closes_on_eighteenth_birthday(self):
+        from .aging import close_adults, conflicting
+
+        self.assertEqual(close_adults(TODAY), 2)
+        removals = self.removals()
+        self.assertEqual(removals["Взрослый"], (date(2023, 3, 10), "adult"))
+        self.assertEqual(removals["Сегодня18"], (TODAY, "adult"))
+        self.assertEqual(removals["Ребёнок"], (None, None))
+        self.assertEqual(removals["Выбыл"], (date(2019, 5, 5), "moved"))
+        # Инвалидность установлена после 18: остаётся на ручной разбор
+        self.assertEqual(removals["Поздняя"], (None, None))
+        self.assertEqual(
+            list(conflicting(TODAY).values_list("full_name", flat=True)), ["Поздняя"]
+        )
+
+    def test_second_run_changes_nothing(self):
+        from .aging import close_adults
+
+        close_adults(TODAY)
+        before = self.removals()
+        self.assertEqual(close_adults(TODAY), 0)
+        self.assertEqual(self.removals(), before)
+
+    def test_dry_run_changes_nothing(self):
+        from .aging import close_adults
+
+        before = self.removals()
+        self.assertEqual(close_adults(TODAY, dry_run=True), 2)
+        self.assertEqual(self.removals(), before)
@@ -0,0 +1,144 @@
+# server_clinic/jobs/admin.py
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import Job
+from .queue import cancel, submit
+from .registry import TASKS, task_label
+
+
+class KindListFilter(admin.SimpleListFilter):
+    title = "Тип"
+    parameter_name = "kind"
+
+    def lookups(self, request, model_admin):
+        return [(name, item.label) for name, item in TASKS.items()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(kind=self.value())
+        return queryset
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "__str__",
+        "kind_label",
+        "status",
+        "progress_display",
+        "created_by",
+        "created_at",
+        "finished_at",
+        "result_link",
+    )
+    list_filter = ("status", KindListFilter)
+    list_select_related = ("created_by",)
+    readonly_fields = (
+        "kind_label",
+        "title",
+        "params",
+        "status",
+        "progress_display",
+        "message",
+        "result_link",
+        "error",
+        "created_by",
+        "worker",
+        "created_at",
+        "started_at",
+        "heartbeat_at",
+        "finished_at",
+    )
+    fields = readonly_fields
+    actions = ["cancel_jobs"]
+    change_form_template = "admin/jobs/job_change_form.html"
+
+    # Сотрудник видит только свои задачи
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.user.is_superuser:
+            return queryset
+        return queryset.filter(created_by=request.user)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def kind_label(self, obj):
+        return task_label(obj.kind)
+
+    kind_label.short_description = "Тип"
+
+    def progress_display(self, obj):
+        if obj.percent is not None:
+            return f"{obj.progress} из {obj.total} ({obj.percent}%)"
+        return obj.progress or "-"
+
+    progress_display.short_description = "Прогресс"
+
+    def result_link(self, obj):
+        if not obj.result:
+            return "-"
+        return format_html(
+            '<a href="{}">Скачать</a>',
+            reverse("admin:jobs_job_download", args=(obj.pk,)),
+        )
+
+    result_link.short_description = "Результат"
+
+    def cancel_jobs(self, request, queryset):
+        count = cancel(queryset)
+        self.message_user(request, f"Отменено задач: {count}")
+
+    cancel_jobs.short_description = "Отменить выбранные задачи"
+
+    def get_urls(self):
+        custom_urls = [
+            path(
+                "<int:job_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="jobs_job_download",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    # Файлы результатов не раздаются как статика: только через права админки
+    def download_view(self, request, job_id):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        job = get_object_or_404(self.get_queryset(request), pk=job_id)
+        if not job.result:
+            raise Http404
+        return FileResponse(
+            job.result.open("rb"),
+            as_attachment=True,
+            filename=job.result.name.rsplit("/", 1)[-1],
+        )
+
+    # Вместо формы добавления — запуск задачи с формой параметров её типа
+    def add_view(self, request, form_url="", extra_context=None):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        kind = request.POST.get("kind") or request.GET.get("kind")
+        item = TASKS.get(kind)
+        form = None
+        if item is not None and item.form is not None:
+            form = item.form(request.POST or None)
+            if request.method == "POST" and form.is_valid():
+                job = submit(kind, form.cleaned_data, request.user, title=item.label)
+                messages.info(request, f"Задача поставлена в очередь: {job}")
+                return redirect("admin:jobs_job_change", job.pk)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Запуск фоновой задачи",
+            "tasks": [value for value in TASKS.values() if value.form is not None],
+            "task": item,
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/jobs/job_submit.html", context)
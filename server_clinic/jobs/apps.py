@@ -0,0 +1,17 @@
+# server_clinic/jobs/apps.py
+from django.apps import AppConfig
+from django.db.models.signals import post_delete
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+    verbose_name = "Фоновые задачи"
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+        from .signals import delete_result
+
+        # Типы задач из tasks.py всех приложений
+        autodiscover_modules("tasks")
+        post_delete.connect(delete_result, sender=self.get_model("Job"))
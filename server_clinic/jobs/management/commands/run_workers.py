@@ -0,0 +1,62 @@
+# server_clinic/jobs/management/commands/run_workers.py
+import multiprocessing
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs.registry import concurrency_limits, task_label
+from jobs.worker import POLL_SECONDS, work
+
+WORKERS = 2
+
+
+class Command(BaseCommand):
+    help = (
+        "Запускает процессы, выполняющие фоновые задачи из очереди (выгрузки, "
+        "отчёты, массовые действия админки). Ctrl+C или SIGTERM: текущие задачи "
+        "доделываются, новые не берутся"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=getattr(settings, "JOB_WORKERS", WORKERS),
+            help="Число процессов-воркеров",
+        )
+        parser.add_argument(
+            "--poll", type=float, default=POLL_SECONDS, help="Опрос очереди, секунд"
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить задачи из очереди и завершиться (для cron)",
+        )
+
+    def handle(self, *args, **options):
+        for name, limit in concurrency_limits().items():
+            self.stdout.write(f"{task_label(name)} ({name}): до {limit} одновременно")
+        kwargs = {"poll": options["poll"], "once": options["once"]}
+        if options["processes"] <= 1:
+            work(**kwargs)
+            return
+        # Подключения родителя не должны достаться дочерним процессам
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, kwargs=kwargs, daemon=False)
+            for _ in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+
+        # Сигнал останавливает воркеров; родитель ждёт их завершения
+        def stop(signum, frame):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C получают и воркеры
+        for process in processes:
+            process.join()
+        self.stdout.write(self.style.SUCCESS("Воркеры остановлены"))
@@ -0,0 +1,125 @@
+# server_clinic/jobs/models.py
+import os
+import tempfile
+import time
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+# Как часто задача пишет прогресс в базу и проверяет отмену, секунд
+PROGRESS_INTERVAL = 1.0
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Задача фоновой очереди: создаётся в админке, выполняется run_workers
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Готово"),
+        (FAILED, "Ошибка"),
+        (CANCELLED, "Отменена"),
+    ]
+    FINISHED = (DONE, FAILED, CANCELLED)
+
+    kind = models.CharField(max_length=50, verbose_name="Тип")
+    title = models.CharField(max_length=200, blank=True, verbose_name="Описание")
+    params = models.JSONField(
+        default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Параметры"
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=QUEUED, verbose_name="Статус"
+    )
+    progress = models.PositiveIntegerField(default=0, verbose_name="Выполнено")
+    total = models.PositiveIntegerField(null=True, blank=True, verbose_name="Всего")
+    message = models.CharField(max_length=500, blank=True, verbose_name="Сообщение")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    result = models.FileField(
+        upload_to="jobs/%Y/%m/", blank=True, verbose_name="Файл результата"
+    )
+    cancel_requested = models.BooleanField(default=False, verbose_name="Отмена")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Автор",
+    )
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Воркер")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создана")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Начата")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершена")
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Последний отклик"
+    )
+
+    def __str__(self):
+        return f"#{self.pk} {self.title or self.kind}"
+
+    # Прогресс из задачи: пишется не чаще PROGRESS_INTERVAL, заодно проверяется
+    # отмена из админки (JobCancelled прерывает задачу)
+    def report(self, progress, total=None, message=None, force=False):
+        self.progress = progress
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message[:500]
+        now = time.monotonic()
+        if not force and now - getattr(self, "_reported", 0) < PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        Job.objects.filter(pk=self.pk).update(
+            progress=self.progress,
+            total=self.total,
+            message=self.message,
+            heartbeat_at=timezone.now(),
+        )
+        if Job.objects.filter(pk=self.pk, cancel_requested=True).exists():
+            raise JobCancelled
+
+    # Результат — построчно из генератора: через временный файл в хранилище
+    # (MEDIA_ROOT), без сборки всего содержимого в памяти
+    def save_result(self, filename, chunks):
+        tmp = tempfile.NamedTemporaryFile("w+b", delete=False)
+        try:
+            for chunk in chunks:
+                tmp.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            tmp.seek(0)
+            self.result.save(filename, File(tmp), save=False)
+        finally:
+            tmp.close()
+            os.unlink(tmp.name)
+        Job.objects.filter(pk=self.pk).update(result=self.result.name)
+
+    @property
+    def percent(self):
+        if not self.total:
+            return None
+        return min(100, self.progress * 100 // self.total)
+
+    class Meta:
+        db_table = "job"
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # Выбор следующей задачи воркером: только ожидающие
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status="queued"),
+                name="job_queued_idx",
+            ),
+            models.Index(fields=["status", "kind"], name="job_status_kind_idx"),
+            models.Index(fields=["created_by", "-created_at"], name="job_owner_idx"),
+        ]
@@ -0,0 +1,125 @@
+# server_clinic/jobs/queue.py
+import logging
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+from .models import Job, JobCancelled
+from .registry import concurrency_limits, get_task
+
+logger = logging.getLogger("server_clinic.jobs")
+
+# Выполняющаяся задача без отклика дольше этого срока (секунд) считается
+# брошенной: воркер остановлен или процесс убит
+STALE_SECONDS = 600
+# Ключ рекомендательной блокировки PostgreSQL на выбор задачи
+CLAIM_LOCK_KEY = 7_240_011
+
+
+def stale_seconds():
+    return getattr(settings, "JOB_STALE_SECONDS", STALE_SECONDS)
+
+
+def submit(kind, params=None, user=None, title=""):
+    if get_task(kind) is None:
+        raise ValueError(f"Неизвестный тип задачи: {kind}")
+    return Job.objects.create(
+        kind=kind,
+        params=params or {},
+        created_by=user if user and user.is_authenticated else None,
+        title=title[:200],
+    )
+
+
+# Отмена: ожидающая снимается сразу, выполняющаяся — при следующем report()
+def cancel(queryset):
+    cancelled = queryset.filter(status=Job.QUEUED).update(
+        status=Job.CANCELLED, finished_at=timezone.now()
+    )
+    requested = queryset.filter(status=Job.RUNNING).update(cancel_requested=True)
+    return cancelled + requested
+
+
+# Выбор следующей задачи с учётом лимитов по типам. Выбор сериализуется:
+# в PostgreSQL — блокировкой на время транзакции, в SQLite транзакция и так
+# берёт блокировку записи сразу (transaction_mode IMMEDIATE в settings)
+def claim(worker):
+    limits = concurrency_limits()
+    with transaction.atomic():
+        connection = connections[Job.objects.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CLAIM_LOCK_KEY])
+        running = dict(
+            Job.objects.filter(status=Job.RUNNING)
+            .values_list("kind")
+            .annotate(n=Count("pk"))
+            .order_by()
+        )
+        kinds = [kind for kind, limit in limits.items() if running.get(kind, 0) < limit]
+        if not kinds:
+            return None
+        job = (
+            Job.objects.filter(status=Job.QUEUED, kind__in=kinds)
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status, job.worker = Job.RUNNING, worker
+        job.started_at = job.heartbeat_at = now
+        job.save(update_fields=["status", "worker", "started_at", "heartbeat_at"])
+        return job
+
+
+# Итог пишется только выполняющейся задаче: снятую fail_stale (воркер долго
+# не отвечал) или удалённую задачу он не перезаписывает
+def finish(job, status, error=""):
+    finished_at = timezone.now()
+    updated = Job.objects.filter(pk=job.pk, status=Job.RUNNING).update(
+        status=status,
+        error=error,
+        progress=job.progress,
+        total=job.total,
+        message=job.message,
+        finished_at=finished_at,
+    )
+    if not updated:
+        logger.warning("Задача %s уже снята, итог %s не записан", job, status)
+        try:
+            job.refresh_from_db(fields=["status", "error", "finished_at"])
+        except Job.DoesNotExist:
+            pass
+        return False
+    job.status, job.error, job.finished_at = status, error, finished_at
+    return True
+
+
+def run(job):
+    item = get_task(job.kind)
+    if item is None:
+        finish(job, Job.FAILED, f"Неизвестный тип задачи: {job.kind}")
+        return
+    try:
+        item(job)
+    except JobCancelled:
+        finish(job, Job.CANCELLED)
+    except Exception:
+        logger.exception("Задача %s завершилась ошибкой", job)
+        finish(job, Job.FAILED, traceback.format_exc())
+    else:
+        finish(job, Job.DONE)
+
+
+# Задачи остановленных воркеров: повторять небезопасно (часть работы уже
+# сделана), поэтому они завершаются ошибкой
+def fail_stale():
+    deadline = timezone.now() - timedelta(seconds=stale_seconds())
+    return Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=deadline).update(
+        status=Job.FAILED,
+        error="Воркер перестал отвечать",
+        finished_at=timezone.now(),
+    )
@@ -0,0 +1,45 @@
+# server_clinic/jobs/registry.py
+from django.conf import settings
+
+# Тип задачи → Task. Наполняется модулями tasks.py приложений
+# (autodiscover в JobsConfig.ready), в том числе в процессах воркеров
+TASKS = {}
+
+
+class Task:
+    def __init__(self, name, func, label, concurrency=1, form=None):
+        self.name = name
+        self.func = func
+        self.label = label
+        self.concurrency = concurrency
+        # Форма параметров для страницы запуска; без неё задача запускается
+        # только из кода (например, выгрузка из списка регистра)
+        self.form = form
+
+    def __call__(self, job):
+        return self.func(job, **job.params)
+
+
+# Регистрация функции func(job, **params) как типа задачи. concurrency —
+# сколько задач этого типа выполняется одновременно на всех воркерах
+# (переопределяется JOB_CONCURRENCY в settings)
+def task(name, label, concurrency=1, form=None):
+    def decorator(func):
+        TASKS[name] = Task(name, func, label, concurrency, form)
+        return func
+
+    return decorator
+
+
+def get_task(name):
+    return TASKS.get(name)
+
+
+def concurrency_limits():
+    overrides = getattr(settings, "JOB_CONCURRENCY", {})
+    return {name: overrides.get(name, item.concurrency) for name, item in TASKS.items()}
+
+
+def task_label(name):
+    item = TASKS.get(name)
+    return item.label if item else name
@@ -0,0 +1,7 @@
+# server_clinic/jobs/signals.py
+
+
+# Файл результата удаляется вместе с задачей
+def delete_result(sender, instance, **kwargs):
+    if instance.result:
+        instance.result.delete(save=False)
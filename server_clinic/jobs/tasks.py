@@ -0,0 +1,10 @@
+# server_clinic/jobs/tasks.py
+from server_clinic.bulk_actions import bulk_action_job
+from server_clinic.exports import export_job
+from .registry import task
+
+# Выгрузка списка регистра с фильтрами (ExportMixin.export_background_view)
+task("export", "Выгрузка реестра", concurrency=2)(export_job)
+
+# Массовые действия админки над большими выборками (BulkActionMixin)
+task("bulk_action", "Массовое действие", concurrency=1)(bulk_action_job)
@@ -0,0 +1,99 @@
+# server_clinic/jobs/worker.py
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from django.db import DatabaseError, close_old_connections, connections
+from django.utils import timezone
+from .models import Job
+from .queue import claim, fail_stale, run
+
+logger = logging.getLogger("server_clinic.jobs")
+
+POLL_SECONDS = 2
+HEARTBEAT_SECONDS = 30
+
+
+# Отклик выполняющейся задачи из отдельного потока: задача, долго не
+# вызывающая report(), не будет принята за брошенную. Сбой базы (блокировка,
+# обрыв подключения) не останавливает поток: следующая попытка — через interval
+class Heartbeat(threading.Thread):
+    def __init__(self, job_id, interval=HEARTBEAT_SECONDS):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.interval = interval
+        self.finished = threading.Event()
+
+    def run(self):
+        try:
+            while not self.finished.wait(self.interval):
+                try:
+                    Job.objects.filter(pk=self.job_id, status=Job.RUNNING).update(
+                        heartbeat_at=timezone.now()
+                    )
+                except DatabaseError:
+                    logger.warning(
+                        "Не удалось отметить отклик задачи %s",
+                        self.job_id,
+                        exc_info=True,
+                    )
+                    connections[Job.objects.db].close()
+        finally:
+            connections.close_all()  # подключения этого потока
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+
+
+class Worker:
+    def __init__(self, poll=POLL_SECONDS, once=False):
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.poll = poll
+        self.once = once
+        self.stopping = False
+
+    # SIGTERM/SIGINT: текущая задача доделывается, новые не берутся
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self):
+        logger.info("Воркер %s запущен", self.name)
+        while not self.stopping:
+            close_old_connections()
+            fail_stale()
+            job = claim(self.name)
+            if job is None:
+                if self.once:
+                    break
+                self.sleep()
+                continue
+            heartbeat = Heartbeat(job.pk)
+            heartbeat.start()
+            try:
+                run(job)
+            finally:
+                heartbeat.stop()
+        logger.info("Воркер %s остановлен", self.name)
+
+    def sleep(self):
+        deadline = time.monotonic() + self.poll
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(0.2)
+
+
+# Точка входа процесса воркера (run_workers). При запуске через spawn
+# (Windows) Django настраивается заново
+def work(poll=POLL_SECONDS, once=False):
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+
+        django.setup()
+    worker = Worker(poll=poll, once=once)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
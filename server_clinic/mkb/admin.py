@@ -0,0 +1,32 @@
+# server_clinic/mkb/admin.py
+from django.contrib import admin
+from django.http import JsonResponse
+from django.urls import path
+from .autocomplete import autocomplete
+from .models import Icd10Code
+
+
+@admin.register(Icd10Code)
+class Icd10CodeAdmin(admin.ModelAdmin):
+    list_display = ("code", "title", "chapter", "block")
+    list_filter = ("chapter",)
+    search_fields = ("code", "title")
+    raw_id_fields = ("parent",)
+
+    def get_urls(self):
+        custom_urls = [
+            path(
+                "lookup/",
+                self.admin_site.admin_view(self.lookup_json),
+                name="mkb_icd10code_lookup",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    # Подсказки кода по префиксу для полей ввода кода МКБ-10 в реестрах
+    def lookup_json(self, request):
+        results = autocomplete(request.GET.get("term", ""))
+        return JsonResponse(
+            {"results": [{"code": code, "title": title} for code, title in results]},
+            json_dumps_params={"ensure_ascii": False},
+        )
@@ -0,0 +1,8 @@
+# server_clinic/mkb/apps.py
+from django.apps import AppConfig
+
+
+class MkbConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "mkb"
+    verbose_name = "Справочник МКБ-10"
@@ -0,0 +1,57 @@
+# server_clinic/mkb/autocomplete.py
+import re
+from django import forms
+from django.core.cache import cache
+from django.urls import reverse
+from .dictionary import PREFIX_LIMIT, get_dictionary, normalize_code
+from .models import IcdRubric
+
+PREFIX_CACHE_TIMEOUT = 3600
+# Строка поиска, похожая на код: рубрика с подрубрикой или без ("I21", "I21.0")
+SEARCH_CODE_RE = re.compile(r"^[A-Z]\d{2}(?:\.\d)?$")
+
+
+# Подсказки кодов по префиксу; ключ кэша включает поколение справочника
+def autocomplete(prefix, limit=PREFIX_LIMIT):
+    prefix = normalize_code(prefix)
+    if not prefix:
+        return []
+    dictionary = get_dictionary()
+    key = f"icd10:prefix:{dictionary.generation}:{limit}:{prefix}"
+    found = cache.get(key)
+    if found is None:
+        found = dictionary.prefix(prefix, limit)
+        cache.set(key, found, PREFIX_CACHE_TIMEOUT)
+    return found
+
+
+# Поле кода с подсказками из справочника (datalist, заполняется по мере ввода)
+class Icd10CodeInput(forms.TextInput):
+    template_name = "mkb/widgets/icd10_input.html"
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["lookup_url"] = reverse("admin:mkb_icd10code_lookup")
+        context["widget"]["attrs"]["list"] = f"{context['widget']['attrs']['id']}_list"
+        context["widget"]["attrs"].setdefault("autocomplete", "off")
+        return context
+
+
+# Подключает подсказки к полю кода МКБ-10 реестра (IcdCodedModel.icd_code_field)
+class Icd10AutocompleteMixin:
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if db_field.name == getattr(self.model, "icd_code_field", None):
+            kwargs.setdefault("widget", Icd10CodeInput(attrs={"class": "vTextField"}))
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+    # Поиск по коду ("i21,0" тоже): по индексу рубрики регистра, а не
+    # по ФИО и полису
+    def get_search_results(self, request, queryset, search_term):
+        field = getattr(self.model, "icd_code_field", None)
+        code = normalize_code(search_term)
+        if field is None or not SEARCH_CODE_RE.match(code):
+            return super().get_search_results(request, queryset, search_term)
+        queryset = queryset.alias(icd_rubric=IcdRubric(field)).filter(
+            icd_rubric=code[:3], **{f"{field}__startswith": code}
+        )
+        return queryset, False
@@ -0,0 +1,128 @@
+# server_clinic/mkb/dictionary.py
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from django.apps import apps
+from django.core.cache import cache
+from django.db import DatabaseError
+from server_clinic.constants import ICD10_CHAPTERS
+
+GENERATION_KEY = "icd10:generation"
+# Как часто процесс сверяет поколение справочника с общим кэшем, секунды
+GENERATION_CHECK_INTERVAL = 60
+PREFIX_LIMIT = 20
+
+# Кириллические буквы, похожие на латинские, часто попадают в коды при вводе
+LOOKALIKES = str.maketrans("АВСЕНКМОРТХ", "ABCEHKMOPTX")
+CODE_RE = re.compile(r"^[A-Z]\d{2}(?:\.\d)?$")
+RANGE_RE = re.compile(r"^([A-Z]\d{2})-([A-Z]\d{2})$")
+
+
+# "i21,0 " → "I21.0", "А019" → "A01.9"
+def normalize_code(value):
+    code = str(value or "").strip().upper().translate(LOOKALIKES)
+    code = code.replace(",", ".").replace(" ", "").rstrip(".")
+    if len(code) == 4 and code[1:].isdigit():
+        code = f"{code[:3]}.{code[3]}"
+    return code
+
+
+# Непересекающиеся диапазоны рубрик (первая, последняя, значение):
+# поиск диапазона для кода за O(log n)
+class RangeIndex:
+    def __init__(self, ranges):
+        self.ranges = sorted(ranges)
+        self.starts = [start for start, _, _ in self.ranges]
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def lookup(self, code):
+        rubric = code[:3]
+        position = bisect_right(self.starts, rubric) - 1
+        if position >= 0 and rubric <= self.ranges[position][1]:
+            return self.ranges[position][2]
+        return None
+
+
+CHAPTERS = RangeIndex((start, end, number) for start, end, number, _ in ICD10_CHAPTERS)
+
+
+# Снимок справочника в памяти: отсортированные коды для префиксного поиска
+# и диапазоны блоков
+class Icd10Dictionary:
+    def __init__(self, rows=(), generation=0):
+        self.generation = generation
+        self.titles = {}
+        blocks = []
+        for code, title in rows:
+            match = RANGE_RE.match(code)
+            if match:
+                blocks.append((match.group(1), match.group(2), code))
+            elif CODE_RE.match(code):
+                self.titles[code] = title
+        self.codes = sorted(self.titles)
+        self.blocks = RangeIndex(blocks)
+
+    def __bool__(self):
+        return bool(self.codes)
+
+    def exists(self, code):
+        return code in self.titles
+
+    def title(self, code):
+        return self.titles.get(code)
+
+    def chapter(self, code):
+        return CHAPTERS.lookup(code)
+
+    def block(self, code):
+        return self.blocks.lookup(code)
+
+    def prefix(self, prefix, limit=PREFIX_LIMIT):
+        prefix = normalize_code(prefix)
+        position = bisect_left(self.codes, prefix)
+        found = []
+        for code in self.codes[position : position + limit]:
+            if not code.startswith(prefix):
+                break
+            found.append((code, self.titles[code]))
+        return found
+
+
+_state = {"dictionary": None, "checked": 0.0}
+_lock = threading.Lock()
+
+
+def load_dictionary(generation=0):
+    Icd10Code = apps.get_model("mkb", "Icd10Code")
+    try:
+        rows = list(Icd10Code.objects.values_list("code", "title"))
+    except DatabaseError:  # таблица ещё не создана (миграции)
+        rows = []
+    return Icd10Dictionary(rows, generation)
+
+
+# Справочник процесса; перечитывается после load_icd10 в любом воркере
+def get_dictionary():
+    now = time.monotonic()
+    if _state["dictionary"] is not None and now - _state["checked"] < (
+        GENERATION_CHECK_INTERVAL
+    ):
+        return _state["dictionary"]
+    with _lock:
+        generation = cache.get(GENERATION_KEY, 0)
+        dictionary = _state["dictionary"]
+        if dictionary is None or dictionary.generation != generation:
+            _state["dictionary"] = load_dictionary(generation)
+        _state["checked"] = now
+        return _state["dictionary"]
+
+
+def invalidate_dictionary():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+    _state["dictionary"] = None
@@ -0,0 +1,76 @@
+# server_clinic/mkb/management/commands/classify_icd10.py
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+from mkb.dictionary import get_dictionary, normalize_code
+from mkb.models import IcdCodedModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Нормализует коды МКБ-10 в реестрах и заполняет колонки класса и блока "
+        "(после загрузки справочника или для старых записей)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def save(self, model, changed, fields):
+        try:
+            with transaction.atomic():
+                model._base_manager.bulk_update(changed, fields)
+            return 0
+        except IntegrityError:
+            pass
+        # Нормализация склеила код с уже существующим (i10 и I10 у одного
+        # пациента): такие записи остаются как есть
+        conflicts = 0
+        for obj in changed:
+            try:
+                with transaction.atomic():
+                    model._base_manager.bulk_update([obj], fields)
+            except IntegrityError:
+                conflicts += 1
+        return conflicts
+
+    def classify(self, model, chunk_size):
+        dictionary = get_dictionary()
+        code_field = model.icd_code_field
+        fields = [code_field, "icd_chapter", "icd_block"]
+        queryset = model._base_manager.order_by("pk")
+        last, updated, conflicts = None, 0, 0
+        while True:
+            chunk = queryset if last is None else queryset.filter(pk__gt=last)
+            rows = list(chunk.values_list("pk", *fields)[:chunk_size])
+            if not rows:
+                break
+            changed = []
+            for pk, code, chapter, block in rows:
+                new_code = normalize_code(code)
+                new = (
+                    new_code,
+                    dictionary.chapter(new_code) or "",
+                    dictionary.block(new_code) or "",
+                )
+                if new != (code, chapter, block):
+                    changed.append(model(pk=pk, **dict(zip(fields, new))))
+            if changed:
+                conflicts += self.save(model, changed, fields)
+                updated += len(changed)
+            last = rows[-1][0]
+        return updated, conflicts
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not issubclass(model, IcdCodedModel):
+                continue
+            updated, conflicts = self.classify(model, options["chunk_size"])
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: обновлено {updated - conflicts}, "
+                f"конфликтов {conflicts}"
+            )
+            # Класс МКБ-10 входит в ключ статистики смертности
+            if model._meta.label == "death.Death" and updated:
+                from death.stats import rebuild
+
+                rebuild()
@@ -0,0 +1,99 @@
+# server_clinic/mkb/management/commands/load_icd10.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from mkb.dictionary import (
+    CHAPTERS,
+    CODE_RE,
+    RANGE_RE,
+    Icd10Dictionary,
+    invalidate_dictionary,
+    normalize_code,
+)
+from mkb.models import Icd10Code
+from server_clinic.constants import ICD10_CHAPTERS
+from server_clinic.importers import read_rows
+
+CHAPTER_NUMBERS = {number for _, _, number, _ in ICD10_CHAPTERS}
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает справочник МКБ-10 из файла CSV/XLSX с колонками code, title "
+        "и необязательной parent. Коды классов (IX), блоков (I20-I25), рубрик "
+        "и подрубрик; справочник заменяется целиком"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def read(self, path):
+        file_format = "xlsx" if path.lower().endswith(".xlsx") else "csv"
+        entries, parents, skipped = {}, {}, 0
+        for row in read_rows(path, file_format):
+            raw = str(row.get("code") or "").strip().upper()
+            code = raw if raw in CHAPTER_NUMBERS else normalize_code(raw)
+            title = str(row.get("title") or "").strip()
+            if not title or not (
+                code in CHAPTER_NUMBERS or CODE_RE.match(code) or RANGE_RE.match(code)
+            ):
+                skipped += 1
+                continue
+            entries[code] = title
+            if row.get("parent"):
+                parents[code] = normalize_code(row["parent"])
+        return entries, parents, skipped
+
+    # Родитель по умолчанию: подрубрика → рубрика → блок → класс
+    def default_parent(self, code, dictionary):
+        if code in CHAPTER_NUMBERS:
+            return None
+        if "." in code:
+            return code.split(".")[0]
+        if RANGE_RE.match(code):
+            return CHAPTERS.lookup(code)
+        return dictionary.block(code) or CHAPTERS.lookup(code)
+
+    def handle(self, *args, **options):
+        try:
+            entries, parents, skipped = self.read(options["path"])
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        dictionary = Icd10Dictionary(entries.items())
+        objects = []
+        for code, title in entries.items():
+            if code in CHAPTER_NUMBERS:
+                chapter, block = code, ""
+            elif RANGE_RE.match(code):
+                chapter, block = CHAPTERS.lookup(code) or "", code
+            else:
+                chapter = CHAPTERS.lookup(code) or ""
+                block = dictionary.block(code) or ""
+            objects.append(
+                Icd10Code(code=code, title=title, chapter=chapter, block=block)
+            )
+        with transaction.atomic():
+            Icd10Code.objects.all().delete()
+            Icd10Code.objects.bulk_create(objects, batch_size=options["batch_size"])
+            ids = dict(Icd10Code.objects.values_list("code", "id"))
+            linked = []
+            for obj in objects:
+                parent = parents.get(obj.code) or self.default_parent(
+                    obj.code, dictionary
+                )
+                if parent in ids:
+                    obj.id = ids[obj.code]
+                    obj.parent_id = ids[parent]
+                    linked.append(obj)
+            Icd10Code.objects.bulk_update(
+                linked, ["parent"], batch_size=options["batch_size"]
+            )
+            transaction.on_commit(invalidate_dictionary)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Загружено кодов: {len(objects)}, пропущено строк: {skipped}"
+            )
+        )
+        self.stdout.write(
+            "Для пересчёта классов и блоков в реестрах: manage.py classify_icd10"
+        )
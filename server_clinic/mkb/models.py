@@ -0,0 +1,95 @@
+# server_clinic/mkb/models.py
+from django.core.exceptions import ValidationError
+from django.db import models
+from .dictionary import get_dictionary, normalize_code
+
+
+# Запись справочника МКБ-10: класс, блок (диапазон рубрик), рубрика или подрубрика
+class Icd10Code(models.Model):
+    code = models.CharField(max_length=10, unique=True, verbose_name="Код")
+    title = models.CharField(max_length=500, verbose_name="Наименование")
+    chapter = models.CharField(max_length=5, db_index=True, verbose_name="Класс")
+    block = models.CharField(
+        max_length=10, blank=True, db_index=True, verbose_name="Блок"
+    )
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="children",
+        verbose_name="Родитель",
+    )
+
+    def __str__(self):
+        return f"{self.code} {self.title}"
+
+    class Meta:
+        db_table = "icd10"
+        verbose_name = "Код МКБ-10"
+        verbose_name_plural = "Справочник МКБ-10"
+        ordering = ["code"]
+
+
+# Рубрика (три первых знака) нормализованного кода. Одно и то же выражение
+# в индексе регистра и в поиске, границы — литералами, а не параметрами:
+# иначе СУБД не сопоставит условие с индексом
+class IcdRubric(models.Func):
+    function = "SUBSTR"
+    template = "%(function)s(%(expressions)s, 1, 3)"
+    output_field = models.CharField()
+
+
+# Реестр с кодом МКБ-10: код хранится нормализованным (латиница, верхний регистр),
+# класс и блок — в индексируемых колонках для группировки без разбора строк
+class IcdCodedModel(models.Model):
+    icd_code_field = "mkb_code"
+
+    icd_chapter = models.CharField(
+        max_length=5,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Класс МКБ-10",
+    )
+    icd_block = models.CharField(
+        max_length=10,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Блок МКБ-10",
+    )
+
+    class Meta:
+        abstract = True
+
+    def normalize_icd(self):
+        code = normalize_code(getattr(self, self.icd_code_field))
+        setattr(self, self.icd_code_field, code)
+        dictionary = get_dictionary()
+        self.icd_chapter = dictionary.chapter(code) or ""
+        self.icd_block = dictionary.block(code) or ""
+
+    # Пока справочник не загружен, проверяется только формат кода
+    def validate_icd(self):
+        code = getattr(self, self.icd_code_field)
+        dictionary = get_dictionary()
+        if dictionary and not dictionary.exists(code):
+            raise ValidationError(
+                {self.icd_code_field: f"Код {code} не найден в справочнике МКБ-10"}
+            )
+
+    def clean_fields(self, exclude=None):
+        self.normalize_icd()
+        super().clean_fields(exclude)
+
+    def clean(self):
+        super().clean()
+        self.validate_icd()
+
+    def save(self, *args, **kwargs):
+        self.normalize_icd()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and self.icd_code_field in update_fields:
+            kwargs["update_fields"] = {*update_fields, "icd_chapter", "icd_block"}
+        super().save(*args, **kwargs)
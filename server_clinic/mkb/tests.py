@@ -0,0 +1,4 @@
+# server_clinic/mkb/tests.py
+from django.test import TestCase
+
+# Create your tests here.
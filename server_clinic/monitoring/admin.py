@@ -0,0 +1,93 @@
+# server_clinic/monitoring/admin.py
+from datetime import timedelta
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from .instrumentation import percentile
+from .models import SlowQuery
+
+SUMMARY_DAYS = 7
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "duration_ms", "short_sql", "origin", "full_scan")
+    list_filter = ("full_scan", "database")
+    search_fields = ("fingerprint", "origin")
+    date_hierarchy = "created_at"
+    change_list_template = "admin/monitoring/slowquery_change_list.html"
+
+    def short_sql(self, obj):
+        return obj.fingerprint[:120]
+
+    short_sql.short_description = "Запрос"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        custom_urls = [
+            path(
+                "summary/",
+                self.admin_site.admin_view(self.summary_view),
+                name="monitoring_slowquery_summary",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    # Сводка по отпечаткам за последние дни: число, p50, p95, максимум
+    def summary_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            days = max(1, int(request.GET.get("days", SUMMARY_DAYS)))
+        except ValueError:
+            days = SUMMARY_DAYS
+        since = timezone.now() - timedelta(days=days)
+        queries = SlowQuery.objects.filter(created_at__gte=since)
+        durations, full_scans = {}, set()
+        for key, duration, full_scan in queries.values_list(
+            "fingerprint_hash", "duration_ms", "full_scan"
+        ).iterator():
+            durations.setdefault(key, []).append(duration)
+            if full_scan:
+                full_scans.add(key)
+        # Текст и источник — от самого долгого запроса с этим отпечатком
+        samples = {}
+        for row in (
+            queries.filter(fingerprint_hash__in=list(durations))
+            .order_by("fingerprint_hash", "-duration_ms")
+            .values("fingerprint_hash", "fingerprint", "origin")
+        ):
+            samples.setdefault(row["fingerprint_hash"], row)
+        rows = []
+        for key, values in durations.items():
+            values.sort()
+            rows.append(
+                {
+                    "fingerprint_hash": key,
+                    "fingerprint": samples[key]["fingerprint"],
+                    "origin": samples[key]["origin"],
+                    "count": len(values),
+                    "p50": percentile(values, 0.5),
+                    "p95": percentile(values, 0.95),
+                    "max": values[-1],
+                    "full_scan": key in full_scans,
+                }
+            )
+        rows.sort(key=lambda row: row["p95"] * row["count"], reverse=True)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Медленные запросы по отпечаткам",
+            "days": days,
+            "rows": rows,
+        }
+        return TemplateResponse(
+            request, "admin/monitoring/slowquery_summary.html", context
+        )
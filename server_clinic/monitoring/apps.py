@@ -0,0 +1,11 @@
+# server_clinic/monitoring/apps.py
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "monitoring"
+    verbose_name = "Мониторинг"
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,36 @@
+# server_clinic/monitoring/budgets.py
+from django.conf import settings
+
+# Предельное число SQL-запросов на страницу админки; не должно зависеть от
+# объёма данных. Переопределяются QUERY_BUDGETS в settings
+QUERY_BUDGETS = {
+    "changelist": 12,
+    "search": 12,
+    "add": 12,
+    "change": 14,
+    "autocomplete": 6,
+    "report": 8,
+}
+
+# Предельное время ответа, мс (LATENCY_CEILINGS в settings)
+LATENCY_CEILINGS = {
+    "changelist": 1000,
+    "search": 1000,
+    "add": 500,
+    "change": 500,
+    "autocomplete": 300,
+    "report": 500,
+}
+
+# Порог для middleware: больше запросов на один запрос — предупреждение в лог
+REQUEST_QUERY_BUDGET = 50
+# Один и тот же запрос столько раз за запрос — вероятный N+1
+DUPLICATE_QUERY_THRESHOLD = 5
+
+
+def get_budget(kind):
+    return getattr(settings, "QUERY_BUDGETS", {}).get(kind, QUERY_BUDGETS[kind])
+
+
+def get_latency_ceiling(kind):
+    return getattr(settings, "LATENCY_CEILINGS", {}).get(kind, LATENCY_CEILINGS[kind])
@@ -0,0 +1,63 @@
+# server_clinic/monitoring/instrumentation.py
+import math
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from django.db import connections
+
+_IN_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACES = re.compile(r"\s+")
+
+
+# Отпечаток запроса без значений: одинаковые запросы с разными параметрами
+# (типичный N+1) дают один отпечаток
+def fingerprint(sql):
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _LITERAL.sub("?", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+# Счётчик запросов для connection.execute_wrapper: количество, суммарное время
+# и повторы по отпечаткам
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        return {sql: count for sql, count in self.fingerprints.items() if count > 1}
+
+    @property
+    def duplicate_count(self):
+        return sum(count - 1 for count in self.duplicates.values())
+
+    def most_repeated(self):
+        return self.fingerprints.most_common(1)[0] if self.fingerprints else None
+
+
+# Значение по отсортированному списку методом ближайшего ранга
+def percentile(values, share):
+    return values[max(0, math.ceil(len(values) * share) - 1)]
+
+
+# Запись запросов во всех подключениях внутри блока
+@contextmanager
+def record_queries(aliases=None):
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for alias in aliases or connections:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
@@ -0,0 +1,186 @@
+# server_clinic/monitoring/management/commands/benchmark_admin_queries.py
+import statistics
+import time
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, RequestFactory
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from monitoring.seed import seed_registers
+from monitoring.slow_queries import explain
+from patient.models import Patient
+
+REGISTERS = ("death.Death", "diagnos.Diagnosis", "disabled_children.DisabledChild")
+SEED_CHUNK = 50000
+
+
+# Запросы страницы: (sql, параметры, мс) — для EXPLAIN с теми же параметрами
+class QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.queries.append((sql, params, elapsed_ms))
+
+
+class Command(BaseCommand):
+    help = (
+        "Наполняет тестовую базу синтетическими реестрами (по умолчанию 1 млн "
+        "пациентов) и выполняет типовые запросы списков регистров в админке: "
+        "каждый фильтр, сортировку и поиск. Для каждой страницы выводит время, "
+        "и план каждого запроса к таблице регистра"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=1_000_000, help="Пациентов")
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Повторов страницы (медиана)"
+        )
+        parser.add_argument(
+            "--choices", type=int, default=3, help="Значений каждого фильтра"
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Не удалять тестовую базу: повторный запуск не наполняет её заново",
+        )
+
+    # Страницы списка регистра как ссылки самой админки: (подпись, url)
+    def get_pages(self, model, model_admin, user, choices):
+        url = reverse(
+            f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist"
+        )
+        request = RequestFactory().get(url)
+        request.user = user
+        changelist = model_admin.get_changelist_instance(request)
+        pages = [("список", url)]
+        for spec in changelist.filter_specs:
+            # Первый вариант — «Все»
+            for choice in list(spec.choices(changelist))[1 : choices + 1]:
+                pages.append(
+                    (f"{spec.title}: {choice['display']}", url + choice["query_string"])
+                )
+        for number, name in enumerate(changelist.list_display):
+            if changelist.get_ordering_field(name) is None:
+                continue
+            for prefix in ("", "-"):
+                pages.append(
+                    (
+                        f"сортировка {prefix}{name}",
+                        f"{url}?{ORDER_VAR}={prefix}{number}",
+                    )
+                )
+        if model_admin.search_fields:
+            pages.append(("поиск Иванов", url + "?q=Иванов"))
+            code = getattr(model, "icd_code_field", None)
+            row = model._default_manager.values_list(code, flat=True).first()
+            if code and row:
+                pages.append((f"поиск {row[:3]}", f"{url}?q={row[:3]}"))
+        return pages
+
+    def measure(self, client, url, repeat, connection):
+        timings = []
+        for _ in range(repeat):
+            cache.clear()  # без закэшированных счётчиков
+            log = QueryLog()
+            start = time.perf_counter()
+            with connection.execute_wrapper(log):
+                response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+        return response.status_code, statistics.median(timings), log.queries
+
+    def report(self, model, label, status, elapsed_ms, queries, connection):
+        table = connection.ops.quote_name(model._meta.db_table)
+        own = [query for query in queries if table in query[0]]
+        self.stdout.write(
+            f"{elapsed_ms:>9.1f} мс {len(queries):>3} запр.  {label}"
+            + ("" if status == 200 else f"  статус {status}")
+        )
+        any_scan = False
+        for sql, params, query_ms in own:
+            plan, full_scan = explain(connection, sql, params)
+            any_scan = any_scan or full_scan
+            self.stdout.write(
+                f"{'':>12}{query_ms:>7.1f} мс  {sql[:100]}"
+                + ("  ПОЛНЫЙ ПРОСМОТР" if full_scan else "")
+            )
+            for line in plan.splitlines():
+                self.stdout.write(f"{'':>23}{line}")
+        return any_scan
+
+    def seed(self, size, connection):
+        seeded = Patient.objects.count()
+        while seeded < size:
+            count = min(SEED_CHUNK, size - seeded)
+            seed_registers(count, offset=seeded)
+            seeded += count
+            self.stdout.write(f"наполнено пациентов: {seeded}")
+        # Статистика для планировщика, как после sqlite_maintenance --analyze
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def handle(self, *args, **options):
+        connection = connections["default"]
+        if connection.vendor == "sqlite":
+            # Файл, а не база в памяти: миллион строк и повторные запуски
+            connection.settings_dict["TEST"]["NAME"] = str(
+                settings.BASE_DIR / "benchmark_admin.sqlite3"
+            )
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        scans = []
+        try:
+            with override_settings(SLOW_QUERY_MS=None):
+                self.seed(options["size"], connection)
+                user, _ = get_user_model().objects.get_or_create(
+                    username="benchmark", defaults={"is_staff": True}
+                )
+                user.is_superuser = True
+                user.save()
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+                for label in REGISTERS:
+                    model = next(
+                        (m for m in admin.site._registry if m._meta.label == label),
+                        None,
+                    )
+                    if model is None:  # приложение не подключено
+                        continue
+                    self.stdout.write(self.style.MIGRATE_HEADING(label))
+                    model_admin = admin.site._registry[model]
+                    pages = self.get_pages(model, model_admin, user, options["choices"])
+                    for page, url in pages:
+                        status, elapsed_ms, queries = self.measure(
+                            client, url, options["repeat"], connection
+                        )
+                        if self.report(
+                            model, page, status, elapsed_ms, queries, connection
+                        ):
+                            scans.append(f"{label}: {page}")
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+        if scans:
+            self.stdout.write(
+                self.style.WARNING("Полный просмотр таблицы:\n" + "\n".join(scans))
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Все списки читаются по индексам"))
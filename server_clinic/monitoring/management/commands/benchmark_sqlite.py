@@ -0,0 +1,132 @@
+# server_clinic/monitoring/management/commands/benchmark_sqlite.py
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.test.utils import override_settings
+from monitoring.instrumentation import percentile
+from monitoring.seed import seed_registers
+from patient.models import Patient
+from server_clinic.constants import FILIAL
+
+# "default" — SQLite с настройками Django по умолчанию (журнал отката,
+# отложенные транзакции), "tuned" — профиль из settings.DATABASES
+PROFILES = ("default", "tuned")
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность SQLite с профилем из settings и без "
+        "него: N потоков на копиях одной синтетической базы читают списки "
+        "регистров и правят карточки пациентов в транзакциях"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument(
+            "--writers", type=int, default=2, help="Сколько из потоков пишут"
+        )
+        parser.add_argument("--seconds", type=float, default=10)
+        parser.add_argument("--size", type=int, default=20000, help="Пациентов")
+
+    # Чтение как в списке смертей с фильтром по филиалу: число и первая страница
+    def read(self, rng):
+        from death.models import Death
+
+        deaths = Death.objects.filter(patient__filial=rng.choice(FILIAL)[0])
+        deaths.count()
+        list(deaths.select_related("patient").order_by("-death_date")[:100])
+
+    # Запись как при правке карточки: прочитать и сохранить в одной транзакции
+    def write(self, rng, patient_ids):
+        with transaction.atomic():
+            patient = Patient.objects.get(pk=rng.choice(patient_ids))
+            patient.phone_number = f"+79{rng.randrange(10**9):09d}"
+            patient.save(update_fields=["phone_number"])
+
+    def worker(self, kind, number, deadline, patient_ids, results):
+        rng = random.Random(number)
+        latencies, errors = [], 0
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    if kind == "read":
+                        self.read(rng)
+                    else:
+                        self.write(rng, patient_ids)
+                except OperationalError:  # database is locked
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            connections.close_all()
+        results.append((kind, latencies, errors))
+
+    def run_profile(self, options, patient_ids):
+        deadline = time.perf_counter() + options["seconds"]
+        results, threads = [], []
+        for number in range(options["workers"]):
+            kind = "write" if number < options["writers"] else "read"
+            threads.append(
+                threading.Thread(
+                    target=self.worker,
+                    args=(kind, number, deadline, patient_ids, results),
+                )
+            )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def report(self, profile, seconds, results):
+        for kind in ("read", "write"):
+            latencies = sorted(
+                latency for k, values, _ in results if k == kind for latency in values
+            )
+            errors = sum(count for k, _, count in results if k == kind)
+            if not latencies and not errors:
+                continue
+            p50 = percentile(latencies, 0.5) if latencies else 0
+            p95 = percentile(latencies, 0.95) if latencies else 0
+            self.stdout.write(
+                f"{profile:<8} {kind:<6} {len(latencies) / seconds:>8.1f} оп/с  "
+                f"p50 {p50:>7.1f} мс  p95 {p95:>7.1f} мс  ошибок {errors}"
+            )
+
+    def handle(self, *args, **options):
+        database = connections.settings[DEFAULT_DB_ALIAS]
+        if database["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("Основная база не SQLite")
+        tuned = database["OPTIONS"]
+        original = database["NAME"], database["OPTIONS"]
+        directory = tempfile.mkdtemp(prefix="sqlite_benchmark_")
+        connections.close_all()
+        try:
+            with override_settings(SLOW_QUERY_MS=None):
+                # Общая исходная база: миграции и синтетические реестры
+                base = os.path.join(directory, "base.sqlite3")
+                database["NAME"], database["OPTIONS"] = base, {}
+                call_command("migrate", verbosity=0, interactive=False)
+                seed_registers(options["size"])
+                patient_ids = list(Patient.objects.values_list("pk", flat=True))
+                connections.close_all()
+
+                for profile in PROFILES:
+                    path = os.path.join(directory, f"{profile}.sqlite3")
+                    shutil.copyfile(base, path)
+                    database["NAME"] = path
+                    database["OPTIONS"] = tuned if profile == "tuned" else {}
+                    results = self.run_profile(options, patient_ids)
+                    connections.close_all()
+                    self.report(profile, options["seconds"], results)
+        finally:
+            connections.close_all()
+            database["NAME"], database["OPTIONS"] = original
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,61 @@
+# server_clinic/monitoring/management/commands/check_query_budgets.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from monitoring.regression import check_budgets
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт тестовую базу, наполняет её синтетическими реестрами нескольких "
+        "размеров и проверяет число SQL-запросов и время ответа страниц админки. "
+        "Завершается с ошибкой при превышении бюджета или росте числа запросов "
+        "вместе с объёмом данных (N+1). Та же проверка входит в manage.py test "
+        "(monitoring/tests.py)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="50,500,5000",
+            help="Число пациентов на каждом шаге через запятую",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Не удалять тестовую базу"
+        )
+
+    def report(self, size, result):
+        kind, label, count, elapsed_ms, problems = result
+        line = (
+            f"{size:>7} {kind:<12} {label:<40} {count:>3} запр. {elapsed_ms:>7.1f} мс"
+        )
+        if problems:
+            self.stdout.write(self.style.ERROR(f"{line}  {'; '.join(problems)}"))
+        else:
+            self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size]
+        connection = connections["default"]
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        try:
+            user = get_user_model().objects.create_superuser(
+                "budget", "budget@example.com", "budget"
+            )
+            # Ошибка страницы — это провал проверки, а не остановка команды
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            failures = check_budgets(client, sizes, self.report)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+        if failures:
+            raise CommandError("Превышены бюджеты запросов:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("Бюджеты запросов соблюдены"))
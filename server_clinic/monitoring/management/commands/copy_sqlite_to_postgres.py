@@ -0,0 +1,124 @@
+# server_clinic/monitoring/management/commands/copy_sqlite_to_postgres.py
+import os
+import time
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+SOURCE_ALIAS = "sqlite_source"
+COPY_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит данные из файла SQLite в основную базу PostgreSQL: таблицы "
+        "всех моделей очищаются и заполняются через COPY пачками. Схему в "
+        "PostgreSQL заранее создаёт migrate"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source", nargs="?", help="Файл SQLite (по умолчанию db.sqlite3 проекта)"
+        )
+        parser.add_argument("--batch-size", type=int, default=COPY_BATCH_SIZE)
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Не спрашивать подтверждение",
+        )
+
+    def get_models(self, source, target):
+        source_tables = set(source.introspection.table_names())
+        target_tables = set(target.introspection.table_names())
+        return [
+            model
+            for model in apps.get_models(include_auto_created=True)
+            if model._meta.managed
+            and not model._meta.proxy
+            and model._meta.db_table in source_tables
+            and model._meta.db_table in target_tables
+        ]
+
+    def copy_model(self, model, target, batch_size):
+        fields = model._meta.concrete_fields
+        columns = ", ".join(target.ops.quote_name(field.column) for field in fields)
+        rows = (
+            model._base_manager.using(SOURCE_ALIAS)
+            .order_by("pk")
+            .values_list(*[field.attname for field in fields])
+            .iterator(chunk_size=batch_size)
+        )
+        prepare = [
+            lambda value, field=field: field.get_db_prep_save(value, target)
+            for field in fields
+        ]
+        count = 0
+        with target.cursor() as cursor:
+            table = target.ops.quote_name(model._meta.db_table)
+            # COPY psycopg: строки уходят потоком, без INSERT на каждую
+            with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(
+                        [convert(value) for convert, value in zip(prepare, row)]
+                    )
+                    count += 1
+                    if count % batch_size == 0:
+                        self.stdout.write(
+                            f"  {model._meta.label}: {count}", ending="\r"
+                        )
+        return count
+
+    def handle(self, *args, **options):
+        target = connections[DEFAULT_DB_ALIAS]
+        if target.vendor != "postgresql":
+            raise CommandError("Основная база должна быть PostgreSQL (DB_ENGINE)")
+        path = options["source"] or os.path.join(settings.BASE_DIR, "db.sqlite3")
+        if not os.path.exists(path):
+            raise CommandError(f"Файл {path} не найден")
+        connections.settings[SOURCE_ALIAS] = connections.configure_settings(
+            {
+                DEFAULT_DB_ALIAS: {},
+                SOURCE_ALIAS: {"ENGINE": "django.db.backends.sqlite3", "NAME": path},
+            }
+        )[SOURCE_ALIAS]
+        source = connections[SOURCE_ALIAS]
+        models = self.get_models(source, target)
+
+        if options["interactive"]:
+            answer = input(
+                f"Таблицы {target.settings_dict['NAME']} ({len(models)}) будут "
+                "очищены и заполнены из SQLite. Продолжить? [yes/no]: "
+            )
+            if answer != "yes":
+                raise CommandError("Перенос отменён")
+
+        started = time.monotonic()
+        # Внешние ключи Django в PostgreSQL отложенные (DEFERRABLE INITIALLY
+        # DEFERRED): порядок таблиц не важен, проверка — при фиксации
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            tables = [target.ops.quote_name(model._meta.db_table) for model in models]
+            with target.cursor() as cursor:
+                cursor.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE")
+            for model in models:
+                table_started = time.monotonic()
+                count = self.copy_model(model, target, options["batch_size"])
+                self.stdout.write(
+                    f"{model._meta.label}: {count} строк, "
+                    f"{time.monotonic() - table_started:.1f} с"
+                )
+            # Счётчики id продолжаются после перенесённых значений
+            with target.cursor() as cursor:
+                for statement in target.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(statement)
+        with target.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        source.close()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Перенос завершён за {time.monotonic() - started:.1f} с"
+            )
+        )
@@ -0,0 +1,57 @@
+# server_clinic/monitoring/management/commands/sqlite_maintenance.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Обслуживание базы SQLite: перенос журнала WAL в основной файл с усечением, "
+        "PRAGMA optimize, при --analyze полный ANALYZE. Запускать по расписанию "
+        "(cron), optimize — ежедневно, ANALYZE — после массовых загрузок"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Пересобрать статистику планировщика по всем таблицам",
+        )
+
+    def pragma(self, cursor, statement):
+        started = time.monotonic()
+        cursor.execute(f"PRAGMA {statement}")
+        row = cursor.fetchone()
+        return row, time.monotonic() - started
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError(f"База {options['database']} не SQLite")
+        with connection.cursor() as cursor:
+            (page_count,), _ = self.pragma(cursor, "page_count")
+            (page_size,), _ = self.pragma(cursor, "page_size")
+            (freelist,), _ = self.pragma(cursor, "freelist_count")
+            (journal_mode,), _ = self.pragma(cursor, "journal_mode")
+            self.stdout.write(
+                f"Размер {page_count * page_size / 2**20:.1f} МБ, "
+                f"свободных страниц {freelist}, журнал {journal_mode}"
+            )
+            if journal_mode.lower() == "wal":
+                # busy = 1: checkpoint не завершён из-за активных читателей
+                (busy, log, moved), elapsed = self.pragma(
+                    cursor, "wal_checkpoint(TRUNCATE)"
+                )
+                self.stdout.write(
+                    f"Checkpoint: страниц журнала {log}, перенесено {moved}"
+                    f"{', база занята' if busy else ''}, {elapsed:.2f} с"
+                )
+            if options["analyze"]:
+                started = time.monotonic()
+                cursor.execute("ANALYZE")
+                self.stdout.write(f"ANALYZE: {time.monotonic() - started:.2f} с")
+            # Без --analyze optimize собирает статистику только там, где она нужна
+            _, elapsed = self.pragma(cursor, "optimize")
+            self.stdout.write(f"PRAGMA optimize: {elapsed:.2f} с")
+        self.stdout.write(self.style.SUCCESS("Обслуживание завершено"))
@@ -0,0 +1,223 @@
+# server_clinic/monitoring/metrics.py
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+
+# Границы корзин гистограмм (верхние, включительно)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Описание метрик: тип и подсказка для формата Prometheus
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Время ответа по имени url"),
+    "http_request_db_seconds": ("histogram", "Время SQL-запросов за запрос"),
+    "http_response_size_bytes": ("histogram", "Размер ответа (кроме потоковых)"),
+    "http_requests_total": ("counter", "Запросы по имени url и статусу"),
+    "admin_action_duration_seconds": ("histogram", "Время действий над списком"),
+    "model_saves_total": ("counter", "Сохранения моделей (без bulk-операций)"),
+    "model_deletes_total": ("counter", "Удаления моделей (без bulk-операций)"),
+    "validation_failures_total": ("counter", "Срабатывания валидаторов"),
+}
+
+_HEADER = struct.Struct("<Q")  # занятый размер файла
+_INITIAL_SIZE = 64 * 1024
+
+
+# Словарь ключ → float64 в отображённом в память файле. Пишет только свой
+# процесс; endpoint метрик читает файлы всех воркеров и суммирует значения.
+# Запись: длина ключа (uint32), ключ, выравнивание до 8 байт, значение (double)
+class MmapDict:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._positions = {}
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "a+b")
+        if not exists:
+            self._file.truncate(_INITIAL_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._mmap, 0)[0] or _HEADER.size
+        for key, value, position in iter_entries(self._mmap, self._used):
+            self._positions[key] = position
+
+    def _append(self, key):
+        encoded = key.encode("utf-8")
+        padding = (8 - (4 + len(encoded)) % 8) % 8
+        size = 4 + len(encoded) + padding + 8
+        while self._used + size > len(self._mmap):
+            new_size = len(self._mmap) * 2
+            self._mmap.close()
+            self._file.truncate(new_size)
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+        struct.pack_into(
+            f"<I{len(encoded)}s{padding}xd",
+            self._mmap,
+            self._used,
+            len(encoded),
+            encoded,
+            0.0,
+        )
+        position = self._used + size - 8
+        self._used += size
+        # Размер обновляется последним: читатель не увидит недописанную запись
+        _HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def increment(self, key, amount=1.0):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = struct.unpack_from("<d", self._mmap, position)[0]
+            struct.pack_into("<d", self._mmap, position, value + amount)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def iter_entries(data, used):
+    position = _HEADER.size
+    while position < used:
+        length = struct.unpack_from("<I", data, position)[0]
+        key = bytes(data[position + 4 : position + 4 + length]).decode("utf-8")
+        position += 4 + length + (8 - (4 + length) % 8) % 8
+        yield key, struct.unpack_from("<d", data, position)[0], position
+        position += 8
+
+
+# Значения одного процесса без общего каталога (runserver, тесты)
+class LocalDict:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = defaultdict(float)
+
+    def increment(self, key, amount=1.0):
+        with self._lock:
+            self.values[key] += amount
+
+
+def metrics_dir():
+    return getattr(settings, "METRICS_DIR", None)
+
+
+_store = {"pid": None, "values": None}
+_store_lock = threading.Lock()
+
+
+# Хранилище текущего процесса; после fork воркер открывает свой файл
+def get_store():
+    pid = os.getpid()
+    if _store["pid"] != pid:
+        with _store_lock:
+            if _store["pid"] != pid:
+                directory = metrics_dir()
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                    path = os.path.join(directory, f"metrics_{pid}.db")
+                    _store["values"] = MmapDict(path)
+                else:
+                    _store["values"] = LocalDict()
+                _store["pid"] = pid
+    return _store["values"]
+
+
+@lru_cache(maxsize=4096)
+def _encode(name, labels):
+    return json.dumps([name, labels], ensure_ascii=False)
+
+
+def _key(name, labels, suffix=""):
+    return _encode(name + suffix, tuple(sorted(labels.items())))
+
+
+def inc(name, amount=1.0, **labels):
+    get_store().increment(_key(name, labels), amount)
+
+
+# Гистограмма хранит некумулятивные корзины; кумулятивными их делает выгрузка
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    store = get_store()
+    bound = next((bound for bound in buckets if value <= bound), "+Inf")
+    store.increment(_key(name, {**labels, "le": str(bound)}, "_bucket"))
+    store.increment(_key(name, labels, "_sum"), value)
+    store.increment(_key(name, labels, "_count"))
+
+
+def collect():
+    totals = defaultdict(float)
+    directory = metrics_dir()
+    if directory:
+        for path in glob.glob(os.path.join(directory, "metrics_*.db")):
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < _HEADER.size:
+                continue
+            used = _HEADER.unpack_from(data, 0)[0]
+            for key, value, _ in iter_entries(data, used):
+                totals[key] += value
+    else:
+        for key, value in list(get_store().values.items()):
+            totals[key] += value
+    return totals
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+# Точное значение: целые без экспоненты и дробной части, прочие — repr
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+# Текстовый формат Prometheus (version 0.0.4)
+def render():
+    samples = defaultdict(list)
+    for key, value in collect().items():
+        name, labels = json.loads(key)
+        samples[name].append((tuple(map(tuple, labels)), value))
+    lines = []
+    for metric, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        if kind == "counter":
+            for labels, value in sorted(samples.get(metric, ())):
+                lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+            continue
+        buckets = defaultdict(dict)
+        for labels, value in samples.get(f"{metric}_bucket", ()):
+            series = tuple(item for item in labels if item[0] != "le")
+            bound = dict(labels)["le"]
+            buckets[series][bound] = value
+        sums = dict(samples.get(f"{metric}_sum", ()))
+        counts = dict(samples.get(f"{metric}_count", ()))
+        bounds = SIZE_BUCKETS if metric.endswith("_bytes") else LATENCY_BUCKETS
+        for series in sorted(counts):
+            cumulative = 0.0
+            for bound in [str(bound) for bound in bounds] + ["+Inf"]:
+                cumulative += buckets[series].get(bound, 0.0)
+                labels = _format_labels(series + (("le", bound),))
+                lines.append(f"{metric}_bucket{labels} {_format_value(cumulative)}")
+            lines.append(
+                f"{metric}_sum{_format_labels(series)} "
+                f"{_format_value(sums.get(series, 0))}"
+            )
+            lines.append(
+                f"{metric}_count{_format_labels(series)} {_format_value(counts[series])}"
+            )
+    return "\n".join(lines) + "\n"
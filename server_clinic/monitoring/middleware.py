@@ -0,0 +1,106 @@
+# server_clinic/monitoring/middleware.py
+import logging
+import time
+from django.conf import settings
+from . import metrics
+from .budgets import DUPLICATE_QUERY_THRESHOLD, REQUEST_QUERY_BUDGET
+from .instrumentation import record_queries
+from .slow_queries import current_request
+
+logger = logging.getLogger("server_clinic.queries")
+
+
+# Число SQL-запросов, их время и повторы на каждый запрос: заголовки ответа
+# X-DB-* и строка в логе. Потоковые ответы (выгрузки) читают базу уже после
+# выхода из middleware, их запросы сюда не попадают
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budget = getattr(settings, "REQUEST_QUERY_BUDGET", REQUEST_QUERY_BUDGET)
+        self.duplicate_threshold = getattr(
+            settings, "DUPLICATE_QUERY_THRESHOLD", DUPLICATE_QUERY_THRESHOLD
+        )
+
+    def __call__(self, request):
+        with record_queries() as stats:
+            response = self.get_response(request)
+        request.query_stats = stats
+        duration_ms = stats.duration * 1000
+        response["X-DB-Queries"] = str(stats.count)
+        response["X-DB-Time-Ms"] = f"{duration_ms:.1f}"
+        response["X-DB-Duplicates"] = str(stats.duplicate_count)
+
+        repeated = stats.most_repeated()
+        over_budget = stats.count > self.budget
+        n_plus_one = repeated is not None and repeated[1] >= self.duplicate_threshold
+        logger.log(
+            logging.WARNING if over_budget or n_plus_one else logging.DEBUG,
+            "%s %s: запросов %d, %.1f мс, повторов %d%s",
+            request.method,
+            request.path,
+            stats.count,
+            duration_ms,
+            stats.duplicate_count,
+            f"; чаще всего ({repeated[1]}×): {repeated[0][:300]}" if n_plus_one else "",
+        )
+        return response
+
+
+# Гистограммы времени ответа, времени SQL и размера ответа по имени url,
+# счётчик ответов по статусу и время действий над списком в админке.
+# Стоит перед QueryBudgetMiddleware, чтобы учитывать и её работу
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        metrics.observe("http_request_duration_seconds", elapsed, view=view)
+        metrics.inc("http_requests_total", view=view, status=str(response.status_code))
+        stats = getattr(request, "query_stats", None)
+        if stats is not None:
+            metrics.observe("http_request_db_seconds", stats.duration, view=view)
+        if not response.streaming:
+            metrics.observe(
+                "http_response_size_bytes",
+                len(response.content),
+                metrics.SIZE_BUCKETS,
+                view=view,
+            )
+        action = self.admin_action(request, match)
+        if action:
+            metrics.observe(
+                "admin_action_duration_seconds", elapsed, view=view, action=action
+            )
+        return response
+
+    # Имя действия берётся только из действий самой ModelAdmin: произвольное
+    # значение из POST не должно порождать новые ряды метрик
+    def admin_action(self, request, match):
+        if request.method != "POST" or match is None:
+            return None
+        model_admin = getattr(match.func, "model_admin", None)
+        action = request.POST.get("action")
+        if model_admin is None or not match.url_name.endswith("_changelist"):
+            return None
+        if action in model_admin.get_actions(request):
+            return action
+        return None
+
+
+# Запоминает текущий запрос: по нему медленные SQL-запросы привязываются к view
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
@@ -0,0 +1,32 @@
+# server_clinic/monitoring/models.py
+from django.db import models
+
+
+# Медленный SQL-запрос с планом выполнения (пишет monitoring.slow_queries)
+class SlowQuery(models.Model):
+    created_at = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name="Время"
+    )
+    fingerprint_hash = models.CharField(
+        max_length=40, db_index=True, verbose_name="Хэш отпечатка"
+    )
+    fingerprint = models.TextField(verbose_name="Отпечаток")
+    sql = models.TextField(verbose_name="SQL")
+    params = models.TextField(blank=True, verbose_name="Параметры")
+    duration_ms = models.FloatField(verbose_name="Время, мс")
+    database = models.CharField(max_length=50, verbose_name="База")
+    origin = models.CharField(
+        max_length=200, blank=True, db_index=True, verbose_name="Источник"
+    )
+    stack = models.TextField(blank=True, verbose_name="Стек")
+    plan = models.TextField(blank=True, verbose_name="План")
+    full_scan = models.BooleanField(default=False, verbose_name="Полный просмотр")
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f} мс: {self.fingerprint[:80]}"
+
+    class Meta:
+        db_table = "slow_query"
+        verbose_name = "Медленный запрос"
+        verbose_name_plural = "Медленные запросы"
+        ordering = ["-created_at"]
@@ -0,0 +1,131 @@
+# server_clinic/monitoring/regression.py
+import time
+from django.contrib import admin
+from django.core.cache import cache
+from django.urls import NoReverseMatch, reverse
+from .budgets import get_budget, get_latency_ceiling
+from .instrumentation import record_queries
+from .seed import seed_registers
+
+CHECKED_APPS = ("patient", "death", "diagnos", "disabled_children", "mkb", "jobs")
+# Собственные эндпоинты админки: (вид бюджета, подпись, имя url, параметры)
+EXTRA_PAGES = (
+    (
+        "autocomplete",
+        "patient.autocomplete",
+        "patient_patient_autocomplete",
+        "?term=Ив",
+    ),
+    ("autocomplete", "patient.policy", "patient_patient_autocomplete", "?term=9000"),
+    ("autocomplete", "mkb.lookup", "mkb_icd10code_lookup", "?term=I2"),
+    ("report", "death.stats", "death_death_stats", "?group_by=icd_chapter"),
+    ("report", "death.stats.api", "death_death_stats_api", "?group_by=month"),
+    (
+        "report",
+        "diagnos.movement",
+        "diagnos_diagnosis_movement",
+        "?year=2024&group_by=filial&on_date=2024-06-30",
+    ),
+    (
+        "report",
+        "disabled_children.movement",
+        "disabled_children_disabledchild_movement",
+        "?year=2024",
+    ),
+)
+
+
+# Страницы админки: (вид бюджета, подпись, url)
+def admin_pages():
+    pages = []
+    for model, model_admin in admin.site._registry.items():
+        opts = model._meta
+        if opts.app_label not in CHECKED_APPS:
+            continue
+        info = f"admin:{opts.app_label}_{opts.model_name}"
+        pages.append(("changelist", opts.label, reverse(f"{info}_changelist")))
+        if model_admin.search_fields:
+            pages.append(
+                ("search", opts.label, reverse(f"{info}_changelist") + "?q=Иванов")
+            )
+        pages.append(("add", opts.label, reverse(f"{info}_add")))
+        obj = model._default_manager.order_by("pk").first()
+        if obj is not None:
+            pages.append(
+                ("change", opts.label, reverse(f"{info}_change", args=(obj.pk,)))
+            )
+        for field_name in model_admin.autocomplete_fields:
+            # Тот эндпоинт, к которому обращается виджет поля
+            formfield = model_admin.formfield_for_foreignkey(
+                opts.get_field(field_name), None
+            )
+            pages.append(
+                (
+                    "autocomplete",
+                    f"{opts.label}.{field_name}",
+                    formfield.widget.get_url()
+                    + f"?app_label={opts.app_label}&model_name={opts.model_name}"
+                    f"&field_name={field_name}&term=Ив",
+                )
+            )
+    for kind, label, name, query in EXTRA_PAGES:
+        try:
+            pages.append((kind, label, reverse(f"admin:{name}") + query))
+        except NoReverseMatch:
+            continue
+    return pages
+
+
+def measure(client, url):
+    cache.clear()  # без закэшированных счётчиков и подсказок
+    start = time.perf_counter()
+    with record_queries() as stats:
+        response = client.get(url)
+        if getattr(response, "streaming", False):
+            b"".join(response.streaming_content)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return response.status_code, stats, elapsed_ms
+
+
+# Результаты страниц при текущем объёме данных: (вид, подпись, запросов, мс,
+# нарушения). baseline — число запросов при первом объёме: рост вместе с
+# данными означает N+1
+def check_pages(client, baseline):
+    results = []
+    for kind, label, url in admin_pages():
+        status, stats, elapsed_ms = measure(client, url)
+        budget = get_budget(kind)
+        ceiling = get_latency_ceiling(kind)
+        problems = []
+        if status != 200:
+            problems.append(f"статус {status}")
+        if stats.count > budget:
+            problems.append(f"запросов {stats.count} > {budget}")
+        first = baseline.setdefault((kind, label), stats.count)
+        if stats.count > first:
+            problems.append(f"запросов стало {stats.count} (было {first})")
+        if elapsed_ms > ceiling:
+            problems.append(f"{elapsed_ms:.0f} мс > {ceiling} мс")
+        if problems:
+            repeated = stats.most_repeated()
+            if repeated and repeated[1] > 1:
+                problems.append(f"повтор {repeated[1]}×: {repeated[0][:200]}")
+        results.append((kind, label, stats.count, elapsed_ms, problems))
+    return results
+
+
+# Проверка на нескольких объёмах данных в уже созданной тестовой базе;
+# report(объём, результат) — для вывода каждой строки
+def check_budgets(client, sizes, report=None):
+    baseline, seeded, failures = {}, 0, []
+    for size in sizes:
+        if size > seeded:
+            seed_registers(size - seeded, offset=seeded)
+            seeded = size
+        for result in check_pages(client, baseline):
+            kind, label, _, _, problems = result
+            if problems:
+                failures.append(f"{label} {kind} ({size}): {'; '.join(problems)}")
+            if report:
+                report(size, result)
+    return failures
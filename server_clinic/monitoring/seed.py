@@ -0,0 +1,124 @@
+# server_clinic/monitoring/seed.py
+import random
+from datetime import date, timedelta
+from django.apps import apps
+from django.db import transaction
+from patient.models import Patient
+from patient.signals import patients_changed
+from server_clinic.constants import (
+    DEATH_PLACE_CHOICES,
+    DISP_STATUS_CHOICES,
+    FILIAL,
+    STATUS_CHOICES,
+)
+from server_clinic.intervals import invalidate_snapshots
+
+SEED_BATCH_SIZE = 2000
+SURNAMES = (
+    "Иванов",
+    "Смирнов",
+    "Кузнецов",
+    "Попов",
+    "Васильев",
+    "Петров",
+    "Соколов",
+    "Михайлов",
+    "Новиков",
+    "Фёдоров",
+    "Морозов",
+    "Волков",
+    "Алексеев",
+    "Лебедев",
+    "Семёнов",
+)
+FIRST_NAMES = {
+    "М": ("Иван", "Пётр", "Алексей", "Сергей", "Андрей", "Дмитрий", "Михаил"),
+    "Ж": ("Анна", "Мария", "Елена", "Ольга", "Татьяна", "Наталья", "Ирина"),
+}
+PATRONYMICS = ("Иванов", "Петров", "Сергеев", "Андреев", "Олегов", "Юрьев")
+ICD_CODES = ("I10", "I21.0", "I25.1", "J18.9", "C34.1", "E11.9", "K29.5", "G40.9")
+
+
+def synthetic_patient(number, rng):
+    gender = rng.choice("МЖ")
+    surname = rng.choice(SURNAMES) + ("" if gender == "М" else "а")
+    patronymic = rng.choice(PATRONYMICS) + ("ич" if gender == "М" else "на")
+    return Patient(
+        full_name=f"{surname} {rng.choice(FIRST_NAMES[gender])} {patronymic}",
+        birth_date=date(1930, 1, 1) + timedelta(days=rng.randrange(34000)),
+        gender=gender,
+        phone_number=f"+79{rng.randrange(10**9):09d}" if rng.random() < 0.7 else None,
+        filial=rng.choice(FILIAL)[0],
+        insurance_number=f"9{number:015d}",
+    )
+
+
+# Синтетические реестры для нагрузочных проверок: пациенты с полисами
+# 9000000000000000 + offset.., у части — смерть, диагнозы, инвалидность
+@transaction.atomic
+def seed_registers(count, offset=0, seed=0, batch_size=SEED_BATCH_SIZE):
+    rng = random.Random(seed + offset)
+    patients = [synthetic_patient(offset + i, rng) for i in range(count)]
+    Patient.objects.bulk_create(patients, batch_size=batch_size)
+    patients = list(
+        Patient.objects.filter(
+            insurance_number__in=[p.insurance_number for p in patients]
+        )
+    )
+    patients_changed(patients, snapshots=False)
+
+    Death = apps.get_model("death", "Death")
+    deaths = []
+    for patient in rng.sample(patients, len(patients) // 10):
+        death = Death(
+            patient=patient,
+            death_date=min(
+                patient.birth_date + timedelta(days=rng.randrange(20000, 36000)),
+                date.today(),
+            ),
+            death_place=rng.choice(DEATH_PLACE_CHOICES)[0],
+            death_cause=rng.choice(ICD_CODES),
+        )
+        death.normalize_icd()
+        death.fill_snapshot()
+        deaths.append(death)
+    Death.objects.bulk_create(deaths, batch_size=batch_size)
+
+    if apps.is_installed("diagnos"):
+        Diagnosis = apps.get_model("diagnos", "Diagnosis")
+        diagnoses = []
+        for patient in patients:
+            for code in rng.sample(ICD_CODES, rng.randrange(3)):
+                diagnosis = Diagnosis(
+                    patient=patient,
+                    mkb_code=code,
+                    disp_status=DISP_STATUS_CHOICES[0][0],
+                    disp_start_date=date.today() - timedelta(days=rng.randrange(3650)),
+                )
+                diagnosis.normalize_icd()
+                diagnosis.fill_snapshot()
+                diagnoses.append(diagnosis)
+        Diagnosis.objects.bulk_create(diagnoses, batch_size=batch_size)
+        invalidate_snapshots(Diagnosis)
+
+    if apps.is_installed("disabled_children"):
+        DisabledChild = apps.get_model("disabled_children", "DisabledChild")
+        adult = date.today().replace(year=date.today().year - 18)
+        children = []
+        for patient in patients:
+            if patient.birth_date > adult and rng.random() < 0.3:
+                child = DisabledChild(
+                    patient=patient,
+                    mkb_code=rng.choice(ICD_CODES),
+                    status=STATUS_CHOICES[0][0],
+                    disability_date=min(
+                        patient.birth_date + timedelta(days=rng.randrange(6570)),
+                        date.today(),
+                    ),
+                )
+                child.normalize_icd()
+                child.fill_snapshot()
+                children.append(child)
+        DisabledChild.objects.bulk_create(children, batch_size=batch_size)
+        invalidate_snapshots(DisabledChild)
+    return len(patients)
@@ -0,0 +1,32 @@
+# server_clinic/monitoring/signals.py
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from server_clinic.validators import validation_failed
+from . import metrics
+from .slow_queries import install
+
+connection_created.connect(install, dispatch_uid="monitoring_slow_queries")
+
+
+# bulk_create/update и QuerySet.update() сигналов не шлют и здесь не считаются
+@receiver(post_save, dispatch_uid="monitoring_model_saves")
+def count_save(sender, created, raw, **kwargs):
+    if raw:
+        return
+    metrics.inc(
+        "model_saves_total",
+        model=sender._meta.label,
+        created="true" if created else "false",
+    )
+
+
+@receiver(post_delete, dispatch_uid="monitoring_model_deletes")
+def count_delete(sender, **kwargs):
+    metrics.inc("model_deletes_total", model=sender._meta.label)
+
+
+# Срабатывание валидатора (ValidationError) считается по имени функции
+@receiver(validation_failed, dispatch_uid="monitoring_validation_failures")
+def count_validation_failure(sender, **kwargs):
+    metrics.inc("validation_failures_total", validator=sender.__name__)
@@ -0,0 +1,167 @@
+# server_clinic/monitoring/slow_queries.py
+import hashlib
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+from contextlib import nullcontext
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from .instrumentation import fingerprint
+
+logger = logging.getLogger("server_clinic.slow_queries")
+
+# Порог по умолчанию; settings.SLOW_QUERY_MS = None отключает запись
+SLOW_QUERY_MS = 300
+STACK_DEPTH = 8
+PARAMS_LIMIT = 2000
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+# SQLite: "SCAN death" без индекса; PostgreSQL: "Seq Scan on death"
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(?:TABLE )?(\S+)(?!.*\bUSING\b)")
+SQLITE_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\S+)")
+POSTGRES_FULL_SCAN = re.compile(r"\bSeq Scan on\b")
+
+# Текущий запрос к серверу (SlowQueryMiddleware): из него берётся имя view
+current_request = ContextVar("current_request", default=None)
+_recording = ContextVar("slow_query_recording", default=False)
+
+
+def threshold_ms():
+    return getattr(settings, "SLOW_QUERY_MS", SLOW_QUERY_MS)
+
+
+# Имя url (admin:death_death_changelist и т.п.) или команда manage.py
+def current_origin():
+    request = current_request.get()
+    if request is not None:
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        return f"{view} {request.method} {request.path}"[:200]
+    return " ".join(os.path.basename(arg) for arg in sys.argv[:2])[:200]
+
+
+# Кадры стека из кода проекта, без Django и самого мониторинга
+def stack_summary():
+    base = str(settings.BASE_DIR)
+    own = os.path.dirname(os.path.abspath(__file__))
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base)
+        and not frame.filename.startswith(own)
+        and "site-packages" not in frame.filename
+    ]
+    return "\n".join(
+        f"{os.path.relpath(frame.filename, base)}:{frame.lineno} in {frame.name}"
+        for frame in frames[-STACK_DEPTH:]
+    )
+
+
+# План выполнения и признак полного просмотра таблицы
+def explain(connection, sql, params):
+    if connection.vendor == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif connection.vendor == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return "", False
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    if connection.vendor == "sqlite":
+        # (id, parent, notused, detail): отступ по глубине вложенности
+        depth, lines, subqueries, full_scan = {0: -1}, [], set(), False
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node] + detail)
+            match = SQLITE_SUBQUERY.match(detail)
+            if match:
+                subqueries.add(match.group(1))
+            match = SQLITE_FULL_SCAN.match(detail)
+            # Просмотр подзапроса (CO-ROUTINE) — не просмотр таблицы
+            if match and match.group(1) not in subqueries:
+                full_scan = True
+    else:
+        lines = [row[0] for row in rows]
+        full_scan = any(POSTGRES_FULL_SCAN.search(line) for line in lines)
+    return "\n".join(lines), full_scan
+
+
+# В транзакции приложения — точка сохранения: ошибка EXPLAIN или записи не
+# ломает её. Вне транзакции — автокоммит: с transaction_mode IMMEDIATE блок
+# atomic() взял бы блокировку записи SQLite даже ради EXPLAIN
+def isolated(connection):
+    if connection.in_atomic_block:
+        return transaction.atomic(using=connection.alias)
+    return nullcontext()
+
+
+def record(connection, sql, params, many, duration_ms):
+    from .models import SlowQuery
+
+    plan, full_scan = "", False
+    if not many and EXPLAINABLE.match(sql):
+        try:
+            with isolated(connection):
+                plan, full_scan = explain(connection, sql, params)
+        except DatabaseError as exc:
+            plan = f"EXPLAIN не выполнен: {exc}"
+    origin = current_origin()
+    logger.warning(
+        "Медленный запрос %.0f мс (%s)%s: %s; параметры %r",
+        duration_ms,
+        origin,
+        ", полный просмотр таблицы" if full_scan else "",
+        sql[:1000],
+        params,
+    )
+    pattern = fingerprint(sql)
+    try:
+        # Одна вставка: вне транзакции приложения — своя короткая транзакция
+        with isolated(connection):
+            SlowQuery.objects.using(connection.alias).create(
+                fingerprint_hash=hashlib.sha1(pattern.encode("utf-8")).hexdigest(),
+                fingerprint=pattern,
+                sql=sql,
+                params=repr(params)[:PARAMS_LIMIT],
+                duration_ms=duration_ms,
+                database=connection.alias,
+                origin=origin,
+                stack=stack_summary(),
+                plan=plan,
+                full_scan=full_scan,
+            )
+    except DatabaseError as exc:  # таблицы ещё нет (migrate) и т.п.
+        logger.debug("Медленный запрос не сохранён: %s", exc)
+
+
+# Постоянная обёртка execute каждого подключения (см. install). Запросы,
+# выполненные при самой записи (EXPLAIN, INSERT), не учитываются
+class SlowQueryRecorder:
+    def __call__(self, execute, sql, params, many, context):
+        limit = threshold_ms()
+        if limit is None or _recording.get():
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= limit:
+            token = _recording.set(True)
+            try:
+                record(context["connection"], sql, params, many, duration_ms)
+            finally:
+                _recording.reset(token)
+        return result
+
+
+recorder = SlowQueryRecorder()
+
+
+# Обработчик connection_created. Обёртка ставится первой: connection.execute_wrapper()
+# снимает последнюю из списка, и наша не должна оказаться на её месте
+def install(sender, connection, **kwargs):
+    if recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, recorder)
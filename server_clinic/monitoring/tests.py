@@ -0,0 +1,29 @@
+# server_clinic/monitoring/tests.py
+from django.contrib.auth import get_user_model
+from django.test import Client, SimpleTestCase, TestCase
+from .metrics import inc, render
+from .regression import check_budgets
+
+
+# Регрессия числа SQL-запросов страниц админки (как check_query_budgets):
+# бюджет на страницу и отсутствие роста вместе с объёмом данных
+class QueryBudgetTests(TestCase):
+    sizes = (30, 300)
+
+    def test_admin_pages_within_budgets(self):
+        user = get_user_model().objects.create_superuser(
+            "budget", "budget@example.com", "budget"
+        )
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        failures = check_budgets(client, self.sizes)
+        self.assertFalse(failures, "\n".join(failures))
+
+
+class RenderTests(SimpleTestCase):
+    def test_values_are_exact(self):
+        inc("model_saves_total", 1234567, model="render.big")
+        inc("model_saves_total", 0.1, model="render.fraction")
+        lines = render().splitlines()
+        self.assertIn('model_saves_total{model="render.big"} 1234567', lines)
+        self.assertIn('model_saves_total{model="render.fraction"} 0.1', lines)
@@ -0,0 +1,30 @@
+# server_clinic/monitoring/views.py
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from .metrics import render
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Сборщик передаёт METRICS_TOKEN заголовком "Authorization: Bearer <токен>".
+# Адрес клиента не проверяется: за обратным прокси на том же сервере все
+# запросы приходят с 127.0.0.1
+def has_metrics_token(request):
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        return False
+    scheme, _, value = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(
+        value.strip().encode(), token.encode()
+    )
+
+
+# Метрики в формате Prometheus: для сборщика с токеном или для сотрудника,
+# вошедшего в админку
+def metrics_view(request):
+    if not has_metrics_token(request) and not (
+        request.user.is_authenticated and request.user.is_staff
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
@@ -75,13 +75,22 @@
 
 # server_clinic/patient/admin.py
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
 from django.db.models import Q
 from django import forms
 from django.urls import path, reverse
-from django.http import HttpResponseRedirect
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect, JsonResponse
 from django.utils.html import format_html
 from .models import Patient
+from .autocomplete import autocomplete_page
+from .filters import AgeBandListFilter
+from .search import search_by_name, search_by_policy
 from death.models import Death
+from server_clinic.caching import label_column
+from server_clinic.exports import ExportMixin
+from server_clinic.importers import ImportMixin
+from server_clinic.large_tables import LargeTableAdminMixin
 
 
 class PatientAdminForm(forms.ModelForm):
@@ -97,20 +106,46 @@ class PatientAdminForm(forms.ModelForm):
 
 
 @admin.register(Patient)
-class PatientAdmin(admin.ModelAdmin):
+class PatientAdmin(
+    ImportMixin, ExportMixin, LargeTableAdminMixin, admin.ModelAdmin
+):
     form = PatientAdminForm
     list_display = (
         "full_name",
-        "age",
+        "get_age",
+        label_column(Patient, "gender"),
+        label_column(Patient, "filial"),
+        "insurance_number",
+        "death_action",
+    )
+    list_filter = ("gender", "filial", AgeBandListFilter)
+    import_register = "patients"
+    export_fields = (
+        "full_name",
+        "birth_date",
         "gender",
+        "phone_number",
         "filial",
         "insurance_number",
-        "death_action",
     )
-    list_filter = ("gender", "filial")
     search_fields = ("full_name__icontains", "insurance_number")
     readonly_fields = ("age", "death_info")
 
+    # Поиск через полнотекстовый индекс ФИО и индекс полиса вместо LIKE '%...%'
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            found = search_by_policy(queryset, search_term)
+        else:
+            found = search_by_name(queryset, search_term)
+        # ChangeList сортирует до поиска: выбранный столбец важнее ранга
+        # совпадения, без него — лучшие совпадения первыми
+        if ORDER_VAR in request.GET:
+            found = found.order_by(*queryset.query.order_by)
+        return found, False
+
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
@@ -119,6 +154,11 @@ class PatientAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.handle_death_record),
                 name="patient_handle_death",
             ),
+            path(
+                "autocomplete/",
+                self.admin_site.admin_view(self.autocomplete_json),
+                name="patient_patient_autocomplete",
+            ),
         ]
         return custom_urls + urls
 
@@ -135,6 +175,19 @@ class PatientAdmin(admin.ModelAdmin):
             reverse("admin:death_death_add") + f"?patient={patient.id}"
         )
 
+    # Быстрый автокомплит пациента для полей autocomplete_fields = ["patient"]
+    def autocomplete_json(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            page = int(request.GET.get("page", 1))
+        except ValueError:
+            page = 1
+        data = autocomplete_page(
+            request.GET.get("term", ""), max(page, 1), request.GET.get("cursor")
+        )
+        return JsonResponse(data)
+
     def death_action(self, obj):
         if hasattr(obj, "death"):
             return format_html(
@@ -149,6 +202,9 @@ class PatientAdmin(admin.ModelAdmin):
     death_action.short_description = "Действия"
 
     def death_info(self, obj):
+        # На странице добавления пациента ещё нет
+        if obj.pk is None:
+            return "-"
         try:
             death = obj.death
             return format_html(
@@ -167,5 +223,12 @@ class PatientAdmin(admin.ModelAdmin):
     death_info.short_description = "Информация о смерти"
     death_info.allow_tags = True
 
+    # Возраст считается в SQL (with_age), сортировка — по индексу birth_date
+    def get_age(self, obj):
+        return obj.age
+
+    get_age.short_description = "Возраст"
+    get_age.admin_order_field = "-birth_date"
+
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related("death")
+        return super().get_queryset(request).select_related("death").with_age()
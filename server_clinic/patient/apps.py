@@ -1,7 +1,18 @@
 # server_clinic/patient/apps.py
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class PatientConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'patient'
+
+    def ready(self):
+        from server_clinic.caching import model_changed
+        from . import signals
+
+        post_save.connect(model_changed, sender=self.get_model("Patient"))
+        post_delete.connect(model_changed, sender=self.get_model("Patient"))
+
+        post_migrate.connect(signals.create_search_index, sender=self)
+        post_migrate.connect(signals.create_postgres_indexes, sender=self)
@@ -0,0 +1,124 @@
+# server_clinic/patient/autocomplete.py
+import hashlib
+import time
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.cache import cache
+from django.db import connections
+from .models import Patient
+from .search import SEARCH_TABLE, is_supported, match_expression, search_by_policy
+
+PAGE_SIZE = 20
+CACHE_TIMEOUT = 300
+CACHE_PREFIX = "patient_autocomplete"
+GENERATION_KEY = f"{CACHE_PREFIX}:generation"
+
+FIELDS = ("id", "full_name", "birth_date", "insurance_number")
+
+
+# Короткая подпись без вычисления возраста
+def patient_label(full_name, birth_date, insurance_number):
+    return f"{full_name}, {birth_date:%d.%m.%Y}, полис {insurance_number}"
+
+
+# Поколение кэша: меняется при любом изменении пациентов
+def cache_generation():
+    return cache.get_or_set(GENERATION_KEY, time.time_ns(), None)
+
+
+def invalidate_cache():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+# Полис: диапазон по уникальному индексу, точное совпадение идёт первым
+def _policy_page(term, cursor, limit):
+    queryset = search_by_policy(Patient.objects.all(), term)
+    if cursor:
+        queryset = queryset.filter(insurance_number__gt=cursor)
+    rows = list(queryset.values_list(*FIELDS)[: limit + 1])
+    return rows, (lambda row: row[3])
+
+
+# ФИО: префиксы токенов в FTS5, курсор по rowid
+def _name_page(term, cursor, limit):
+    after = int(cursor) if cursor else 0
+    expression = match_expression(term)
+    if not expression:
+        return [], None
+    queryset = Patient.objects.all()
+    if is_supported(queryset.db):
+        with connections[queryset.db].cursor() as db_cursor:
+            db_cursor.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+                "AND rowid > %s ORDER BY rowid LIMIT %s",
+                [expression, after, limit + 1],
+            )
+            ids = [row[0] for row in db_cursor.fetchall()]
+        queryset = queryset.filter(pk__in=ids)
+    else:
+        for token in term.split():
+            queryset = queryset.filter(full_name__icontains=token)
+        queryset = queryset.filter(pk__gt=after)
+    rows = list(queryset.order_by("id").values_list(*FIELDS)[: limit + 1])
+    return rows, (lambda row: row[0])
+
+
+def find_patients(term, cursor=None, limit=PAGE_SIZE):
+    term = term.strip()
+    if not term:
+        return [], None
+    page = _policy_page if term.isdigit() else _name_page
+    rows, key = page(term, cursor, limit)
+    next_cursor = str(key(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _cache_key(generation, term, page):
+    digest = hashlib.md5(term.encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{generation}:{digest}:{page}"
+
+
+# Страница в формате select2; номер страницы переводится в курсор
+# предыдущей страницы, поэтому OFFSET и COUNT не используются
+def autocomplete_page(term, page=1, cursor=None):
+    term = term.strip()
+    if cursor is None and page > 1:
+        cursor = autocomplete_page(term, page - 1)["cursor"]
+        if cursor is None:
+            return {"results": [], "pagination": {"more": False}, "cursor": None}
+    key = _cache_key(cache_generation(), term, cursor or "")
+    data = cache.get(key)
+    if data is None:
+        rows, next_cursor = find_patients(term, cursor)
+        data = {
+            "results": [
+                {"id": str(pk), "text": patient_label(full_name, birth_date, number)}
+                for pk, full_name, birth_date, number in rows
+            ],
+            "pagination": {"more": next_cursor is not None},
+            "cursor": next_cursor,
+        }
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
+
+
+class PatientAutocompleteSelect(AutocompleteSelect):
+    url_name = "%s:patient_patient_autocomplete"
+
+
+# Подключает выделенный эндпоинт к autocomplete_fields = ["patient"]
+class PatientAutocompleteMixin:
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if (
+            db_field.name == "patient"
+            and db_field.name in self.get_autocomplete_fields(request)
+        ):
+            kwargs.setdefault(
+                "widget",
+                PatientAutocompleteSelect(
+                    db_field, self.admin_site, using=kwargs.get("using")
+                ),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
@@ -0,0 +1,242 @@
+# server_clinic/patient/dedup.py
+from collections import defaultdict
+from difflib import SequenceMatcher
+from django.db import transaction
+from django.db.models import Count
+from death.cascade import close_registers
+from death.stats import track_patients
+from .models import Patient
+from .search import normalize_name
+from .signals import patients_changed
+
+DEDUP_FIELDS = (
+    "id",
+    "full_name",
+    "birth_date",
+    "gender",
+    "phone_number",
+    "insurance_number",
+)
+DEDUP_THRESHOLD = 0.85
+# Блоки крупнее этого размера пропускаются (например, общий телефон учреждения)
+MAX_BLOCK_SIZE = 200
+DEDUP_CHUNK_SIZE = 5000
+
+# Упрощённый фонетический код для русских ФИО: гласные и парные согласные
+# сводятся к одной букве, мягкий/твёрдый знаки убираются
+PHONETIC_TABLE = str.maketrans(
+    {
+        "о": "а",
+        "я": "а",
+        "ы": "и",
+        "е": "и",
+        "э": "и",
+        "й": "и",
+        "ю": "у",
+        "б": "п",
+        "в": "ф",
+        "г": "к",
+        "д": "т",
+        "ж": "ш",
+        "з": "с",
+        "щ": "ш",
+        "ъ": None,
+        "ь": None,
+    }
+)
+
+
+class MergeError(Exception):
+    pass
+
+
+def phonetic_code(value):
+    code = value.translate(PHONETIC_TABLE)
+    collapsed = []
+    for char in code:
+        if not collapsed or collapsed[-1] != char:
+            collapsed.append(char)
+    return "".join(collapsed)
+
+
+def name_similarity(a, b):
+    return SequenceMatcher(None, normalize_name(a), normalize_name(b)).ratio()
+
+
+# Совпадения даты рождения, пола и телефона добавляются к сходству ФИО
+def pair_bonus(a, b):
+    bonus = 0.0
+    if a[2] == b[2]:
+        bonus += 0.1
+    if a[3] != b[3]:
+        bonus -= 0.2
+    if a[4] and a[4] == b[4]:
+        bonus += 0.1
+    return bonus
+
+
+class DuplicateFinder:
+    def __init__(self, threshold=DEDUP_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.seen = set()
+        self.compared = 0
+        self.skipped_blocks = 0
+
+    def compare_block(self, rows, reason):
+        if len(rows) < 2:
+            return
+        if len(rows) > self.max_block_size:
+            self.skipped_blocks += 1
+            return
+        # SequenceMatcher кэширует разбор второй строки, поэтому она меняется
+        # во внешнем цикле; дешёвые верхние оценки отсекают пары до ratio()
+        matcher = SequenceMatcher(autojunk=False)
+        for i, a in enumerate(rows):
+            matcher.set_seq2(a[-1])
+            for b in rows[i + 1 :]:
+                self.compared += 1
+                matcher.set_seq1(b[-1])
+                bonus = pair_bonus(a, b)
+                if matcher.real_quick_ratio() + bonus < self.threshold:
+                    continue
+                if matcher.quick_ratio() + bonus < self.threshold:
+                    continue
+                score = min(matcher.ratio() + bonus, 1.0)
+                if score < self.threshold:
+                    continue
+                first, second = (a, b) if a[0] < b[0] else (b, a)
+                # Пара могла уже попасть в отчёт из другого блока
+                if (first[0], second[0]) in self.seen:
+                    continue
+                self.seen.add((first[0], second[0]))
+                yield first[:-1], second[:-1], round(score, 3), reason
+
+    # Один проход по индексу birth_date: внутри дня — блок по фамилии,
+    # внутри года — блок по фонетическому коду фамилии и инициалам
+    def birth_date_blocks(self, queryset):
+        day, year = None, None
+        by_surname = defaultdict(list)
+        by_phonetic = defaultdict(list)
+        rows = (
+            queryset.order_by("birth_date")
+            .values_list(*DEDUP_FIELDS)
+            .iterator(chunk_size=DEDUP_CHUNK_SIZE)
+        )
+        for row in rows:
+            if row[2] != day:
+                for block in by_surname.values():
+                    yield from self.compare_block(block, "фамилия и дата рождения")
+                by_surname.clear()
+                day = row[2]
+            if row[2].year != year:
+                for block in by_phonetic.values():
+                    yield from self.compare_block(block, "фонетика ФИО и год рождения")
+                by_phonetic.clear()
+                year = row[2].year
+            normalized = normalize_name(row[1])
+            tokens = normalized.split()
+            if not tokens:
+                continue
+            row += (normalized,)
+            by_surname[tokens[0]].append(row)
+            initials = "".join(token[:1] for token in tokens[1:3])
+            by_phonetic[phonetic_code(tokens[0]) + initials].append(row)
+        for block in by_surname.values():
+            yield from self.compare_block(block, "фамилия и дата рождения")
+        for block in by_phonetic.values():
+            yield from self.compare_block(block, "фонетика ФИО и год рождения")
+
+    # Телефоны, встречающиеся больше одного раза, находит GROUP BY в базе
+    def phone_blocks(self, queryset):
+        phones = (
+            queryset.exclude(phone_number__isnull=True)
+            .exclude(phone_number="")
+            .values("phone_number")
+            .annotate(total=Count("id"))
+            .filter(total__gt=1, total__lte=self.max_block_size)
+            .values_list("phone_number", flat=True)
+            .iterator(chunk_size=DEDUP_CHUNK_SIZE)
+        )
+        batch = []
+        for phone in phones:
+            batch.append(phone)
+            if len(batch) >= DEDUP_CHUNK_SIZE:
+                yield from self._phone_batch(queryset, batch)
+                batch = []
+        yield from self._phone_batch(queryset, batch)
+
+    def _phone_batch(self, queryset, phones):
+        blocks = defaultdict(list)
+        for row in queryset.filter(phone_number__in=phones).values_list(*DEDUP_FIELDS):
+            blocks[row[4]].append(row + (normalize_name(row[1]),))
+        for block in blocks.values():
+            yield from self.compare_block(block, "телефон")
+
+    def find(self, queryset=None):
+        queryset = Patient.objects.all() if queryset is None else queryset
+        yield from self.birth_date_blocks(queryset)
+        yield from self.phone_blocks(queryset)
+
+
+# Записи дубля, которые после переноса нарушили бы unique_together
+# (например, диагноз с тем же кодом МКБ у обоих пациентов)
+def clashing_rows(model, field, survivor, duplicate):
+    clashes = set()
+    for unique in model._meta.unique_together:
+        if field.name not in unique:
+            continue
+        others = [name for name in unique if name != field.name]
+        existing = set(
+            model._base_manager.filter(**{field.name: survivor}).values_list(*others)
+        )
+        for pk, *values in model._base_manager.filter(
+            **{field.name: duplicate}
+        ).values_list("pk", *others):
+            if tuple(values) in existing:
+                clashes.add(pk)
+    return model._base_manager.filter(pk__in=clashes).order_by("pk")
+
+
+# Перенос связанных записей дубля на основного пациента массовыми UPDATE.
+# Записи дубля, совпадающие с записями основного по unique_together, иначе
+# удалились бы вместе с дублем: слияние останавливается с их списком
+def move_relations(survivor, duplicate):
+    moved = {}
+    for relation in Patient._meta.related_objects:
+        model = relation.related_model
+        field = relation.field
+        rows = model._base_manager.filter(**{field.name: duplicate})
+        if relation.one_to_one:
+            if not rows.exists():
+                continue
+            if model._base_manager.filter(**{field.name: survivor}).exists():
+                raise MergeError(
+                    f"{model._meta.verbose_name}: запись есть у обоих пациентов"
+                )
+        clashes = clashing_rows(model, field, survivor, duplicate)
+        if clashes:
+            raise MergeError(
+                f"{model._meta.verbose_name_plural}: записи есть у обоих пациентов "
+                f"({', '.join(map(str, clashes))})"
+            )
+        moved[model._meta.label] = rows.update(**{field.name: survivor})
+    return moved
+
+
+@transaction.atomic
+def merge_patients(survivor, duplicate):
+    if survivor.pk == duplicate.pk:
+        raise MergeError("Нельзя объединить пациента с самим собой")
+    # Запись о смерти дубля переходит к основному пациенту с его филиалом и полом
+    with track_patients([survivor.pk, duplicate.pk]):
+        moved = move_relations(survivor, duplicate)
+    close_registers([survivor.pk])
+    if not survivor.phone_number and duplicate.phone_number:
+        survivor.phone_number = duplicate.phone_number
+        Patient.objects.filter(pk=survivor.pk).update(
+            phone_number=survivor.phone_number
+        )
+    duplicate.delete()
+    patients_changed([survivor])
+    return moved
@@ -0,0 +1,67 @@
+# server_clinic/patient/filters.py
+from django.conf import settings
+from django.contrib import admin
+from server_clinic.constants import AGE_BANDS
+from .models import birth_date_bounds
+
+
+def get_age_bands():
+    return getattr(settings, "PATIENT_AGE_BANDS", AGE_BANDS)
+
+
+def band_value(min_age, max_age):
+    return f"{min_age}-{'' if max_age is None else max_age}"
+
+
+def band_label(min_age, max_age):
+    if max_age is None:
+        return f"{min_age} лет и старше"
+    return f"{min_age}–{max_age} лет"
+
+
+# Фильтр по возрастной группе: диапазон по индексу birth_date
+class AgeBandListFilter(admin.SimpleListFilter):
+    title = "Возрастная группа"
+    parameter_name = "age_band"
+    birth_date_field = "birth_date"
+
+    def lookups(self, request, model_admin):
+        return [
+            (band_value(min_age, max_age), band_label(min_age, max_age))
+            for min_age, max_age in get_age_bands()
+        ]
+
+    def get_band(self):
+        for min_age, max_age in get_age_bands():
+            if band_value(min_age, max_age) == self.value():
+                return min_age, max_age
+        return None
+
+    def queryset(self, request, queryset):
+        band = self.get_band()
+        if band is None:
+            return queryset
+        bounds = birth_date_bounds(*band)
+        return queryset.filter(
+            **{
+                f"{self.birth_date_field}__{lookup}": value
+                for lookup, value in bounds.items()
+            }
+        )
+
+
+# Возраст на дату события (например, смерти) из колонки регистра
+# (PatientSnapshotModel.age): диапазон по её индексу
+class AgeAtEventBandListFilter(AgeBandListFilter):
+    age_field = "age"
+
+    def queryset(self, request, queryset):
+        band = self.get_band()
+        if band is None:
+            return queryset
+        min_age, max_age = band
+        if min_age is not None:
+            queryset = queryset.filter(**{f"{self.age_field}__gte": min_age})
+        if max_age is not None:
+            queryset = queryset.filter(**{f"{self.age_field}__lte": max_age})
+        return queryset
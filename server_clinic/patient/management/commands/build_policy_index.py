@@ -0,0 +1,21 @@
+# server_clinic/patient/management/commands/build_policy_index.py
+import time
+from django.core.management.base import BaseCommand
+from patient.policy_index import build_index, default_index_path
+
+
+class Command(BaseCommand):
+    help = "Строит отсортированный индекс полисов ОМС для проверки файлов через mmap"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Путь к файлу индекса (POLICY_INDEX_PATH)")
+
+    def handle(self, *args, **options):
+        path = options["output"] or default_index_path()
+        started = time.monotonic()
+        count = build_index(path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Индекс {path}: полисов {count}, за {time.monotonic() - started:.1f} с"
+            )
+        )
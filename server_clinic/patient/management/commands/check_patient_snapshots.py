@@ -0,0 +1,37 @@
+# server_clinic/patient/management/commands/check_patient_snapshots.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from patient.snapshots import drifted, repair, snapshot_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет копии данных пациента (ФИО, пол, дата рождения, филиал, возраст) "
+        "в регистрах с таблицей patient. С --repair исправляет расхождения "
+        "одним UPDATE на таблицу; без него завершается ошибкой, если они есть"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair", action="store_true", help="Исправить расхождения"
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in snapshot_models():
+            started = time.monotonic()
+            count = drifted(model).count()
+            line = f"{model._meta.verbose_name_plural}: расхождений {count}"
+            if count and options["repair"]:
+                with transaction.atomic():
+                    updated = repair(model)
+                line += f", исправлено {updated}"
+            self.stdout.write(f"{line} ({time.monotonic() - started:.1f} с)")
+            total += count
+        if total and not options["repair"]:
+            raise CommandError(
+                f"Копии данных пациентов расходятся в {total} строках: "
+                "запустите с --repair"
+            )
+        self.stdout.write(self.style.SUCCESS("Копии данных пациентов согласованы"))
@@ -0,0 +1,75 @@
+# server_clinic/patient/management/commands/check_policies.py
+import csv
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from patient.policy_index import PolicyIndex
+
+CHECK_BATCH_SIZE = 100000
+
+
+class Command(BaseCommand):
+    help = (
+        "Проверяет файл с полисами ОМС (по одному в строке или колонка CSV) "
+        "по индексу build_policy_index и выводит найден ли пациент"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Входной файл, '-' — stdin")
+        parser.add_argument("--index", help="Путь к файлу индекса")
+        parser.add_argument("--column", help="Имя колонки с полисом во входном CSV")
+        parser.add_argument("--output", help="CSV с результатом (полис;id пациента)")
+        parser.add_argument(
+            "--missing-only", action="store_true", help="Выводить только ненайденные"
+        )
+
+    def read_numbers(self, file, column):
+        if column:
+            sample = file.read(4096)
+            file.seek(0)
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+            for row in csv.DictReader(file, dialect=dialect):
+                yield (row.get(column) or "").strip()
+        else:
+            for line in file:
+                yield line.strip()
+
+    def handle(self, *args, **options):
+        try:
+            index = PolicyIndex(options["index"])
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        source = (
+            sys.stdin
+            if options["path"] == "-"
+            else open(options["path"], encoding="utf-8-sig", newline="")
+        )
+        output = (
+            open(options["output"], "w", encoding="utf-8", newline="")
+            if options["output"]
+            else self.stdout
+        )
+        writer = csv.writer(output, delimiter=";", lineterminator="\n")
+        total = found = 0
+
+        def check(batch):
+            nonlocal total, found
+            for number, pk in zip(batch, index.lookup_many(batch)):
+                total += 1
+                found += pk is not None
+                if pk is None or not options["missing_only"]:
+                    writer.writerow([number, "" if pk is None else pk])
+
+        with index, source:
+            batch = []
+            for number in self.read_numbers(source, options["column"]):
+                if number:
+                    batch.append(number)
+                if len(batch) >= CHECK_BATCH_SIZE:
+                    check(batch)
+                    batch = []
+            check(batch)
+        if options["output"]:
+            output.close()
+        self.stderr.write(
+            f"Проверено: {total}, найдено: {found}, не найдено: {total - found}"
+        )
@@ -0,0 +1,64 @@
+# server_clinic/patient/management/commands/find_duplicates.py
+import csv
+import time
+from django.core.management.base import BaseCommand
+from patient.dedup import DEDUP_THRESHOLD, MAX_BLOCK_SIZE, DuplicateFinder
+
+
+class Command(BaseCommand):
+    help = (
+        "Ищет вероятные дубли пациентов (разные полисы, опечатки в ФИО) "
+        "и выводит пары кандидатов с оценкой сходства"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="CSV с парами кандидатов")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEDUP_THRESHOLD,
+            help="Минимальная оценка пары (0..1)",
+        )
+        parser.add_argument(
+            "--max-block-size",
+            type=int,
+            default=MAX_BLOCK_SIZE,
+            help="Блоки крупнее пропускаются",
+        )
+
+    def handle(self, *args, **options):
+        finder = DuplicateFinder(options["threshold"], options["max_block_size"])
+        output = (
+            open(options["output"], "w", encoding="utf-8-sig", newline="")
+            if options["output"]
+            else self.stdout
+        )
+        writer = csv.writer(output, delimiter=";", lineterminator="\n")
+        writer.writerow(
+            [
+                "id_1",
+                "полис_1",
+                "ФИО_1",
+                "дата_рождения_1",
+                "id_2",
+                "полис_2",
+                "ФИО_2",
+                "дата_рождения_2",
+                "оценка",
+                "блок",
+            ]
+        )
+        started = time.monotonic()
+        found = 0
+        for a, b, score, reason in finder.find():
+            found += 1
+            writer.writerow(
+                [a[0], a[5], a[1], a[2], b[0], b[5], b[1], b[2], score, reason]
+            )
+        if options["output"]:
+            output.close()
+        self.stderr.write(
+            f"Пар найдено: {found}, сравнений: {finder.compared}, "
+            f"пропущено крупных блоков: {finder.skipped_blocks}, "
+            f"время: {time.monotonic() - started:.1f} с"
+        )
@@ -0,0 +1,51 @@
+# server_clinic/patient/management/commands/import_register.py
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from server_clinic.importers import IMPORT_BATCH_SIZE, REGISTERS, import_register
+
+
+class Command(BaseCommand):
+    help = "Загружает реестр (пациенты, смерти, диагнозы, дети-инвалиды) из CSV/XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument("register", choices=sorted(REGISTERS))
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("csv", "xlsx"))
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--errors", help="CSV-файл для построчных ошибок")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "xlsx" if path.lower().endswith(".xlsx") else "csv"
+        )
+        started = time.monotonic()
+        try:
+            result = import_register(
+                options["register"],
+                path,
+                file_format,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+        except (OSError, ValueError, csv.Error) as e:
+            raise CommandError(e)
+        elapsed = time.monotonic() - started
+
+        if options["errors"]:
+            with open(options["errors"], "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.writer(f, delimiter=";")
+                writer.writerow(["Строка", "Ошибка"])
+                writer.writerows(result.errors)
+        else:
+            for line, message in result.errors[:50]:
+                self.stderr.write(f"Строка {line}: {message}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Строк: {result.total}, сохранено: {result.saved}, "
+                f"ошибок: {len(result.errors)}, за {elapsed:.1f} с"
+            )
+        )
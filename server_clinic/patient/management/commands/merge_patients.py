@@ -0,0 +1,32 @@
+# server_clinic/patient/management/commands/merge_patients.py
+from django.core.management.base import BaseCommand, CommandError
+from patient.dedup import MergeError, merge_patients
+from patient.models import Patient
+
+
+class Command(BaseCommand):
+    help = (
+        "Объединяет дубль с основным пациентом: переносит смерть, диагнозы "
+        "и инвалидность на основного и удаляет дубль"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("survivor", type=int, help="id основного пациента")
+        parser.add_argument("duplicate", type=int, help="id дубля")
+
+    def handle(self, *args, **options):
+        try:
+            survivor = Patient.objects.get(pk=options["survivor"])
+            duplicate = Patient.objects.get(pk=options["duplicate"])
+        except Patient.DoesNotExist as e:
+            raise CommandError(e)
+        try:
+            moved = merge_patients(survivor, duplicate)
+        except MergeError as e:
+            raise CommandError(e)
+        for label, count in moved.items():
+            self.stdout.write(f"{label}: перенесено {count}")
+        self.stdout.write(
+            f"Пациент {duplicate.insurance_number} объединён "
+            f"с {survivor.insurance_number}"
+        )
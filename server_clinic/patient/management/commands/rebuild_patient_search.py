@@ -0,0 +1,17 @@
+# server_clinic/patient/management/commands/rebuild_patient_search.py
+from django.core.management.base import BaseCommand
+from patient.models import Patient
+from patient.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Перестраивает полнотекстовый индекс ФИО пациентов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        queryset = Patient.objects.using(options["database"]).all()
+        total = rebuild_search_index(queryset, chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано пациентов: {total}"))
@@ -0,0 +1,69 @@
+# server_clinic/patient/management/commands/reconcile_attachment.py
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from patient.reconcile import RECONCILE_CHUNK_SIZE, ReconcileError, Reconciler
+from server_clinic.importers import read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет список прикреплённого населения от страховой с таблицей пациентов. "
+        "Файл должен быть отсортирован по insurance_number. "
+        "Без --apply только формирует отчёт о различиях"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("csv", "xlsx"))
+        parser.add_argument("--apply", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=RECONCILE_CHUNK_SIZE)
+        parser.add_argument("--report", help="CSV-файл для отчёта о различиях")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "xlsx" if path.lower().endswith(".xlsx") else "csv"
+        )
+        report_file = writer = None
+        if options["report"]:
+            report_file = open(options["report"], "w", encoding="utf-8-sig", newline="")
+            writer = csv.writer(report_file, delimiter=";")
+            writer.writerow(["Действие", "Полис ОМС", "ФИО", "Изменения"])
+
+        def report(action, number, full_name, changes):
+            if writer:
+                writer.writerow(
+                    [
+                        action,
+                        number,
+                        full_name,
+                        ", ".join(
+                            f"{name}: {old} → {new}"
+                            for name, (old, new) in changes.items()
+                        ),
+                    ]
+                )
+
+        reconciler = Reconciler(
+            apply=options["apply"], batch_size=options["batch_size"], report=report
+        )
+        started = time.monotonic()
+        try:
+            result = reconciler.run(read_rows(path, file_format))
+        except (OSError, ValueError, csv.Error, ReconcileError) as e:
+            raise CommandError(e)
+        finally:
+            if report_file:
+                report_file.close()
+
+        for line, message in result.errors[:50]:
+            self.stderr.write(f"Строка {line}: {message}")
+        mode = "применено" if options["apply"] else "пробный прогон"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{mode}: новых {result.new}, изменённых {result.changed}, "
+                f"открепившихся {result.detached}, без изменений {result.unchanged}, "
+                f"ошибок {len(result.errors)}, за {time.monotonic() - started:.1f} с"
+            )
+        )
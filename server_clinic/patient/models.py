@@ -1,5 +1,7 @@
 # server_clinic/patient/model.py
 from django.db import models
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import ExtractDay, ExtractMonth, ExtractYear
 from datetime import date
 from django.core.validators import RegexValidator
 from dateutil.relativedelta import relativedelta
@@ -7,6 +9,95 @@ from server_clinic.constants import GENDER_CHOICES, FILIAL
 from server_clinic.validators import validate_birth_date, validate_insurance_number
 
 
+# Возраст в SQL: разница лет минус 1, если день рождения в году ещё не наступил.
+# on — дата или имя поля с датой (например, "death_date")
+def age_expression(birth_field="birth_date", on=None):
+    on = on or date.today()
+    if isinstance(on, date):
+        year, month, day = Value(on.year), Value(on.month), Value(on.day)
+    else:
+        year, month, day = ExtractYear(on), ExtractMonth(on), ExtractDay(on)
+    birthday_ahead = Case(
+        When(Q(**{f"{birth_field}__month__gt": month}), then=Value(1)),
+        When(
+            Q(**{f"{birth_field}__month": month, f"{birth_field}__day__gt": day}),
+            then=Value(1),
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return year - ExtractYear(birth_field) - birthday_ahead
+
+
+# Полных лет на дату on
+def age_at(birth_date, on):
+    return (
+        on.year
+        - birth_date.year
+        - ((on.month, on.day) < (birth_date.month, birth_date.day))
+    )
+
+
+# День, с которого исполняется age полных лет (как в age_at: родившимся
+# 29 февраля в невисокосный год — 1 марта)
+def birthday_at(birth_date, age):
+    year = birth_date.year + age
+    try:
+        return birth_date.replace(year=year)
+    except ValueError:
+        return date(year, 3, 1)
+
+
+# То же в SQL: SQLite сам переносит 29 февраля на 1 марта, в PostgreSQL
+# дата собирается из года, месяца и числа дней (интервал дал бы 28 февраля)
+class BirthdayAt(models.Func):
+    output_field = models.DateField()
+
+    def __init__(self, expression, age, **extra):
+        super().__init__(expression, age=int(age), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="date(%(expressions)s, '+%(age)s years')",
+            **extra_context,
+        )
+
+    # Выражение входит в SQL трижды — и его параметры тоже
+    def as_postgresql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return (
+            f"(make_date(EXTRACT(YEAR FROM {sql})::int + {self.extra['age']}, "
+            f"EXTRACT(MONTH FROM {sql})::int, 1) "
+            f"+ (EXTRACT(DAY FROM {sql})::int - 1))",
+            (*params, *params, *params),
+        )
+
+
+# Диапазон дат рождения для возраста от min_age до max_age включительно
+def birth_date_bounds(min_age=None, max_age=None, on=None):
+    on = on or date.today()
+    bounds = {}
+    if min_age is not None:
+        bounds["lte"] = on - relativedelta(years=min_age)
+    if max_age is not None:
+        bounds["gt"] = on - relativedelta(years=max_age + 1)
+    return bounds
+
+
+class PatientQuerySet(models.QuerySet):
+    def with_age(self, on=None):
+        return self.annotate(age_years=age_expression("birth_date", on))
+
+    # Индексируемый диапазон по birth_date вместо вычисления возраста
+    def age_between(self, min_age=None, max_age=None, on=None):
+        bounds = birth_date_bounds(min_age, max_age, on)
+        return self.filter(
+            **{f"birth_date__{lookup}": value for lookup, value in bounds.items()}
+        )
+
+
 # Модель пациента
 class Patient(models.Model):
     # Базовые данные пациента
@@ -47,6 +138,8 @@ class Patient(models.Model):
         help_text="16 цифр без пробелов и разделителей",
     )
 
+    objects = PatientQuerySet.as_manager()
+
     class Meta:
         db_table = "patient"
         verbose_name = "Пациент"
@@ -54,13 +147,16 @@ class Patient(models.Model):
         indexes = [
             models.Index(fields=["full_name"]),
             models.Index(fields=["insurance_number"]),
+            models.Index(fields=["birth_date"]),
         ]
 
     # Метод для строкового представления объекта
     def __str__(self):
         return f"{self.full_name} {self.age} лет {self.gender} ({self.birth_date}) {self.filial}"
 
-    # Свойство для получения возраста
+    # Свойство для получения возраста (из аннотации with_age, если она есть)
     @property
     def age(self):
+        if "age_years" in self.__dict__:
+            return self.age_years
         return relativedelta(date.today(), self.birth_date).years
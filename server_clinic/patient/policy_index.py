@@ -0,0 +1,174 @@
+# server_clinic/patient/policy_index.py
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from django.conf import settings
+from .models import Patient
+
+try:
+    import numpy
+except ImportError:  # без numpy поиск идёт через bisect по memoryview
+    numpy = None
+
+# Формат файла: заголовок (магия, версия, число записей), затем отсортированный
+# массив полисов int64 и параллельный массив id пациентов int64; всё little-endian
+MAGIC = b"PIDX"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+BUILD_CHUNK_SIZE = 50000
+
+
+def default_index_path():
+    return getattr(
+        settings,
+        "POLICY_INDEX_PATH",
+        os.path.join(settings.BASE_DIR, "policy_index.bin"),
+    )
+
+
+# Полис ОМС ровно 16 цифр (validate_insurance_number), поэтому помещается в int64
+def policy_to_int(value):
+    value = str(value).strip()
+    if len(value) != 16 or not value.isdigit():
+        return None
+    return int(value)
+
+
+# array пишет в порядке байтов машины, файл — всегда little-endian
+def _write_array(values, file):
+    if sys.byteorder == "big":
+        values = array("q", values)
+        values.byteswap()
+    values.tofile(file)
+
+
+# Массив int64 файла: на little-endian — вид на mmap без копии, иначе копия
+# с переставленными байтами
+def _read_array(view):
+    if sys.byteorder == "little":
+        return view.cast("q")
+    values = array("q")
+    values.frombytes(view)
+    values.byteswap()
+    return values
+
+
+def _write_sections(out, ids_file, queryset, chunk_size):
+    count = 0
+    policies, ids = array("q"), array("q")
+    rows = (
+        queryset.order_by("insurance_number")
+        .values_list("insurance_number", "id")
+        .iterator(chunk_size=chunk_size)
+    )
+    for number, pk in rows:
+        value = policy_to_int(number)
+        if value is None:
+            continue
+        policies.append(value)
+        ids.append(pk)
+        if len(policies) >= chunk_size:
+            _write_array(policies, out)
+            _write_array(ids, ids_file)
+            count += len(policies)
+            policies, ids = array("q"), array("q")
+    _write_array(policies, out)
+    _write_array(ids, ids_file)
+    count += len(policies)
+    ids_file.seek(0)
+    while block := ids_file.read(1 << 20):
+        out.write(block)
+    return count
+
+
+# Запись индекса потоком: полисы 16-значные, поэтому строковый порядок
+# совпадает с числовым и сортировать в памяти не нужно
+def build_index(path=None, queryset=None, chunk_size=BUILD_CHUNK_SIZE):
+    path = path or default_index_path()
+    queryset = Patient.objects.all() if queryset is None else queryset
+    directory = os.path.dirname(os.path.abspath(path))
+    out = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+    try:
+        with out, tempfile.TemporaryFile(dir=directory) as ids_file:
+            out.write(HEADER.pack(MAGIC, VERSION, 0))
+            count = _write_sections(out, ids_file, queryset, chunk_size)
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, VERSION, count))
+            out.flush()
+            os.fsync(out.fileno())
+        # Атомарная замена: процессы со старым mmap продолжают читать прежний файл
+        os.chmod(out.name, 0o644)
+        os.replace(out.name, path)
+    except BaseException:
+        if os.path.exists(out.name):
+            os.unlink(out.name)
+        raise
+    return count
+
+
+class PolicyIndex:
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        with open(self.path, "rb") as f:
+            magic, version, self.count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path}: неизвестный формат индекса полисов")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        start = HEADER.size
+        middle = start + self.count * 8
+        view = memoryview(self._mmap)
+        self.policies = _read_array(view[start:middle])
+        self.ids = _read_array(view[middle : middle + self.count * 8])
+        if numpy is not None:
+            self._np_policies = numpy.frombuffer(
+                self._mmap, dtype="<i8", count=self.count, offset=start
+            )
+            self._np_ids = numpy.frombuffer(
+                self._mmap, dtype="<i8", count=self.count, offset=middle
+            )
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, number):
+        value = policy_to_int(number)
+        if value is None or not self.count:
+            return None
+        position = bisect_left(self.policies, value)
+        if position < self.count and self.policies[position] == value:
+            return self.ids[position]
+        return None
+
+    # Пакетная проверка: список id пациента или None для каждого полиса
+    def lookup_many(self, numbers):
+        values = [policy_to_int(number) for number in numbers]
+        if numpy is None or not self.count:
+            return [
+                None if value is None else self.lookup(str(value).zfill(16))
+                for value in values
+            ]
+        valid = numpy.array([value is not None for value in values], dtype=bool)
+        keys = numpy.array([value or 0 for value in values], dtype="<i8")
+        positions = numpy.searchsorted(self._np_policies, keys)
+        positions[positions >= self.count] = 0
+        found = valid & (self._np_policies[positions] == keys)
+        ids = self._np_ids[positions]
+        return [int(pk) if hit else None for pk, hit in zip(ids, found)]
+
+    def close(self):
+        if numpy is not None:
+            del self._np_policies, self._np_ids
+        for values in (self.policies, self.ids):
+            if isinstance(values, memoryview):
+                values.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
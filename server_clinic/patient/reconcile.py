@@ -0,0 +1,168 @@
+# server_clinic/patient/reconcile.py
+from django.core.exceptions import ValidationError
+from contextlib import nullcontext
+from django.db import transaction
+from death.stats import track_patients
+from server_clinic.importers import ImportResult, RegisterImporter, policy_number
+from .models import Patient
+from .signals import patients_changed
+
+# Поля, которые сверяются со списком прикреплённых от страховой
+COMPARE_FIELDS = ("full_name", "birth_date", "gender", "filial", "phone_number")
+RECONCILE_CHUNK_SIZE = 2000
+
+NEW, CHANGED, DETACHED, INVALID = "new", "changed", "detached", "invalid"
+
+
+class ReconcileError(Exception):
+    pass
+
+
+class ReconcileResult(ImportResult):
+    def __init__(self):
+        super().__init__()
+        self.new = 0
+        self.changed = 0
+        self.detached = 0
+        self.unchanged = 0
+
+
+# Строки файла как пары (полис, проверенный Patient); файл должен быть
+# отсортирован по полису. Строка с ошибкой идёт с patient=None, чтобы запись
+# базы с тем же полисом не сочлась откреплённой
+def iter_registry(rows, result):
+    importer = RegisterImporter("patients")
+    previous = None
+    for line, row in enumerate(rows, start=2):
+        result.total += 1
+        try:
+            patient = importer.build(row, {})
+        except ValidationError as e:
+            result.add_error(line, e)
+            patient = None
+        key = patient.insurance_number if patient else policy_number(row)
+        if not key:
+            continue
+        if previous is not None and key <= previous:
+            raise ReconcileError(
+                f"Строка {line}: файл не отсортирован по полису ОМС "
+                f"или полис {key} повторяется"
+            )
+        previous = key
+        yield key, patient
+
+
+# Таблица patient по возрастанию полиса порциями по ключу (без открытого курсора,
+# чтобы вставки во время прохода не попадали в чтение)
+def iter_database(chunk_size=RECONCILE_CHUNK_SIZE):
+    last = ""
+    while True:
+        chunk = list(
+            Patient.objects.filter(insurance_number__gt=last)
+            .order_by("insurance_number")
+            .values_list("id", "insurance_number", *COMPARE_FIELDS)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield from chunk
+        last = chunk[-1][1]
+
+
+def field_changes(patient, row):
+    changes = {}
+    for name, old in zip(COMPARE_FIELDS, row[2:]):
+        new = getattr(patient, name)
+        # Пустой телефон в списке не затирает известный номер
+        if name == "phone_number" and not new:
+            continue
+        if new != old:
+            changes[name] = (old, new)
+    return changes
+
+
+# Слияние двух отсортированных потоков за один проход, память O(1)
+def merge(registry, database):
+    row = next(database, None)
+    for key, patient in registry:
+        while row is not None and row[1] < key:
+            yield DETACHED, None, row, {}
+            row = next(database, None)
+        if row is not None and row[1] == key:
+            if patient is None:
+                yield INVALID, None, row, {}
+            else:
+                patient.pk = row[0]
+                yield CHANGED, patient, row, field_changes(patient, row)
+            row = next(database, None)
+        elif patient is not None:
+            yield NEW, patient, None, {}
+    while row is not None:
+        yield DETACHED, None, row, {}
+        row = next(database, None)
+
+
+class Reconciler:
+    def __init__(self, apply=False, batch_size=RECONCILE_CHUNK_SIZE, report=None):
+        self.apply = apply
+        self.batch_size = batch_size
+        self.report = report  # callable(action, insurance_number, full_name, changes)
+        self.to_create = []
+        self.to_update = []
+
+    def flush(self):
+        if not (self.to_create or self.to_update):
+            return
+        with transaction.atomic(), track_patients(
+            [patient.pk for patient in self.to_update]
+        ):
+            Patient.objects.bulk_create(self.to_create, batch_size=self.batch_size)
+            Patient.objects.bulk_update(
+                self.to_update, COMPARE_FIELDS, batch_size=self.batch_size
+            )
+            numbers = [patient.insurance_number for patient in self.to_create]
+            patients_changed(
+                list(
+                    Patient.objects.filter(insurance_number__in=numbers).only(
+                        "id", "full_name", "insurance_number"
+                    )
+                )
+                + self.to_update
+            )
+        self.to_create = []
+        self.to_update = []
+
+    # С --apply весь проход — одна транзакция: неотсортированный файл
+    # обнаруживается посреди потока и не должен оставить часть пачек в базе
+    def run(self, rows):
+        with transaction.atomic() if self.apply else nullcontext():
+            return self.reconcile(rows)
+
+    def reconcile(self, rows):
+        result = ReconcileResult()
+        for action, patient, row, changes in merge(
+            iter_registry(rows, result), iter_database(self.batch_size)
+        ):
+            # Строка файла уже в ошибках, запись базы остаётся как есть
+            if action == INVALID:
+                continue
+            if action == CHANGED and not changes:
+                result.unchanged += 1
+                continue
+            setattr(result, action, getattr(result, action) + 1)
+            if self.report:
+                number = patient.insurance_number if patient else row[1]
+                full_name = patient.full_name if patient else row[2]
+                self.report(action, number, full_name, changes)
+            if not self.apply:
+                continue
+            if action == NEW:
+                self.to_create.append(patient)
+            elif action == CHANGED:
+                if not patient.phone_number:
+                    patient.phone_number = row[2 + COMPARE_FIELDS.index("phone_number")]
+                self.to_update.append(patient)
+            if len(self.to_create) + len(self.to_update) >= self.batch_size:
+                self.flush()
+        if self.apply:
+            self.flush()
+        return result
@@ -0,0 +1,151 @@
+# server_clinic/patient/resolver.py
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from django.core.cache import caches
+from server_clinic.caching import cache_generation, invalidate_model_cache
+from .models import Patient
+
+RESOLVER_FIELDS = ("id", "full_name", "birth_date", "gender", "filial")
+RESOLVER_MAXSIZE = 10000
+# Срок жизни записи в памяти процесса и в общем кэше
+RESOLVER_TTL = 300
+CACHE_PREFIX = "patient_policy"
+
+PatientRecord = namedtuple("PatientRecord", RESOLVER_FIELDS)
+
+_MISSING = "-"  # отрицательный результат в общем кэше
+
+
+# Полис ОМС → (id, ФИО, дата рождения, пол, филиал) с LRU в памяти процесса
+# и, по желанию, общим кэшем Django (PATIENT_RESOLVER_CACHE = "<alias>").
+# Записи помечены поколением таблицы пациентов (server_clinic.caching): правка
+# пациента в любом процессе делает их промахами во всех остальных — по полису
+# не найдётся удалённый, объединённый или сменивший полис пациент
+class PatientResolver:
+    def __init__(self, maxsize=RESOLVER_MAXSIZE, ttl=RESOLVER_TTL, cache_alias=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()  # полис → (запись или None, срок, поколение)
+        self._numbers = {}  # id → полис, для сброса при смене полиса
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def shared_cache(self):
+        alias = self.cache_alias or getattr(settings, "PATIENT_RESOLVER_CACHE", None)
+        return caches[alias] if alias else None
+
+    def _remember(self, number, record, generation):
+        self._entries[number] = (record, time.monotonic() + self.ttl, generation)
+        self._entries.move_to_end(number)
+        if record is not None:
+            self._numbers[record.id] = number
+        while len(self._entries) > self.maxsize:
+            _, (old, _, _) = self._entries.popitem(last=False)
+            if old is not None:
+                self._numbers.pop(old.id, None)
+
+    def _lookup(self, number, generation):
+        entry = self._entries.get(number)
+        if entry is None or entry[1] < time.monotonic() or entry[2] != generation:
+            return False, None
+        self._entries.move_to_end(number)
+        return True, entry[0]
+
+    def resolve(self, number):
+        return self.resolve_many([number]).get(number)
+
+    # Пакетное разрешение: память процесса → общий кэш → один запрос IN
+    def resolve_many(self, numbers):
+        found, missing = {}, []
+        generation = cache_generation(Patient)
+        prefix = f"{CACHE_PREFIX}:{generation}"
+        with self._lock:
+            for number in set(numbers):
+                hit, record = self._lookup(number, generation)
+                if hit:
+                    self.hits += 1
+                    if record is not None:
+                        found[number] = record
+                else:
+                    missing.append(number)
+            self.misses += len(missing)
+        if not missing:
+            return found
+
+        loaded = {}
+        shared = self.shared_cache
+        if shared is not None:
+            cached = shared.get_many([f"{prefix}:{n}" for n in missing])
+            for key, value in cached.items():
+                number = key.rsplit(":", 1)[1]
+                loaded[number] = None if value == _MISSING else PatientRecord(*value)
+            missing = [number for number in missing if number not in loaded]
+        if missing:
+            missing = set(missing)
+            rows = Patient.objects.filter(insurance_number__in=missing).values_list(
+                "insurance_number", *RESOLVER_FIELDS
+            )
+            from_db = {row[0]: PatientRecord(*row[1:]) for row in rows}
+            for number in missing:
+                loaded[number] = from_db.get(number)
+            if shared is not None:
+                shared.set_many(
+                    {
+                        f"{prefix}:{number}": (tuple(record) if record else _MISSING)
+                        for number, record in loaded.items()
+                        if number in missing
+                    },
+                    self.ttl,
+                )
+        with self._lock:
+            for number, record in loaded.items():
+                self._remember(number, record, generation)
+        found.update(
+            (number, record) for number, record in loaded.items() if record is not None
+        )
+        return found
+
+    # Сброс во всех процессах — новым поколением; свои записи удаляются сразу
+    def invalidate_many(self, numbers=(), ids=()):
+        numbers = set(numbers)
+        with self._lock:
+            numbers.update(self._numbers.pop(pk) for pk in ids if pk in self._numbers)
+            for number in numbers:
+                entry = self._entries.pop(number, None)
+                if entry and entry[0] is not None:
+                    self._numbers.pop(entry[0].id, None)
+        invalidate_model_cache(Patient)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._numbers.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+# Пациент с загруженными полями записи, остальные поля отложены
+def as_patient(record, number, using="default"):
+    values = {**record._asdict(), "insurance_number": number}
+    field_names = [
+        field.attname
+        for field in Patient._meta.concrete_fields
+        if field.attname in values
+    ]
+    return Patient.from_db(using, field_names, [values[name] for name in field_names])
+
+
+resolver = PatientResolver()
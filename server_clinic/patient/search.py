@@ -0,0 +1,118 @@
+# server_clinic/patient/search.py
+import re
+from django.db import connections
+from django.db.models import Q
+
+# Теневой полнотекстовый индекс ФИО (SQLite FTS5)
+SEARCH_TABLE = "patient_name_fts"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+# Нормализация ФИО: регистр, ё→е, разбиение на фамилию/имя/отчество
+def normalize_name(value):
+    value = (value or "").casefold().replace("ё", "е")
+    return " ".join(_TOKEN_RE.findall(value))
+
+
+def name_tokens(value):
+    return normalize_name(value).split()
+
+
+def is_supported(using="default"):
+    return connections[using].vendor == "sqlite"
+
+
+def ensure_search_index(using="default"):
+    if not is_supported(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(name, tokenize='unicode61', prefix='2 3')"
+        )
+
+
+# Обновление записей индекса для пар (id, full_name)
+def index_patients(rows, using="default"):
+    if not is_supported(using):
+        return
+    rows = [(pk, normalize_name(full_name)) for pk, full_name in rows]
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(pk,) for pk, _ in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name) VALUES (%s, %s)", rows
+        )
+
+
+def unindex_patients(ids, using="default"):
+    if not is_supported(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(pk,) for pk in ids]
+        )
+
+
+# Полное перестроение индекса пачками
+def rebuild_search_index(queryset, chunk_size=5000):
+    using = queryset.db
+    if not is_supported(using):
+        return 0
+    ensure_search_index(using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    total = 0
+    batch = []
+    for row in queryset.values_list("id", "full_name").iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            index_patients(batch, using)
+            total += len(batch)
+            batch = []
+    index_patients(batch, using)
+    total += len(batch)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+    return total
+
+
+# Запрос FTS5: каждый токен ищется как префикс ("иван"*)
+def match_expression(search_term):
+    return " ".join(f'"{token}"*' for token in name_tokens(search_term))
+
+
+# Поиск по началу полиса ОМС диапазоном по уникальному индексу (без LIKE)
+def search_by_policy(queryset, search_term):
+    if len(search_term) == 16:
+        return queryset.filter(insurance_number=search_term)
+    upper = search_term[:-1] + chr(ord(search_term[-1]) + 1)
+    return queryset.filter(
+        insurance_number__gte=search_term, insurance_number__lt=upper
+    ).order_by("insurance_number")
+
+
+# Фильтрация и ранжирование queryset по ФИО. Ранг берётся соединением с
+# индексом (одно сопоставление MATCH на запрос), а не подзапросом на строку
+def search_by_name(queryset, search_term):
+    expression = match_expression(search_term)
+    if not expression:
+        return queryset.none()
+    if not is_supported(queryset.db):
+        condition = Q()
+        for token in search_term.split():
+            condition &= Q(full_name__icontains=token)
+        return queryset.filter(condition)
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        select={"search_rank": f"{SEARCH_TABLE}.rank"},
+        tables=[SEARCH_TABLE],
+        where=[f"{SEARCH_TABLE} MATCH %s", f"{SEARCH_TABLE}.rowid = {table}.id"],
+        params=[expression],
+    ).order_by("search_rank", "full_name")
@@ -0,0 +1,52 @@
+# server_clinic/patient/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Patient
+from . import search
+from .snapshots import propagate
+from .autocomplete import invalidate_cache
+from .resolver import resolver
+from server_clinic.postgres import ensure_postgres_indexes
+
+# Поля пациента, копируемые в строки регистров (server_clinic.mixins)
+SNAPSHOT_SOURCE_FIELDS = {"full_name", "gender", "birth_date", "filial"}
+
+
+# Обновление производных данных (поисковый индекс ФИО, кэши автокомплита
+# и полисов, копии данных пациента в регистрах) после изменения пациентов,
+# в том числе массового
+def patients_changed(patients, using="default", snapshots=True):
+    patients = list(patients)
+    search.index_patients([(p.pk, p.full_name) for p in patients], using)
+    if snapshots:
+        propagate([p.pk for p in patients], using)
+    resolver.invalidate_many(
+        [p.insurance_number for p in patients], [p.pk for p in patients]
+    )
+    invalidate_cache()
+
+
+@receiver(post_save, sender=Patient)
+def patient_saved(
+    sender, instance, created, raw=False, using="default", update_fields=None, **kwargs
+):
+    # У нового пациента записей в регистрах ещё нет
+    snapshots = not created and (
+        update_fields is None or bool(set(update_fields) & SNAPSHOT_SOURCE_FIELDS)
+    )
+    patients_changed([instance], using, snapshots=snapshots)
+
+
+@receiver(post_delete, sender=Patient)
+def patient_deleted(sender, instance, using="default", **kwargs):
+    search.unindex_patients([instance.pk], using)
+    resolver.invalidate_many([instance.insurance_number], [instance.pk])
+    invalidate_cache()
+
+
+def create_search_index(sender, using="default", **kwargs):
+    search.ensure_search_index(using)
+
+
+def create_postgres_indexes(sender, using="default", **kwargs):
+    ensure_postgres_indexes(using)
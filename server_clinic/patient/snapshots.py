@@ -0,0 +1,80 @@
+# server_clinic/patient/snapshots.py
+from django.apps import apps
+from django.db.models import F, OuterRef, Q, Subquery
+from server_clinic.caching import invalidate_model_cache
+from server_clinic.mixins import SNAPSHOT_FIELDS, PatientSnapshotModel
+from .models import Patient, age_expression
+
+# Ограничение числа параметров в одном IN (SQLite)
+PROPAGATE_CHUNK_SIZE = 500
+
+
+# Регистры с копией данных пациента (death, diagnos, disabled_children)
+def snapshot_models():
+    return [
+        model for model in apps.get_models() if issubclass(model, PatientSnapshotModel)
+    ]
+
+
+# Значения копии в SQL: коррелированные подзапросы к patient по patient_id
+def snapshot_values(model):
+    patient = Patient.objects.filter(pk=OuterRef("patient_id"))
+    values = {name: Subquery(patient.values(name)[:1]) for name in SNAPSHOT_FIELDS}
+    if model.snapshot_age_field:
+        values["age"] = Subquery(
+            patient.annotate(
+                event_age=age_expression(
+                    "birth_date", OuterRef(model.snapshot_age_field)
+                )
+            ).values("event_age")[:1]
+        )
+    return values
+
+
+# Строки, в которых копия разошлась с пациентом
+def drifted(model, using="default"):
+    condition = Q()
+    for name in SNAPSHOT_FIELDS:
+        condition |= ~Q(**{name: F(f"patient__{name}")})
+    queryset = model._base_manager.using(using)
+    if model.snapshot_age_field:
+        queryset = queryset.alias(
+            event_age=age_expression("patient__birth_date", model.snapshot_age_field)
+        )
+        condition |= Q(event_age__isnull=False) & ~Q(age=F("event_age"))
+        condition |= Q(event_age__isnull=True, age__isnull=False)
+    return queryset.filter(condition)
+
+
+# Один UPDATE на таблицу регистра (на каждые PROPAGATE_CHUNK_SIZE пациентов)
+def propagate(patient_ids, using="default", models=None):
+    patient_ids = list(patient_ids)
+    updated = 0
+    for model in models or snapshot_models():
+        values = snapshot_values(model)
+        model_updated = 0
+        for start in range(0, len(patient_ids), PROPAGATE_CHUNK_SIZE):
+            chunk = patient_ids[start : start + PROPAGATE_CHUNK_SIZE]
+            model_updated += (
+                model._base_manager.using(using)
+                .filter(patient_id__in=chunk)
+                .update(**values)
+            )
+        # Разрезы движения регистра и фильтры списка (филиал, пол) берутся
+        # из копий
+        if model_updated:
+            invalidate_model_cache(model)
+        updated += model_updated
+    return updated
+
+
+# Исправление расхождений одним UPDATE ... WHERE pk IN (расхождения)
+def repair(model, using="default"):
+    updated = (
+        model._base_manager.using(using)
+        .filter(pk__in=drifted(model, using).values("pk"))
+        .update(**snapshot_values(model))
+    )
+    if updated:
+        invalidate_model_cache(model)
+    return updated
@@ -1,4 +1,54 @@
 # server_clinic/patient/tests.py
+from datetime import date
 from django.test import TestCase
+from .models import Patient
+from .reconcile import ReconcileError, Reconciler
 
-# Create your tests here.
+
+def registry_row(number, full_name="Иванов Иван Иванович", birth_date="01.02.1980"):
+    return {
+        "full_name": full_name,
+        "birth_date": birth_date,
+        "gender": "М",
+        "phone_number": "",
+        "filial": "1",
+        "insurance_number": number,
+    }
+
+
+# Сверка списка прикреплённых со страховой
+class ReconcileTests(TestCase):
+    def setUp(self):
+        for number in ("1000000000000001", "1000000000000002"):
+            Patient.objects.create(
+                full_name="Иванов Иван Иванович",
+                birth_date=date(1980, 2, 1),
+                gender="М",
+                filial="1",
+                insurance_number=number,
+            )
+
+    def test_invalid_row_does_not_detach_patient(self):
+        rows = [
+            registry_row("1000000000000001"),
+            registry_row("1000000000000002", birth_date="не дата"),
+        ]
+        reported = []
+        result = Reconciler(report=lambda *args: reported.append(args)).run(rows)
+        self.assertEqual(result.detached, 0)
+        self.assertEqual(reported, [])
+        self.assertEqual([line for line, _ in result.errors], [3])
+
+    def test_unsorted_file_applies_nothing(self):
+        rows = [
+            registry_row("1000000000000000"),
+            registry_row("1000000000000001", full_name="Петров Пётр Петрович"),
+            registry_row("1000000000000003"),
+            registry_row("0999999999999999"),
+        ]
+        with self.assertRaises(ReconcileError):
+            Reconciler(apply=True, batch_size=1).run(rows)
+        self.assertEqual(Patient.objects.count(), 2)
+        self.assertFalse(
+            Patient.objects.filter(full_name="Петров Пётр Петрович").exists()
+        )
@@ -0,0 +1,235 @@
+# server_clinic/server_clinic/bulk_actions.py
+import csv
+import time
+from django import forms
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin import helpers
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from server_clinic.exports import Echo, csv_cell
+from server_clinic.importers import error_message
+from server_clinic.caching import invalidate_model_cache
+from server_clinic.large_tables import changelist_request, list_query
+
+BULK_CHUNK_SIZE = 500
+# Пауза между пачками, секунд: другие регистраторы успевают взять блокировку
+# записи SQLite
+BULK_CHUNK_PAUSE = 0.05
+# Больше строк — выполнение в фоновой задаче (jobs), а не в запросе
+BULK_SYNC_LIMIT = 2000
+# Ошибок в сообщении админки (остальные — в файле результата задачи)
+SHOWN_FAILURES = 10
+
+
+def chunk_pause():
+    return getattr(settings, "BULK_CHUNK_PAUSE", BULK_CHUNK_PAUSE)
+
+
+def sync_limit():
+    return getattr(settings, "BULK_SYNC_LIMIT", BULK_SYNC_LIMIT)
+
+
+class BulkResult:
+    def __init__(self, total, dry_run=False):
+        self.total = total
+        self.dry_run = dry_run
+        self.processed = 0
+        self.updated = 0
+        self.failures = []  # (pk, запись, сообщение)
+
+    def add_failure(self, obj, error):
+        self.failures.append((obj.pk, str(obj), error_message(error)))
+
+    def summary(self):
+        verb = "прошли бы проверку" if self.dry_run else "изменено"
+        valid = self.processed - len(self.failures)
+        count = valid if self.dry_run else self.updated
+        return (
+            f"Обработано {self.processed} из {self.total}, {verb}: {count}, "
+            f"с ошибками: {len(self.failures)}"
+        )
+
+    def failure_rows(self):
+        writer = csv.writer(Echo(), delimiter=";")
+        yield "\ufeff" + writer.writerow(["id", "Запись", "Ошибка"])
+        for pk, label, message in self.failures:
+            yield writer.writerow([pk, csv_cell(label), csv_cell(message)])
+
+
+# Массовое изменение выбранных строк: пачками по chunk_size, каждая в своей
+# короткой транзакции. Пачка читается одним запросом, новые значения
+# проверяются валидаторами модели в памяти, прошедшие проверку строки
+# обновляются одним UPDATE. Сигналы post_save не отправляются
+class BulkAction:
+    label = ""
+    chunk_size = BULK_CHUNK_SIZE
+    # Валидаторы записи (как в clean() модели); None — весь clean()
+    validators = None
+
+    # Новые значения полей: {поле: значение}
+    def values(self):
+        raise NotImplementedError
+
+    # Проверка строки до изменения (например, уже снята с учёта)
+    def check(self, obj):
+        pass
+
+    def validate(self, obj):
+        if self.validators is None:
+            obj.clean()
+            return
+        for validator in self.validators:
+            validator(obj)
+
+    def run(self, queryset, dry_run=False, progress=None):
+        model = queryset.model
+        values = self.values()
+        ids = queryset.order_by("pk").values_list("pk", flat=True)
+        result = BulkResult(queryset.count(), dry_run)
+        last = None
+        while True:
+            chunk = list(
+                (ids if last is None else ids.filter(pk__gt=last))[: self.chunk_size]
+            )
+            if not chunk:
+                break
+            last = chunk[-1]
+            with transaction.atomic():
+                valid = []
+                for obj in model._base_manager.filter(pk__in=chunk):
+                    try:
+                        self.check(obj)
+                        for name, value in values.items():
+                            setattr(obj, name, value)
+                        self.validate(obj)
+                    except ValidationError as error:
+                        result.add_failure(obj, error)
+                    else:
+                        valid.append(obj.pk)
+                if valid and not dry_run:
+                    result.updated += model._base_manager.filter(pk__in=valid).update(
+                        **values
+                    )
+            result.processed += len(chunk)
+            if progress:
+                progress(result.processed, result.total)
+            time.sleep(chunk_pause())
+        if result.updated:
+            invalidate_model_cache(model)
+        return result
+
+
+class BulkConfirmForm(forms.Form):
+    dry_run = forms.BooleanField(
+        label="Только проверить, ничего не изменяя", required=False
+    )
+
+
+# Массовые действия админки на BulkAction: страница подтверждения с проверкой
+# без изменений, небольшие выборки — сразу, большие — фоновой задачей
+class BulkActionMixin:
+    bulk_actions = {}  # имя действия → BulkAction
+    bulk_confirm_template = "admin/bulk_action_confirm.html"
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if not self.has_change_permission(request):
+            return actions
+        for name, action in self.bulk_actions.items():
+            actions[name] = (self.make_bulk_action(name), name, action.label)
+        return actions
+
+    def make_bulk_action(self, name):
+        def bulk_action(modeladmin, request, queryset):
+            return self.bulk_action_view(request, queryset, name)
+
+        return bulk_action
+
+    def bulk_action_view(self, request, queryset, name):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        action = self.bulk_actions[name]
+        count = queryset.count()
+        form = BulkConfirmForm(request.POST if "bulk_confirm" in request.POST else None)
+        if not form.is_valid():
+            context = {
+                **self.admin_site.each_context(request),
+                "opts": self.model._meta,
+                "title": action.label,
+                "action_name": name,
+                "count": count,
+                "form": form,
+                "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+                "select_across": request.POST.get("select_across", "0"),
+                "action_index": request.POST.get("index", "0"),
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            }
+            return TemplateResponse(request, self.bulk_confirm_template, context)
+        dry_run = form.cleaned_data["dry_run"]
+        if count > sync_limit():
+            return self.submit_bulk_job(request, name, dry_run)
+        result = action.run(queryset, dry_run=dry_run)
+        level = messages.WARNING if result.failures else messages.SUCCESS
+        lines = [f"{action.label}: {result.summary()}"]
+        lines += [f"{label}: {message}" for _, label, message in result.failures][
+            :SHOWN_FAILURES
+        ]
+        if len(result.failures) > SHOWN_FAILURES:
+            lines.append(f"и ещё {len(result.failures) - SHOWN_FAILURES}")
+        for line in lines:
+            self.message_user(request, line, level)
+        return None
+
+    # Выбор переносится в задачу строкой запроса списка (все найденные) или
+    # списком отмеченных id
+    def submit_bulk_job(self, request, name, dry_run):
+        from jobs.queue import submit
+
+        select_across = request.POST.get("select_across") == "1"
+        job = submit(
+            "bulk_action",
+            {
+                "model": self.model._meta.label,
+                "action": name,
+                "query": list_query(request).urlencode(),
+                "ids": (
+                    None
+                    if select_across
+                    else request.POST.getlist(helpers.ACTION_CHECKBOX_NAME)
+                ),
+                "dry_run": dry_run,
+            },
+            request.user,
+            title=f"{self.bulk_actions[name].label}"
+            + (" (проверка)" if dry_run else ""),
+        )
+        self.message_user(request, "Действие поставлено в очередь фоновых задач")
+        return redirect(f"{self.admin_site.name}:jobs_job_change", job.pk)
+
+
+# Фоновое выполнение (задача "bulk_action", jobs/tasks.py) от имени автора
+def bulk_action_job(job, model, action, query, ids, dry_run):
+    from django.apps import apps
+    from django.contrib import admin
+
+    model = apps.get_model(model)
+    model_admin = admin.site._registry[model]
+    request = changelist_request(job.created_by, query)
+    if request.user is None or not model_admin.has_change_permission(request):
+        raise PermissionDenied("Нет права изменять записи")
+    if ids is None:
+        changelist = model_admin.get_changelist_instance(request)
+        queryset = changelist.get_queryset(request)
+    else:
+        queryset = model_admin.get_queryset(request).filter(pk__in=ids)
+    result = model_admin.bulk_actions[action].run(
+        queryset,
+        dry_run=dry_run,
+        progress=lambda processed, total: job.report(processed, total),
+    )
+    if result.failures:
+        job.save_result(f"{action}_errors.csv", result.failure_rows())
+    job.report(result.processed, result.total, result.summary(), force=True)
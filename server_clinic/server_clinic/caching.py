@@ -0,0 +1,131 @@
+# server_clinic/server_clinic/caching.py
+import hashlib
+import time
+from functools import lru_cache
+from django.conf import settings
+from django.contrib.admin.filters import AllValuesFieldListFilter, FacetsMixin
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.utils.text import capfirst
+from server_clinic.constants import ICD10_CHAPTERS
+
+# Варианты фильтров и счётчики фасетов списка живут в кэше до изменения
+# таблицы (поколение), но не дольше этого срока
+CHOICES_CACHE_TIMEOUT = 3600
+FACETS_CACHE_TIMEOUT = 300
+
+ICD_CHAPTER_LABELS = {
+    number: f"{number} {title}" for _, _, number, title in ICD10_CHAPTERS
+}
+
+
+def facets_timeout():
+    return getattr(settings, "FACETS_CACHE_TIMEOUT", FACETS_CACHE_TIMEOUT)
+
+
+# Поколение данных модели: ключи кэша включают его номер, поэтому любая правка
+# таблицы (сигналы, массовые операции) делает все кэши по ней недостижимыми.
+# Начальное значение — время: вытесненный из кэша номер не повторится
+def generation_key(model):
+    return f"generation:{model._meta.label_lower}"
+
+
+def cache_generation(model):
+    return cache.get_or_set(generation_key(model), time.time_ns(), None)
+
+
+def invalidate_model_cache(model):
+    try:
+        cache.incr(generation_key(model))
+    except ValueError:
+        cache.set(generation_key(model), time.time_ns(), None)
+
+
+def model_changed(sender, **kwargs):
+    invalidate_model_cache(sender)
+
+
+# Подписи значений поля: один словарь на процесс для списков, выгрузок и
+# отчётов вместо dict(field.flatchoices) на каждую строку
+@lru_cache(maxsize=None)
+def field_labels(field):
+    if field.name == "icd_chapter":
+        return ICD_CHAPTER_LABELS
+    return dict(field.flatchoices)
+
+
+def choice_labels(model, name):
+    return field_labels(model._meta.get_field(name))
+
+
+# Колонка list_display с подписью значения из общего словаря; сортировка
+# по самому полю
+def label_column(model, name):
+    field = model._meta.get_field(name)
+    labels = field_labels(field)
+
+    def column(obj):
+        value = getattr(obj, name)
+        return "-" if value in (None, "") else labels.get(value, value)
+
+    column.short_description = capfirst(field.verbose_name)
+    column.admin_order_field = name
+    return column
+
+
+# Значения AllValuesFieldListFilter (SELECT DISTINCT по всей таблице) — из
+# кэша; классы МКБ-10 показываются с названием
+class CachedAllValuesFieldListFilter(AllValuesFieldListFilter):
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = (
+            f"filter_choices:{model._meta.label_lower}:{cache_generation(model)}:"
+            f"{field_path}"
+        )
+        choices = cache.get(key)
+        if choices is None:
+            choices = list(self.lookup_choices)
+            cache.set(key, choices, CHOICES_CACHE_TIMEOUT)
+        self.lookup_choices = choices
+        self.labels = field_labels(field)
+
+    def choices(self, changelist):
+        for choice in super().choices(changelist):
+            display = str(choice["display"])
+            value, _, count = display.partition(" (")
+            if value in self.labels:
+                label = self.labels[value]
+                choice["display"] = f"{label} ({count}" if count else label
+            yield choice
+
+
+# Счётчики фасетов (?_facets) фильтра: одна агрегация по отфильтрованному
+# списку на фильтр. Ключ — SQL списка и выражения счётчиков, поэтому права
+# и остальные фильтры в него уже входят
+def cached_facet_counts(spec, changelist):
+    filtered_qs = changelist.get_queryset(
+        spec.request, exclude_parameters=spec.expected_parameters()
+    )
+    counts = spec.get_facet_counts(changelist.pk_attname, filtered_qs)
+    try:
+        sql, params = filtered_qs.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return {name: 0 for name in counts}
+    digest = hashlib.md5(
+        f"{filtered_qs.db}:{sql}:{params!r}:{sorted(counts.items())!r}".encode()
+    ).hexdigest()
+    model = changelist.model
+    key = f"facets:{model._meta.label_lower}:{cache_generation(model)}:{digest}"
+    result = cache.get(key)
+    if result is None:
+        result = filtered_qs.aggregate(**counts)
+        cache.set(key, result, facets_timeout())
+    return result
+
+
+def cache_facets(filter_specs, changelist):
+    for spec in filter_specs:
+        if isinstance(spec, FacetsMixin):
+            spec.get_facet_queryset = lambda changelist, spec=spec: (
+                cached_facet_counts(spec, changelist)
+            )
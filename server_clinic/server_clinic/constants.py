@@ -65,10 +65,44 @@ REMOVAL_STATUS = [
     "error",
 ]
 
+# Классы МКБ-10: (первый код, последний код, номер класса, название)
+ICD10_CHAPTERS = [
+    ("A00", "B99", "I", "Некоторые инфекционные и паразитарные болезни"),
+    ("C00", "D48", "II", "Новообразования"),
+    ("D50", "D89", "III", "Болезни крови и кроветворных органов"),
+    ("E00", "E90", "IV", "Болезни эндокринной системы"),
+    ("F00", "F99", "V", "Психические расстройства"),
+    ("G00", "G99", "VI", "Болезни нервной системы"),
+    ("H00", "H59", "VII", "Болезни глаза"),
+    ("H60", "H95", "VIII", "Болезни уха"),
+    ("I00", "I99", "IX", "Болезни системы кровообращения"),
+    ("J00", "J99", "X", "Болезни органов дыхания"),
+    ("K00", "K93", "XI", "Болезни органов пищеварения"),
+    ("L00", "L99", "XII", "Болезни кожи"),
+    ("M00", "M99", "XIII", "Болезни костно-мышечной системы"),
+    ("N00", "N99", "XIV", "Болезни мочеполовой системы"),
+    ("O00", "O99", "XV", "Беременность, роды и послеродовой период"),
+    ("P00", "P96", "XVI", "Состояния перинатального периода"),
+    ("Q00", "Q99", "XVII", "Врождённые аномалии"),
+    ("R00", "R99", "XVIII", "Симптомы и отклонения от нормы"),
+    ("S00", "T98", "XIX", "Травмы и отравления"),
+    ("U00", "U85", "XXII", "Коды для особых целей"),
+    ("V01", "Y98", "XX", "Внешние причины заболеваемости и смертности"),
+    ("Z00", "Z99", "XXI", "Факторы, влияющие на состояние здоровья"),
+]
+
 # * server_clinic/patient/
 # Константы для выбора пола
 GENDER_CHOICES = [("М", "Мужской"), ("Ж", "Женский")]
 
+# Возрастные группы (от, до включительно); переопределяются PATIENT_AGE_BANDS в settings
+AGE_BANDS = [
+    (0, 17),
+    (18, 39),
+    (40, 59),
+    (60, None),
+]
+
 # Константа для выбора филиала
 FILIAL = [
     ("1", "ГБ Троицкая амбулатория 1"),
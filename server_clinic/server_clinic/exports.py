@@ -0,0 +1,247 @@
+# server_clinic/server_clinic/exports.py
+import csv
+import json
+from datetime import date
+from django.apps import apps
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.urls import path
+from django.utils import timezone
+from django.utils.text import capfirst
+from server_clinic.caching import field_labels
+from server_clinic.large_tables import changelist_request, list_query
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "jsonl")
+# Начало ячейки, которое Excel выполняет как формулу
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class Echo:
+    # Псевдофайл для csv.writer: возвращает строку вместо записи
+    def write(self, value):
+        return value
+
+
+def resolve_field(model, field_path):
+    opts = model._meta
+    parts = field_path.split("__")
+    for part in parts[:-1]:
+        opts = opts.get_field(part).related_model._meta
+    return opts.get_field(parts[-1])
+
+
+# Текст из базы в CSV для Excel: ячейка, похожая на формулу, экранируется
+# апострофом (CSV-инъекция)
+def csv_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+# Преобразователи значений, рассчитанные один раз на колонку (а не на строку)
+def column_converter(field, for_csv):
+    if field.choices:
+        labels = field_labels(field)
+        return lambda value: labels.get(value, value)
+    if for_csv and field.get_internal_type() in ("CharField", "TextField"):
+        return csv_cell
+    if for_csv and field.get_internal_type() == "BooleanField":
+        return lambda value: "Да" if value else "Нет"
+    if for_csv and field.get_internal_type() == "DateField":
+        return lambda value: value.strftime("%d.%m.%Y") if value else ""
+    return None
+
+
+def export_rows(queryset, field_paths, for_csv):
+    converters = [
+        column_converter(resolve_field(queryset.model, field_path), for_csv)
+        for field_path in field_paths
+    ]
+    rows = queryset.values_list(*field_paths).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if not any(converters):
+        yield from rows
+        return
+    for row in rows:
+        yield [
+            convert(value) if convert and value is not None else value
+            for convert, value in zip(converters, row)
+        ]
+
+
+# progress(строк) — после каждой пачки (фоновая выгрузка, jobs)
+def stream_csv(queryset, field_paths, headers, progress=None):
+    writer = csv.writer(Echo(), delimiter=";")
+    # BOM, чтобы Excel открыл кириллицу в UTF-8
+    yield "\ufeff" + writer.writerow(headers)
+    batch, written = [], 0
+    for row in export_rows(queryset, field_paths, for_csv=True):
+        batch.append(writer.writerow(row))
+        if len(batch) >= EXPORT_CHUNK_SIZE:
+            yield "".join(batch)
+            written += len(batch)
+            batch = []
+            if progress:
+                progress(written)
+    yield "".join(batch)
+
+
+def json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_jsonl(queryset, field_paths, progress=None):
+    batch, written = [], 0
+    for row in export_rows(queryset, field_paths, for_csv=False):
+        batch.append(
+            json.dumps(
+                dict(zip(field_paths, row)), ensure_ascii=False, default=json_default
+            )
+            + "\n"
+        )
+        if len(batch) >= EXPORT_CHUNK_SIZE:
+            yield "".join(batch)
+            written += len(batch)
+            batch = []
+            if progress:
+                progress(written)
+    yield "".join(batch)
+
+
+def dated_filename(name, export_format):
+    return f"{name}_{timezone.localdate():%Y%m%d}.{export_format}"
+
+
+def export_content(queryset, field_paths, export_format, progress=None):
+    if export_format == "csv":
+        headers = [
+            capfirst(resolve_field(queryset.model, field_path).verbose_name)
+            for field_path in field_paths
+        ]
+        return stream_csv(queryset, field_paths, headers, progress)
+    return stream_jsonl(queryset, field_paths, progress)
+
+
+def export_response(queryset, field_paths, export_format, filename):
+    content = export_content(queryset, field_paths, export_format)
+    content_type = (
+        "text/csv; charset=utf-8"
+        if export_format == "csv"
+        else "application/x-ndjson; charset=utf-8"
+    )
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="{dated_filename(filename, export_format)}"'
+    )
+    return response
+
+
+def export_ordering(queryset):
+    return queryset.order_by(*queryset.query.order_by or ["pk"])
+
+
+# Фоновая выгрузка (задача "export", jobs/tasks.py): список админки
+# восстанавливается по строке запроса от имени автора задачи — те же фильтры,
+# поиск и права, что у выгрузки из браузера
+def export_job(job, model, query, export_format):
+    from django.contrib import admin
+
+    model = apps.get_model(model)
+    model_admin = admin.site._registry[model]
+    request = changelist_request(job.created_by, query)
+    if request.user is None or not model_admin.has_view_permission(request):
+        raise PermissionDenied("Нет права просматривать список")
+    changelist = model_admin.get_changelist_instance(request)
+    queryset = export_ordering(changelist.get_queryset(request))
+    total = queryset.count()
+    job.report(0, total, force=True)
+    content = export_content(
+        queryset,
+        model_admin.get_export_fields(request),
+        export_format,
+        progress=lambda written: job.report(written),
+    )
+    job.save_result(dated_filename(model._meta.model_name, export_format), content)
+    job.report(total, force=True)
+
+
+# Выгрузка реестра в CSV/JSONL: действие над выбранными и весь отфильтрованный список
+class ExportMixin:
+    export_fields = ()
+    actions = ["export_csv", "export_jsonl"]
+
+    def get_export_fields(self, request):
+        return self.export_fields
+
+    def export_queryset(self, request, queryset, export_format):
+        return export_response(
+            export_ordering(queryset),
+            self.get_export_fields(request),
+            export_format,
+            self.model._meta.model_name,
+        )
+
+    def export_csv(self, request, queryset):
+        return self.export_queryset(request, queryset, "csv")
+
+    export_csv.short_description = "Выгрузить выбранные в CSV"
+
+    def export_jsonl(self, request, queryset):
+        return self.export_queryset(request, queryset, "jsonl")
+
+    export_jsonl.short_description = "Выгрузить выбранные в JSONL"
+
+    def get_urls(self):
+        opts = self.model._meta
+        custom_urls = [
+            path(
+                "export/<str:export_format>/",
+                self.admin_site.admin_view(self.export_view),
+                name=f"{opts.app_label}_{opts.model_name}_export",
+            ),
+            path(
+                "export/<str:export_format>/background/",
+                self.admin_site.admin_view(self.export_background_view),
+                name=f"{opts.app_label}_{opts.model_name}_export_background",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    # Весь список с текущими фильтрами и поиском
+    def export_view(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise Http404
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        request.GET = list_query(request)
+        changelist = self.get_changelist_instance(request)
+        return self.export_queryset(
+            request, changelist.get_queryset(request), export_format
+        )
+
+    # То же в фоновой задаче: для списков, которые не успевают выгрузиться
+    # за время запроса. Файл скачивается со страницы задачи
+    def export_background_view(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise Http404
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        from jobs.queue import submit
+
+        job = submit(
+            "export",
+            {
+                "model": self.model._meta.label,
+                "query": list_query(request).urlencode(),
+                "export_format": export_format,
+            },
+            request.user,
+            title=f"Выгрузка: {self.model._meta.verbose_name_plural} "
+            f"({export_format.upper()})",
+        )
+        messages.info(request, "Выгрузка поставлена в очередь фоновых задач")
+        return redirect(f"{self.admin_site.name}:jobs_job_change", job.pk)
@@ -0,0 +1,398 @@
+# server_clinic/server_clinic/importers.py
+import csv
+import io
+from contextlib import nullcontext
+from datetime import datetime
+from django import forms
+from django.apps import apps
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import IntegrityError, transaction
+from django.template.response import TemplateResponse
+from django.urls import path
+from mkb.dictionary import normalize_code
+from server_clinic.caching import invalidate_model_cache
+from server_clinic.validators import (
+    validate_date_removal,
+    validate_death_date,
+    validate_disp_end_date,
+    validate_primary_reason,
+    validate_remove_reason,
+    validate_status_date_consistency,
+)
+
+try:
+    import openpyxl
+except ImportError:  # XLSX необязателен
+    openpyxl = None
+
+IMPORT_BATCH_SIZE = 2000
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y")
+TRUE_VALUES = {"1", "да", "true", "yes", "+"}
+
+
+# Описание реестров: модель, колонки файла, ключ upsert и проверки записи
+REGISTERS = {
+    "patients": {
+        "model": "patient.Patient",
+        "columns": (
+            "full_name",
+            "birth_date",
+            "gender",
+            "phone_number",
+            "filial",
+            "insurance_number",
+        ),
+        "unique_fields": ("insurance_number",),
+        "validators": (),
+    },
+    "deaths": {
+        "model": "death.Death",
+        "columns": (
+            "insurance_number",
+            "death_date",
+            "death_place",
+            "death_cause",
+            "comment",
+        ),
+        "unique_fields": ("patient",),
+        "validators": (validate_death_date,),
+    },
+    "diagnoses": {
+        "model": "diagnos.Diagnosis",
+        "columns": (
+            "insurance_number",
+            "mkb_code",
+            "disp_status",
+            "primary_reason",
+            "disp_start_date",
+            "disp_end_date",
+            "remove_reason",
+            "comment",
+        ),
+        "unique_fields": ("patient", "mkb_code"),
+        "validators": (
+            validate_primary_reason,
+            validate_remove_reason,
+            validate_disp_end_date,
+        ),
+    },
+    "disabled_children": {
+        "model": "disabled_children.DisabledChild",
+        "columns": (
+            "insurance_number",
+            "mkb_code",
+            "status",
+            "disability_date",
+            "palliative",
+            "removal_reason",
+            "removal_date",
+            "comorbidities",
+            "notes",
+        ),
+        "unique_fields": ("patient",),
+        "validators": (validate_status_date_consistency, validate_date_removal),
+    },
+}
+
+
+# Текст ошибки проверки одной строкой: "поле: сообщения; ..."
+def error_message(error):
+    if not isinstance(error, ValidationError):
+        return str(error)
+    if hasattr(error, "error_dict"):
+        return "; ".join(
+            f"{field}: {' '.join(messages)}"
+            for field, messages in error.message_dict.items()
+        )
+    return " ".join(error.messages)
+
+
+class ImportResult:
+    def __init__(self):
+        self.total = 0
+        self.saved = 0
+        self.errors = []  # (номер строки, сообщение)
+
+    def add_error(self, line, error):
+        self.errors.append((line, error_message(error)))
+
+
+# Чтение файла построчно: CSV (`,` или `;`) или XLSX
+def read_rows(file, file_format="csv"):
+    if file_format == "xlsx":
+        if openpyxl is None:
+            raise ValueError("Для загрузки XLSX установите пакет openpyxl")
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value or "").strip() for value in next(rows, ())]
+        for values in rows:
+            yield dict(zip(header, values))
+        workbook.close()
+        return
+    if isinstance(file, (str, bytes)) or hasattr(file, "__fspath__"):
+        file = open(file, encoding="utf-8-sig", newline="")
+    elif "b" in getattr(file, "mode", "b"):
+        file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    with file:
+        sample = file.read(4096)
+        file.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        yield from csv.DictReader(file, dialect=dialect)
+
+
+def policy_number(row):
+    value = row.get("insurance_number")
+    return "" if value is None else str(value).strip()
+
+
+def parse_date(value):
+    if hasattr(value, "year"):
+        return value.date() if isinstance(value, datetime) else value
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValidationError(f"Неверный формат даты: {value}")
+
+
+class RegisterImporter:
+    def __init__(self, register, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.spec = REGISTERS[register]
+        self.model = apps.get_model(self.spec["model"])
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.fields = {
+            name: self.model._meta.get_field(name)
+            for name in self.spec["columns"]
+            if name != "insurance_number" or self.model._meta.model_name == "patient"
+        }
+        # Подписи вариантов выбора → коды (в файлах часто пишут подпись)
+        self.choice_codes = {
+            name: {str(label).casefold(): code for code, label in field.flatchoices}
+            for name, field in self.fields.items()
+            if field.choices
+        }
+
+    def clean_value(self, name, raw):
+        field = self.fields[name]
+        value = raw.strip() if isinstance(raw, str) else raw
+        if field.get_internal_type() == "BooleanField":
+            value = str(value or "").casefold() in TRUE_VALUES
+        elif value in ("", None):
+            value = None if field.null else ""
+        elif name == getattr(self.model, "icd_code_field", None):
+            value = normalize_code(value)
+        elif name in self.choice_codes:
+            value = self.choice_codes[name].get(str(value).casefold(), value)
+        elif field.get_internal_type() == "DateField":
+            value = parse_date(value)
+        else:
+            value = str(value)
+        # Встроенные проверки поля: validators модели, choices, blank
+        return field.clean(value, None)
+
+    def build(self, row, patients):
+        values, errors = {}, {}
+        for name in self.fields:
+            try:
+                values[name] = self.clean_value(name, row.get(name))
+            except ValidationError as e:
+                errors[name] = e.messages
+        if errors:
+            raise ValidationError(errors)
+        if self.model._meta.model_name != "patient":
+            patient = patients.get(policy_number(row))
+            if patient is None:
+                raise ValidationError(
+                    {"insurance_number": "Пациент с таким полисом не найден"}
+                )
+            values["patient"] = patient
+        instance = self.model(**values)
+        if hasattr(instance, "normalize_icd"):
+            instance.normalize_icd()
+            instance.validate_icd()
+        # bulk_create минует save(): копия данных пациента заполняется здесь
+        if hasattr(instance, "fill_snapshot"):
+            instance.fill_snapshot()
+        for validator in self.spec["validators"]:
+            validator(instance)
+        return instance
+
+    # Один пакетный запрос к кэшу полисов вместо get() на каждую строку
+    def resolve_patients(self, rows):
+        if self.model._meta.model_name == "patient":
+            return {}
+        from patient.resolver import as_patient, resolver
+
+        records = resolver.resolve_many({policy_number(row) for _, row in rows})
+        return {
+            number: as_patient(record, number) for number, record in records.items()
+        }
+
+    def save(self, instances):
+        unique_fields = self.spec["unique_fields"]
+        # В пачке оставляем последнюю строку для каждого ключа
+        unique = {}
+        for instance in instances:
+            key = tuple(
+                getattr(instance, self.model._meta.get_field(name).attname)
+                for name in unique_fields
+            )
+            unique[key] = instance
+        instances = list(unique.values())
+        update_fields = [
+            field.name
+            for field in self.model._meta.concrete_fields
+            if not field.primary_key and field.name not in unique_fields
+        ]
+        with transaction.atomic(), self.track_stats(instances):
+            self.model.objects.bulk_create(
+                instances,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+            self.after_save(instances)
+        return len(instances)
+
+    # Статистика смертности зависит от записей о смерти и данных пациентов
+    def track_stats(self, instances):
+        from death.stats import track_patients
+
+        model_name = self.model._meta.model_name
+        if model_name == "death":
+            return track_patients([instance.patient_id for instance in instances])
+        if model_name == "patient":
+            numbers = [instance.insurance_number for instance in instances]
+            return track_patients(
+                self.model.objects.filter(insurance_number__in=numbers).values("id")
+            )
+        return nullcontext()
+
+    # bulk_create не шлёт сигналы: обновляем индекс и кэши пациентов вручную
+    def after_save(self, instances):
+        invalidate_model_cache(self.model)
+        if self.model._meta.model_name == "death":
+            from death.cascade import close_registers
+
+            close_registers([instance.patient_id for instance in instances])
+        if self.model._meta.model_name != "patient":
+            return
+        from patient.signals import patients_changed
+
+        numbers = [instance.insurance_number for instance in instances]
+        patients_changed(
+            self.model.objects.filter(insurance_number__in=numbers).only(
+                "id", "full_name", "insurance_number"
+            )
+        )
+
+    def process_batch(self, rows, result):
+        patients = self.resolve_patients(rows)
+        built = []
+        for line, row in rows:
+            try:
+                built.append((line, self.build(row, patients)))
+            except ValidationError as e:
+                result.add_error(line, e)
+        if built and not self.dry_run:
+            result.saved += self.save_batch(built, result)
+        elif self.dry_run:
+            result.saved += len(built)
+
+    # Пачка сохраняется в своей точке сохранения. Нарушение ограничения базы
+    # (другой уникальный ключ, пациент удалён после проверки) откатывает
+    # только её: строки пачки повторяются по одной, отказавшие — в ошибки
+    def save_batch(self, built, result):
+        try:
+            with transaction.atomic():
+                return self.save([instance for _, instance in built])
+        except IntegrityError:
+            pass
+        saved = 0
+        for line, instance in built:
+            # Отложенные внешние ключи проверяются при выходе из atomic
+            try:
+                with transaction.atomic():
+                    self.save([instance])
+            except IntegrityError as e:
+                result.add_error(line, e)
+            else:
+                saved += 1
+        return saved
+
+    def run(self, rows):
+        result = ImportResult()
+        batch = []
+        # Строка 1 — заголовок
+        for line, row in enumerate(rows, start=2):
+            result.total += 1
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self.process_batch(batch, result)
+                batch = []
+        if batch:
+            self.process_batch(batch, result)
+        return result
+
+
+def import_register(register, file, file_format="csv", **kwargs):
+    importer = RegisterImporter(register, **kwargs)
+    return importer.run(read_rows(file, file_format))
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField(label="Файл CSV или XLSX")
+    dry_run = forms.BooleanField(label="Только проверить", required=False)
+
+
+# Страница загрузки реестра из файла в админке
+class ImportMixin:
+    import_register = None
+    import_template = "admin/import_register.html"
+
+    def get_urls(self):
+        opts = self.model._meta
+        custom_urls = [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name=f"{opts.app_label}_{opts.model_name}_import",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = ImportForm(request.POST or None, request.FILES or None)
+        result = None
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            file_format = "xlsx" if upload.name.lower().endswith(".xlsx") else "csv"
+            try:
+                result = import_register(
+                    self.import_register,
+                    upload.file,
+                    file_format,
+                    dry_run=form.cleaned_data["dry_run"],
+                )
+            except (ValueError, csv.Error) as e:
+                messages.error(request, f"Не удалось прочитать файл: {e}")
+            else:
+                messages.info(
+                    request,
+                    f"Строк: {result.total}, сохранено: {result.saved}, "
+                    f"ошибок: {len(result.errors)}",
+                )
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Загрузка: {self.model._meta.verbose_name_plural}",
+            "form": form,
+            "result": result,
+            "columns": REGISTERS[self.import_register]["columns"],
+        }
+        return TemplateResponse(request, self.import_template, context)
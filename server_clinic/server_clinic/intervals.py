@@ -0,0 +1,267 @@
+# server_clinic/server_clinic/intervals.py
+from bisect import bisect_right
+from calendar import monthrange
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from itertools import accumulate
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import models
+from django.db.models import Count, F, Q
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from server_clinic.caching import (
+    cache_generation,
+    choice_labels,
+    invalidate_model_cache,
+)
+
+# Снимки закрытых месяцев живут в кэше до изменения регистра (поколение),
+# но не дольше этого срока: не все массовые операции сбрасывают поколение
+SNAPSHOT_TIMEOUT = 3600
+
+
+def snapshot_timeout():
+    return getattr(settings, "INTERVAL_SNAPSHOT_TIMEOUT", SNAPSHOT_TIMEOUT)
+
+
+def month_end(month):
+    return month.replace(day=monthrange(month.year, month.month)[1])
+
+
+def year_months(year):
+    return [date(year, number, 1) for number in range(1, 13)]
+
+
+# Записи регистра с периодом учёта (model.interval_start_field,
+# model.interval_end_field). На учёте на дату D — начало не позже D, окончания
+# нет или оно позже D: в день снятия запись на учёте уже не считается
+class IntervalQuerySet(models.QuerySet):
+    def interval_fields(self):
+        return self.model.interval_start_field, self.model.interval_end_field
+
+    # Две ветки условия — под частичный индекс открытых записей и под индекс
+    # по дате окончания
+    def on_date(self, day):
+        start, end = self.interval_fields()
+        return self.filter(
+            Q(**{f"{end}__isnull": True}) | Q(**{f"{end}__gt": day}),
+            **{f"{start}__lte": day},
+        )
+
+    # Состоявшие на учёте хотя бы часть периода (включая снятых в первый день)
+    def overlapping(self, first, last):
+        start, end = self.interval_fields()
+        return self.filter(
+            Q(**{f"{end}__isnull": True}) | Q(**{f"{end}__gte": first}),
+            **{f"{start}__lte": last},
+        )
+
+    def entered(self, first, last):
+        start, _ = self.interval_fields()
+        return self.filter(**{f"{start}__range": (first, last)})
+
+    def left(self, first, last):
+        _, end = self.interval_fields()
+        return self.filter(**{f"{end}__range": (first, last)})
+
+    def interval_counts(self, group_by=()):
+        return IntervalCounts(self, group_by)
+
+    # Число состоящих на каждую из дат: {дата: Counter({разрез: число})}
+    def counts_on(self, days, group_by=()):
+        counts = self.interval_counts(group_by)
+        return {day: counts.on_date(day) for day in days}
+
+
+# Счётчики по датам начала и окончания за один проход (два GROUP BY): число
+# состоящих на любую дату — разность накопленных сумм, без запроса на дату
+class IntervalCounts:
+    def __init__(self, queryset, group_by=()):
+        self.group_by = tuple(group_by)
+        start, end = queryset.interval_fields()
+        # Окончание раньше начала — ошибка ввода: такая запись на учёте не
+        # бывает ни на одну дату, как и в IntervalQuerySet.on_date
+        queryset = queryset.exclude(**{f"{end}__lt": F(start)}).order_by()
+        self.starts = self.cumulative(
+            queryset.filter(**{f"{start}__isnull": False}), start
+        )
+        self.ends = self.cumulative(
+            queryset.filter(**{f"{start}__isnull": False, f"{end}__isnull": False}),
+            end,
+        )
+
+    # {разрез: (отсортированные даты, накопленные количества)}
+    def cumulative(self, queryset, field):
+        rows = defaultdict(list)
+        for row in queryset.values(*self.group_by, field).annotate(n=Count("pk")):
+            key = tuple(row[name] for name in self.group_by)
+            rows[key].append((row[field], row["n"]))
+        result = {}
+        for key, items in rows.items():
+            items.sort()
+            result[key] = (
+                [day for day, _ in items],
+                list(accumulate(count for _, count in items)),
+            )
+        return result
+
+    @staticmethod
+    def upto(series, day):
+        days, totals = series
+        position = bisect_right(days, day)
+        return totals[position - 1] if position else 0
+
+    # Записей с датой (начала или окончания) не позже day, по разрезам
+    def total(self, index, day):
+        return Counter({key: self.upto(series, day) for key, series in index.items()})
+
+    def on_date(self, day):
+        counts = self.total(self.starts, day)
+        counts.subtract(self.total(self.ends, day))
+        return +counts
+
+    def entered(self, first, last):
+        counts = self.total(self.starts, last)
+        counts.subtract(self.total(self.starts, first - timedelta(days=1)))
+        return +counts
+
+    def left(self, first, last):
+        counts = self.total(self.ends, last)
+        counts.subtract(self.total(self.ends, first - timedelta(days=1)))
+        return +counts
+
+    # Движение за месяц: {разрез: (на начало, взято, снято, на конец)}
+    def movement(self, month):
+        first, last = month, month_end(month)
+        columns = (
+            self.on_date(first - timedelta(days=1)),
+            self.entered(first, last),
+            self.left(first, last),
+            self.on_date(last),
+        )
+        keys = set().union(*columns)
+        return {key: tuple(column[key] for column in columns) for key in keys}
+
+
+# Сбрасывает кэшированные снимки регистра (и остальные кэши по таблице —
+# поколение общее); для массовых операций без сигналов
+def invalidate_snapshots(model):
+    invalidate_model_cache(model)
+
+
+def register_changed(sender, **kwargs):
+    invalidate_snapshots(sender)
+
+
+# Движение по месяцам: {месяц: {разрез: (на начало, взято, снято, на конец)}}.
+# Закрытые месяцы берутся из кэша; недостающие считаются одним проходом
+def monthly_movement(model, months, group_by=()):
+    group_by = tuple(group_by)
+    generation = cache_generation(model)
+    keys = {
+        month: f"intervals:{model._meta.label_lower}:{generation}:"
+        f"{month:%Y-%m}:{','.join(group_by)}"
+        for month in months
+    }
+    cached = cache.get_many(keys.values())
+    result = {month: cached[key] for month, key in keys.items() if key in cached}
+    missing = [month for month in months if month not in result]
+    if missing:
+        counts = model.objects.interval_counts(group_by)
+        today = timezone.localdate()
+        closed = {}
+        for month in missing:
+            result[month] = counts.movement(month)
+            if month_end(month) < today:
+                closed[keys[month]] = result[month]
+        cache.set_many(closed, snapshot_timeout())
+    return {month: result[month] for month in months}
+
+
+def dimension_labels(model, name):
+    return choice_labels(model, name)
+
+
+class MovementReportForm(forms.Form):
+    year = forms.IntegerField(label="Год", min_value=1900, max_value=2100)
+    group_by = forms.ChoiceField(label="Группировать по", required=False)
+    on_date = forms.DateField(
+        label="Состоящие на дату",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+    )
+
+    def __init__(self, *args, model=None, dimensions=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["group_by"].choices = [("", "—")] + [
+            (name, model._meta.get_field(name).verbose_name) for name in dimensions
+        ]
+
+
+# Отчёт о движении регистра по месяцам года и число состоящих на дату
+class MovementReportMixin:
+    movement_dimensions = ("filial", "icd_chapter", "gender")
+    movement_template = "admin/register_movement.html"
+
+    def get_urls(self):
+        opts = self.model._meta
+        custom_urls = [
+            path(
+                "movement/",
+                self.admin_site.admin_view(self.movement_view),
+                name=f"{opts.app_label}_{opts.model_name}_movement",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    def movement_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        form = MovementReportForm(
+            request.GET or {"year": timezone.localdate().year},
+            model=self.model,
+            dimensions=self.movement_dimensions,
+        )
+        rows, totals, on_date = [], None, None
+        if form.is_valid():
+            name = form.cleaned_data["group_by"]
+            group_by = [name] if name else []
+            labels = dimension_labels(self.model, name) if name else {}
+            months = year_months(form.cleaned_data["year"])
+            movement = monthly_movement(self.model, months, group_by)
+            month_totals = []
+            for month in months:
+                items = sorted(movement[month].items(), key=lambda item: str(item[0]))
+                total = [sum(column) for column in zip(*(v for _, v in items))]
+                total = total or [0, 0, 0, 0]
+                if group_by:
+                    rows.extend(
+                        (month, labels.get(key[0], key[0]) or "-", values)
+                        for key, values in items
+                    )
+                rows.append((month, "Итого" if group_by else "", total))
+                month_totals.append(total)
+            # На начало января, движение за год, на конец декабря
+            totals = (
+                month_totals[0][0],
+                sum(total[1] for total in month_totals),
+                sum(total[2] for total in month_totals),
+                month_totals[-1][3],
+            )
+            if form.cleaned_data["on_date"]:
+                day = form.cleaned_data["on_date"]
+                on_date = (day, self.model.objects.on_date(day).count())
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Движение: {self.model._meta.verbose_name_plural}",
+            "form": form,
+            "rows": rows,
+            "totals": totals,
+            "on_date": on_date,
+        }
+        return TemplateResponse(request, self.movement_template, context)
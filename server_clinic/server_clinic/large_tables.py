@@ -0,0 +1,326 @@
+# server_clinic/server_clinic/large_tables.py
+import base64
+import hashlib
+import json
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from django.http import HttpRequest, QueryDict
+from django.utils.functional import cached_property
+from server_clinic.caching import cache_facets
+
+# Параметры запроса режима больших таблиц
+AFTER_VAR = "_after"
+BEFORE_VAR = "_before"
+EXACT_COUNT_VAR = "_exact"
+KEYSET_VARS = (AFTER_VAR, BEFORE_VAR, EXACT_COUNT_VAR)
+
+COUNT_CACHE_TIMEOUT = 300
+# Для отфильтрованных списков без кэша считаем не дальше этого предела
+COUNT_LIMIT = 10000
+
+
+# Оценка числа строк таблицы по статистике СУБД без COUNT(*)
+def estimate_table_rows(model, using="default"):
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(table)],
+            )
+            row = cursor.fetchone()
+            return row[0] if row and row[0] > 0 else None
+        if connection.vendor == "sqlite":
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table]
+                )
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+            row = cursor.fetchone()
+            return row[0] or 0
+    return None
+
+
+# Пагинатор с оценочным/кэшированным количеством вместо COUNT(*) на каждый запрос
+class EstimatedCountPaginator(Paginator):
+    def __init__(self, *args, exact=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.exact = exact
+        self.is_estimate = False
+        self.is_limited = False
+
+    def cache_key(self):
+        queryset = self.object_list
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+        return f"changelist_count:{digest}"
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        try:
+            key = self.cache_key()
+        except EmptyResultSet:
+            return 0
+        count = cache.get(key)
+        if count is not None:
+            return count
+        if not self.exact:
+            if not queryset.query.where:
+                estimate = estimate_table_rows(queryset.model, queryset.db)
+                if estimate is not None:
+                    self.is_estimate = True
+                    return estimate
+            count = queryset.order_by()[: COUNT_LIMIT + 1].count()
+            if count > COUNT_LIMIT:
+                self.is_estimate = self.is_limited = True
+                return COUNT_LIMIT
+        else:
+            count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+
+def encode_cursor(values):
+    data = json.dumps(values, cls=DjangoJSONEncoder).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(token, fields):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if len(values) != len(fields):
+            raise ValueError
+        return [
+            None if value is None else field.to_python(value)
+            for value, (_, _, field) in zip(values, fields)
+        ]
+    except Exception as e:
+        raise IncorrectLookupParameters(e) from e
+
+
+# Список с keyset-пагинацией по сортировке changelist вместо OFFSET
+class KeysetChangeList(ChangeList):
+    def __init__(self, request, *args, **kwargs):
+        self.keyset_params = getattr(request, "keyset_params", {})
+        self.keyset_mode = False
+        super().__init__(request, *args, **kwargs)
+
+    # Счётчики фасетов (?_facets) — из кэша до изменения таблицы
+    def get_filters(self, request):
+        filters = super().get_filters(request)
+        cache_facets(filters[0], self)
+        return filters
+
+    # Выбранный в списке столбец дополняется сортировкой админки по умолчанию
+    # и pk — развёрнутыми, если столбец отсортирован против своего направления
+    # в индексах (по умолчанию — по возрастанию): (статус DESC, дата ASC, id ASC)
+    # читается обратным проходом индекса (статус, -дата, -id), а не сортировкой
+    # всех строк с одинаковым статусом
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        if not self.params.get(ORDER_VAR) or not all(
+            isinstance(part, str) for part in ordering
+        ):
+            return ordering
+        if ordering and ordering[-1] == "-pk":
+            ordering.pop()
+        # Хвост — сортировка queryset админки, её дописывает ChangeList
+        chosen = ordering[: len(ordering) - len(queryset.query.order_by)]
+        if not chosen:
+            return [*ordering, "-pk"]
+        default = self.model_admin.get_ordering(request) or self._get_default_ordering()
+        natural = {part.lstrip("-"): part.startswith("-") for part in default}
+        first = chosen[0].lstrip("-")
+        reverse = chosen[0].startswith("-") != natural.get(first, False)
+        result, seen = [], set()
+        for number, part in enumerate([*chosen, *default, "-pk"]):
+            name = part.lstrip("-")
+            if name in seen:
+                continue
+            seen.add(name)
+            if reverse and number >= len(chosen):
+                part = name if part.startswith("-") else f"-{part}"
+            result.append(part)
+        return result
+
+    # Поля сортировки как (путь, по убыванию, поле модели); None — keyset невозможен
+    def get_keyset_fields(self):
+        fields = []
+        for item in self.queryset.query.order_by:
+            if not isinstance(item, str):
+                return None
+            descending = item.startswith("-")
+            name = item.lstrip("-")
+            opts = self.lookup_opts
+            if name == "pk":
+                name = opts.pk.name
+            parts = name.split("__")
+            try:
+                for part in parts[:-1]:
+                    opts = opts.get_field(part).related_model._meta
+                field = opts.get_field(parts[-1])
+            except (FieldDoesNotExist, AttributeError):
+                return None
+            if field.is_relation:
+                if len(parts) > 1 or not field.concrete:
+                    return None
+                name = field.attname
+                field = field.target_field
+            fields.append((name, descending, field))
+        return fields or None
+
+    # Условие «строго после курсора»; NULL всегда в конце списка
+    def keyset_condition(self, fields, values, backwards=False):
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, field), value in zip(fields, values):
+            if value is None:
+                beyond = Q(**{f"{name}__isnull": False}) if backwards else Q(pk__in=[])
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                lookup = "lt" if descending != backwards else "gt"
+                beyond = Q(**{f"{name}__{lookup}": value})
+                if field.null and not backwards:
+                    beyond |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            condition |= equal & beyond
+            equal &= same
+        return condition
+
+    def keyset_ordering(self, fields, backwards=False):
+        ordering = []
+        for name, descending, field in fields:
+            nulls = {}
+            if field.null:
+                nulls = {"nulls_first": True} if backwards else {"nulls_last": True}
+            if descending != backwards:
+                ordering.append(F(name).desc(**nulls))
+            else:
+                ordering.append(F(name).asc(**nulls))
+        return ordering
+
+    def row_values(self, obj, fields):
+        values = []
+        for name, _, _ in fields:
+            value = obj
+            for part in name.split("__"):
+                value = getattr(value, part)
+            values.append(value)
+        return values
+
+    def get_results(self, request):
+        fields = self.get_keyset_fields()
+        if fields is None or self.show_all or self.list_editable:
+            return super().get_results(request)
+        self.keyset_mode = True
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        result_count = paginator.count
+
+        after = self.keyset_params.get(AFTER_VAR)
+        before = self.keyset_params.get(BEFORE_VAR)
+        backwards = bool(before) and not after
+        queryset = self.queryset
+        if after or before:
+            values = decode_cursor(after or before, fields)
+            queryset = queryset.filter(self.keyset_condition(fields, values, backwards))
+        queryset = queryset.order_by(*self.keyset_ordering(fields, backwards))
+        rows = list(queryset[: self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[: self.list_per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(after)
+
+        self.result_count = result_count
+        self.result_count_is_estimate = paginator.is_estimate
+        self.result_count_is_limited = paginator.is_limited
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = has_next or has_prev
+        self.paginator = paginator
+
+        remove = list(KEYSET_VARS)
+        self.keyset_first_url = (
+            self.get_query_string(remove=remove) if has_prev else None
+        )
+        self.keyset_prev_url = (
+            self.get_query_string(
+                {BEFORE_VAR: encode_cursor(self.row_values(rows[0], fields))}, remove
+            )
+            if has_prev and rows
+            else None
+        )
+        self.keyset_next_url = (
+            self.get_query_string(
+                {AFTER_VAR: encode_cursor(self.row_values(rows[-1], fields))}, remove
+            )
+            if has_next and rows
+            else None
+        )
+        self.exact_count_url = self.get_query_string({EXACT_COUNT_VAR: 1}, remove)
+
+
+# Режим больших таблиц для ModelAdmin: keyset-пагинация и оценочные количества
+# Запрос списка без параметров keyset-пагинации: весь список с фильтрами
+# и поиском (выгрузки, массовые действия)
+def list_query(request):
+    query = request.GET.copy()
+    for var in KEYSET_VARS:
+        query.pop(var, None)
+    return query
+
+
+# Запрос списка для фоновой задачи: строка запроса и права автора задачи
+def changelist_request(user, query):
+    request = HttpRequest()
+    request.method = "GET"
+    request.GET = QueryDict(query)
+    request.user = user
+    return request
+
+
+class LargeTableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = "admin/large_table_change_list.html"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            exact=EXACT_COUNT_VAR in getattr(request, "keyset_params", {}),
+        )
+
+    # Курсоры убираются из GET, иначе ChangeList примет их за фильтры
+    def changelist_view(self, request, extra_context=None):
+        request.GET = request.GET.copy()
+        request.keyset_params = {
+            var: request.GET.pop(var)[-1] for var in KEYSET_VARS if var in request.GET
+        }
+        return super().changelist_view(request, extra_context)
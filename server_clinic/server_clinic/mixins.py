@@ -1,6 +1,7 @@
 # server_clinic/server_clinic/mixins.py
 from django.db import models
-from patient.constants import GENDER_CHOICES, FILIAL
+from patient.models import age_at
+from server_clinic.constants import GENDER_CHOICES, FILIAL
 
 search_term_m = models.CharField(
     max_length=16,
@@ -8,32 +9,76 @@ search_term_m = models.CharField(
     help_text="Введите номер полиса ОМС для поиска пациента",
 )  # * Поля для поиска пациента
 
-full_name_m = models.CharField(
-    max_length=100,
-    verbose_name="ФИО пациента",
-    editable=False,
-)  # * Автоподтягиваемые поля
-
-gender_m = models.CharField(
-    max_length=1,
-    choices=GENDER_CHOICES,
-    verbose_name="Пол",
-    editable=False,
-)  # * Автоподтягиваемые поля
-
-birth_date_m = models.DateField(
-    verbose_name="Дата рождения",
-    editable=False,
-)  # * Автоподтягиваемые поля
-
-age_m = models.PositiveSmallIntegerField(
-    verbose_name="Возраст",
-    editable=False,
-)  # * Автоподтягиваемые поля
-
-filial_m = models.CharField(
-    max_length=20,
-    choices=FILIAL,
-    verbose_name="Филиал прикрепления",
-    editable=False,
-)  # * Автоподтягиваемые поля
+# Поля пациента, копируемые в строки регистров как есть
+SNAPSHOT_FIELDS = ("full_name", "gender", "birth_date", "filial")
+
+
+# Копия данных пациента в строке регистра: фильтры, сортировка и поиск по
+# ним идут по индексам своей таблицы, без соединения с patient. Заполняется
+# при сохранении, после изменения пациента — patient.snapshots.propagate
+class PatientSnapshotModel(models.Model):
+    # Поле даты события, на которую считается возраст (None — возраст не хранится)
+    snapshot_age_field = None
+
+    full_name = models.CharField(
+        max_length=100,
+        default="",
+        db_index=True,
+        verbose_name="ФИО пациента",
+        editable=False,
+    )  # * Автоподтягиваемые поля
+
+    gender = models.CharField(
+        max_length=1,
+        choices=GENDER_CHOICES,
+        default="",
+        db_index=True,
+        verbose_name="Пол",
+        editable=False,
+    )  # * Автоподтягиваемые поля
+
+    birth_date = models.DateField(
+        null=True,
+        db_index=True,
+        verbose_name="Дата рождения",
+        editable=False,
+    )  # * Автоподтягиваемые поля
+
+    # Без ограничения >= 0: событие раньше даты рождения (ошибка ввода)
+    # должно остаться видимым, а не срывать обновление копий
+    age = models.SmallIntegerField(
+        null=True,
+        db_index=True,
+        verbose_name="Возраст",
+        editable=False,
+    )  # * Автоподтягиваемые поля
+
+    filial = models.CharField(
+        max_length=20,
+        choices=FILIAL,
+        default="",
+        # Индекс — составной (филиал, дата события) в Meta регистра
+        verbose_name="Филиал прикрепления",
+        editable=False,
+    )  # * Автоподтягиваемые поля
+
+    class Meta:
+        abstract = True
+
+    def fill_snapshot(self, patient=None):
+        patient = patient or self.patient
+        for name in SNAPSHOT_FIELDS:
+            setattr(self, name, getattr(patient, name))
+        on = getattr(self, self.snapshot_age_field) if self.snapshot_age_field else None
+        self.age = age_at(patient.birth_date, on) if on else None
+
+    def save(self, *args, **kwargs):
+        if self.patient_id is not None:
+            self.fill_snapshot()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {
+                    *kwargs["update_fields"],
+                    *SNAPSHOT_FIELDS,
+                    "age",
+                }
+        super().save(*args, **kwargs)
@@ -0,0 +1,56 @@
+# server_clinic/server_clinic/postgres.py
+import logging
+from django.db import DatabaseError, connections, transaction
+
+logger = logging.getLogger("server_clinic.postgres")
+
+# Индексы, которые описываются только SQL PostgreSQL: (имя, таблица, определение).
+# Создаются после migrate, если таблица есть (часть приложений может быть
+# не подключена)
+POSTGRES_INDEXES = (
+    # Поиск по ФИО без FTS5: full_name__icontains даёт
+    # UPPER(full_name::text) LIKE UPPER('%...%'), триграммы ускоряют такой LIKE
+    (
+        "patient_full_name_trgm",
+        "patient",
+        "USING gin (UPPER(full_name::text) gin_trgm_ops)",
+    ),
+    # Keyset-пагинация сортирует дату инвалидности DESC NULLS LAST, а индекс
+    # из Meta в PostgreSQL хранит DESC NULLS FIRST (в SQLite совпадает)
+    (
+        "disabled_child_date_nulls_idx",
+        "disabled_children_disabledchild",
+        "(disability_date DESC NULLS LAST, patient_id DESC)",
+    ),
+    (
+        "disabled_child_open_nulls_idx",
+        "disabled_children_disabledchild",
+        "(disability_date DESC NULLS LAST, patient_id DESC) "
+        "WHERE removal_date IS NULL",
+    ),
+)
+
+
+def ensure_postgres_indexes(using="default"):
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    tables = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        try:
+            # Расширение ставит владелец базы; без прав — индексы без триграмм
+            with transaction.atomic(using=using):
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError as exc:
+            logger.warning("pg_trgm не установлено: %s", exc)
+        for name, table, definition in POSTGRES_INDEXES:
+            if table not in tables:
+                continue
+            try:
+                with transaction.atomic(using=using):
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS {name} "
+                        f"ON {connection.ops.quote_name(table)} {definition}"
+                    )
+            except DatabaseError as exc:
+                logger.warning("Индекс %s не создан: %s", name, exc)
@@ -11,6 +11,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from .const import SECRET_KEY, ALLOWED_HOSTS
 
@@ -28,6 +29,9 @@ DEBUG = True
 
 INSTALLED_APPS = [
     "patient",
+    "mkb",
+    "monitoring",
+    "jobs",
     # "diagnos",
     "death",
     # 'disabled_children',
@@ -41,6 +45,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "monitoring.middleware.MetricsMiddleware",
+    "monitoring.middleware.QueryBudgetMiddleware",
+    "monitoring.middleware.SlowQueryMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -54,7 +61,7 @@ ROOT_URLCONF = "server_clinic.urls"
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
+        "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -72,13 +79,100 @@ WSGI_APPLICATION = "server_clinic.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Профиль SQLite для нескольких одновременно работающих регистраторов:
+# WAL (чтение не ждёт записи), отображение файла в память, кэш 64 МБ,
+# ожидание блокировки вместо "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 20000,
+}
+
+SQLITE_DATABASE = {
+    "ENGINE": "django.db.backends.sqlite3",
+    "NAME": os.environ.get("DB_NAME") or BASE_DIR / "db.sqlite3",
+    "OPTIONS": {
+        # Выполняется при каждом новом подключении
+        "init_command": ";".join(
+            f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+        ),
+        # BEGIN IMMEDIATE: транзакция сразу берёт блокировку записи и ждёт
+        # её по busy_timeout, а не падает при повышении блокировки
+        "transaction_mode": "IMMEDIATE",
+    },
+}
+
+# PostgreSQL для нескольких серверов приложения (DB_ENGINE=postgresql).
+# DB_POOL_MAX_SIZE > 0 — пул подключений psycopg в каждом процессе; иначе
+# постоянные подключения на DB_CONN_MAX_AGE секунд. Перед каждым запросом
+# к серверу подключение проверяется (CONN_HEALTH_CHECKS)
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 0))
+
+POSTGRES_DATABASE = {
+    "ENGINE": "django.db.backends.postgresql",
+    "NAME": os.environ.get("DB_NAME", "policlinic"),
+    "USER": os.environ.get("DB_USER", "policlinic"),
+    "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+    "HOST": os.environ.get("DB_HOST", "localhost"),
+    "PORT": os.environ.get("DB_PORT", "5432"),
+    "CONN_MAX_AGE": (
+        0 if DB_POOL_MAX_SIZE else int(os.environ.get("DB_CONN_MAX_AGE", 60))
+    ),
+    "CONN_HEALTH_CHECKS": True,
+    # За pgbouncer в режиме transaction серверные курсоры (iterator(),
+    # выгрузки) не работают: DB_DISABLE_SERVER_SIDE_CURSORS=1
+    "DISABLE_SERVER_SIDE_CURSORS": os.environ.get("DB_DISABLE_SERVER_SIDE_CURSORS")
+    == "1",
+    "OPTIONS": {"application_name": "server_clinic"},
+}
+if DB_POOL_MAX_SIZE:
+    POSTGRES_DATABASE["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": DB_POOL_MAX_SIZE,
+        "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 10)),
     }
+
+DATABASES = {
+    "default": (
+        POSTGRES_DATABASE
+        if os.environ.get("DB_ENGINE") == "postgresql"
+        else SQLITE_DATABASE
+    )
 }
 
+# Кэш: счётчики списков, снимки регистров, варианты фильтров и фасеты,
+# поколения таблиц. По умолчанию — память процесса (разработка, runserver).
+# Несколько процессов (gunicorn, run_workers) должны видеть один кэш, иначе
+# сброс поколения в одном процессе не дойдёт до остальных: CACHE_URL=redis://...
+# (сервер Redis) или CACHE_DIR — общий каталог на одном сервере
+CACHE_URL = os.environ.get("CACHE_URL")
+CACHE_DIR = os.environ.get("CACHE_DIR")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+elif CACHE_DIR:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+            "OPTIONS": {"MAX_ENTRIES": 20000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -116,7 +210,41 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Файлы результатов фоновых задач (jobs). Не раздаются веб-сервером:
+# скачиваются через админку с проверкой прав
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT") or BASE_DIR / "media"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Журнал: предупреждения о превышении бюджета SQL-запросов (monitoring)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "server_clinic": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+
+# Метрики (/metrics): каталог файлов воркеров gunicorn/uwsgi. Без него каждый
+# процесс считает сам по себе (runserver). Каталог очищается при деплое
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+# Токен сборщика метрик (Authorization: Bearer); без него /metrics доступны
+# только сотрудникам, вошедшим в админку
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+
+# Запросы дольше порога (мс) пишутся в журнал и в таблицу slow_query с планом
+# выполнения; None — не записывать
+SLOW_QUERY_MS = int(os.environ.get("SLOW_QUERY_MS", 300)) or None
+
+# Фоновые задачи (jobs, manage.py run_workers): число процессов-воркеров и
+# лимиты одновременных задач по типам сверх заданных при регистрации
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_CONCURRENCY = {}
@@ -4,12 +4,31 @@ from django.core.exceptions import ValidationError
 from server_clinic.constants import PRIMARY_STATUS, REMOVAL_STATUS
 from datetime import date
 from django.apps import apps
+from django.dispatch import Signal
+from functools import wraps
+
+# Срабатывание валидатора (sender — функция валидатора); счётчик ведёт
+# monitoring, подписываясь на сигнал
+validation_failed = Signal()
+
+
+def counted(validator):
+    @wraps(validator)
+    def wrapper(*args, **kwargs):
+        try:
+            return validator(*args, **kwargs)
+        except ValidationError:
+            validation_failed.send(sender=validator)
+            raise
+
+    return wrapper
 
 
 # Валидатор для проверки кода МКБ-10
+@counted
 def validate_icd10_format(value):
     pattern = r"^[A-Z]\d{2}(?:\.\d)?$"
-    if not re.match(pattern, value, re.IGNORECASE):
+    if not re.match(pattern, value):
         raise ValidationError(
             """Неверный формат МКБ-10.
             Правильный формат: одна латинская буква, две цифры, опционально точка и еще одна цифра.
@@ -18,6 +37,7 @@ def validate_icd10_format(value):
 
 
 # Валидатор для проверки даты рождения
+@counted
 def validate_birth_date(value):
     today = date.today().year
     year_of_birth = value.year
@@ -30,12 +50,14 @@ def validate_birth_date(value):
 
 
 # Валидатор для проверки длины номера полиса
+@counted
 def validate_insurance_number(value):
     if len(value) != 16 or not value.isdigit():
         raise ValidationError("Номер полиса ОМС должен содержать ровно 16 цифр")
 
 
 # Проверка даты смерти
+@counted
 def validate_death_date(instance):
     # Получаем дату смерти из инстанса
     if instance.death_date > date.today():
@@ -47,6 +69,7 @@ def validate_death_date(instance):
 
 
 # Валидатор для проверки статуса
+@counted
 def validate_status_date_consistency(instance):
     if instance.status in PRIMARY_STATUS and not instance.disability_date:
         raise ValidationError(
@@ -55,6 +78,7 @@ def validate_status_date_consistency(instance):
 
 
 # Проверка наличие даты установки инвалидности и даты снятия с учёта
+@counted
 def validate_date_removal(instance):
     if instance.removal_date and instance.disability_date:
         if instance.removal_date < instance.disability_date:
@@ -70,6 +94,7 @@ def validate_date_removal(instance):
 
 
 # Валидация primary_reason
+@counted
 def validate_primary_reason(instance):
     if instance.disp_status == "с_впервые":
         if not instance.primary_reason:
@@ -87,6 +112,7 @@ def validate_primary_reason(instance):
 
 
 # Валидация remove_reason
+@counted
 def validate_remove_reason(instance):
     if instance.disp_end_date:
         if not instance.remove_reason:
@@ -102,6 +128,7 @@ def validate_remove_reason(instance):
 
 
 # Проверка даты снятия
+@counted
 def validate_disp_end_date(instance):
     if instance.disp_end_date and instance.disp_end_date < instance.disp_start_date:
         raise ValidationError(
@@ -110,35 +137,28 @@ def validate_disp_end_date(instance):
 
 
 # Поиск пациента только при создании новой записи и предупреждение об ошибке в случае отсутствия
+@counted
 def validate_patient_by_insurance_number(instance):
-#Получаем модель Patient через apps
-    Patient = apps.get_model('patient', 'Patient')
+    # Полис разрешается через общий кэш, а не запросом на каждую запись
+    from patient.resolver import as_patient, resolver
+
     if not instance.pk:
-        try:
-            instance.patient = Patient.objects.get(
-                insurance_number=instance.insurance_number
-            )
-        except Patient.DoesNotExist:
+        record = resolver.resolve(instance.insurance_number)
+        if record is None:
             raise ValidationError(
                 {"insurance_number": "Пациент с таким полисом не найден"}
             )
+        instance.patient = as_patient(record, instance.insurance_number)
 
+@counted
 def validate_unique_death_record(instance):
     # Получаем модель Death через apps
     Death = apps.get_model('death', 'Death')
     
-    # Проверка уникальности записи
-    if instance.pk:
-        if Death.objects.filter(
-            patient=instance.patient
-        ).exclude(pk=instance.pk).exists():
-            raise ValidationError(
-                "Для этого пациента уже существует запись о смерти"
-            )
-    else:
-        if Death.objects.filter(
-            patient=instance.patient
-        ).exists():
-            raise ValidationError(
-                "Для этого пациента уже существует запись о смерти"
-            )
\ No newline at end of file
+    # Проверка уникальности записи одним запросом
+    if Death.objects.filter(
+        patient_id=instance.patient_id
+    ).exclude(pk=instance.pk).exists():
+        raise ValidationError(
+            "Для этого пациента уже существует запись о смерти"
+        )
\ No newline at end of file